@@ -1,5 +1,6 @@
 from Models.LogModel import LogModel
-from core.database import query, image_to_binary
+from core.database import query
+from core.thumbnails import person_photo_variants
 
 
 class ActorModel:
@@ -7,7 +8,8 @@ class ActorModel:
     def get_all_actors():
         """Получить всех актёров"""
         sql = """
-            SELECT actor_id, name || ' ' || lastname AS fullname, photo, created_at, updated_at
+            SELECT actor_id, name || ' ' || lastname AS fullname, COALESCE(photo_thumb, photo),
+                   created_at, updated_at, photo_hash
             FROM actor
             ORDER BY fullname
         """
@@ -29,12 +31,12 @@ class ActorModel:
     def create_actor(name, lastname, photo_path, user_id=None):
         """Создать нового актёра с логированием"""
         sql = """
-            INSERT INTO actor (name, lastname, photo)
-            VALUES (%s, %s, %s)
+            INSERT INTO actor (name, lastname, photo, photo_thumb, photo_hash)
+            VALUES (%s, %s, %s, %s, %s)
             RETURNING actor_id
         """
-        photo_binary = image_to_binary(photo_path)
-        result = query(sql, [name, lastname, photo_binary])
+        photo = person_photo_variants(photo_path)
+        result = query(sql, [name, lastname, photo['photo'], photo['photo_thumb'], photo['photo_hash']])
 
         if result:
             actor_id = result[0][0]
@@ -52,13 +54,14 @@ class ActorModel:
     def update_actor(actor_id, name, lastname, photo_path=None, user_id=None):
         """Обновить данные актёра с логированием"""
         if photo_path:
-            photo_binary = image_to_binary(photo_path)
+            photo = person_photo_variants(photo_path)
             sql = """
                 UPDATE actor
-                SET name = %s, lastname = %s, photo = %s, updated_at = CURRENT_TIMESTAMP
+                SET name = %s, lastname = %s, photo = %s, photo_thumb = %s, photo_hash = %s,
+                    updated_at = CURRENT_TIMESTAMP
                 WHERE actor_id = %s
             """
-            query(sql, [name, lastname, photo_binary, actor_id])
+            query(sql, [name, lastname, photo['photo'], photo['photo_thumb'], photo['photo_hash'], actor_id])
         else:
             sql = """
                 UPDATE actor
@@ -98,7 +101,8 @@ class ActorModel:
     def search_actors(search_text):
         """Поиск актёров по имени"""
         sql = """
-            SELECT actor_id, name || ' ' || lastname AS fullname, photo, created_at, updated_at
+            SELECT actor_id, name || ' ' || lastname AS fullname, COALESCE(photo_thumb, photo),
+                   created_at, updated_at, photo_hash
             FROM actor
             WHERE (name || ' ' || lastname) ILIKE %s
             ORDER BY fullname
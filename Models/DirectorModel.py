@@ -1,4 +1,5 @@
-from core.database import query, image_to_binary
+from core.database import query
+from core.thumbnails import person_photo_variants
 
 
 class DirectorModel:
@@ -6,7 +7,8 @@ class DirectorModel:
     def get_all_directors():
         """Получить всех режиссёров"""
         sql = """
-            SELECT director_id, name || ' ' || lastname AS fullname, photo, created_at, updated_at
+            SELECT director_id, name || ' ' || lastname AS fullname, COALESCE(photo_thumb, photo),
+                   created_at, updated_at, photo_hash
             FROM director
             ORDER BY fullname
         """
@@ -28,25 +30,26 @@ class DirectorModel:
     def create_director(name, lastname, photo_path):
         """Создать нового режиссёра"""
         sql = """
-            INSERT INTO director (name, lastname, photo)
-            VALUES (%s, %s, %s)
+            INSERT INTO director (name, lastname, photo, photo_thumb, photo_hash)
+            VALUES (%s, %s, %s, %s, %s)
             RETURNING director_id
         """
-        photo_binary = image_to_binary(photo_path)
-        result = query(sql, [name, lastname, photo_binary])
+        photo = person_photo_variants(photo_path)
+        result = query(sql, [name, lastname, photo['photo'], photo['photo_thumb'], photo['photo_hash']])
         return result[0][0] if result else None
 
     @staticmethod
     def update_director(director_id, name, lastname, photo_path=None):
         """Обновить данные режиссёра"""
         if photo_path:
-            photo_binary = image_to_binary(photo_path)
+            photo = person_photo_variants(photo_path)
             sql = """
                 UPDATE director
-                SET name = %s, lastname = %s, photo = %s, updated_at = CURRENT_TIMESTAMP
+                SET name = %s, lastname = %s, photo = %s, photo_thumb = %s, photo_hash = %s,
+                    updated_at = CURRENT_TIMESTAMP
                 WHERE director_id = %s
             """
-            query(sql, [name, lastname, photo_binary, director_id])
+            query(sql, [name, lastname, photo['photo'], photo['photo_thumb'], photo['photo_hash'], director_id])
         else:
             sql = """
                 UPDATE director
@@ -69,7 +72,8 @@ class DirectorModel:
     def search_directors(search_text):
         """Поиск режиссёров по имени"""
         sql = """
-            SELECT director_id, name || ' ' || lastname AS fullname, photo, created_at, updated_at
+            SELECT director_id, name || ' ' || lastname AS fullname, COALESCE(photo_thumb, photo),
+                   created_at, updated_at, photo_hash
             FROM director
             WHERE (name || ' ' || lastname) ILIKE %s
             ORDER BY fullname
@@ -7,7 +7,7 @@ class HallModel:
         """Получить все залы"""
         sql = """
             SELECT hall_id, hall_number, hall_name, hall_type, 
-                   hall_extra_price, created_at, updated_at
+                   hall_extra_price, created_at, updated_at, capacity
             FROM hall
             ORDER BY hall_number
         """
@@ -18,7 +18,7 @@ class HallModel:
         """Получить зал по ID"""
         sql = """
             SELECT hall_id, hall_number, hall_name, hall_type, 
-                   hall_extra_price, created_at, updated_at
+                   hall_extra_price, created_at, updated_at, capacity
             FROM hall
             WHERE hall_id = %s
         """
@@ -1,24 +1,33 @@
 from Models.UserModel import UserModel
 from core.database import query
+from core.log_writer import log_writer
 
 class LogModel:
+    # Столбцы обозревателя журнала: (log_id, login, actor_role, action_type, entity_id, description, created_at)
+    LOGS_SELECT_SQL = """
+        SELECT al.log_id, u.login, al.actor_role, al.action_type,
+               al.entity_id, al.description, al.created_at
+        FROM activity_log al
+        LEFT JOIN users u ON al.user_id = u.user_id
+    """
+
     @staticmethod
     def log_action(user_id, actor_role, action_type, entity_id, description,
                    action_result="SUCCESS", error_message=None):
+        """
+        Запись в журнал без ожидания БД: запись уходит в буфер core.log_writer
+        и попадает в activity_log пачкой из фонового потока. log_id не возвращается.
+        """
         try:
-            sql = """
-                INSERT INTO activity_log 
-                (user_id, actor_role, action_type, entity_id, description, created_at)
-                VALUES (%s, %s, %s, %s, %s, CURRENT_TIMESTAMP)
-                RETURNING log_id
-            """
-
-            result = query(sql, [user_id, actor_role, action_type, entity_id, description])
-            return result[0][0] if result else None
-
+            log_writer().write(user_id, actor_role, action_type, entity_id, description)
         except Exception as e:
             print(f"Ошибка при логировании: {e}")
-            return None
+        return None
+
+    @staticmethod
+    def flush():
+        """Дописать буфер журнала в БД (перед чтением журнала)"""
+        return log_writer().flush()
 
     @staticmethod
     def log_user_login(user_id, login_success=True, error_msg=None, user_role=None):
@@ -101,6 +110,23 @@ class LogModel:
             f"Покупка билета #{ticket_id} на сеанс #{session_id} ({seats_count} мест)"
         )
 
+    @staticmethod
+    def log_ticket_purchase_bulk(user_id, ticket_ids, session_id):
+        """
+        Логирование покупки нескольких билетов одним INSERT.
+        Вызывается внутри транзакции бронирования, поэтому ошибки не глушит:
+        без записи в журнал бронь тоже откатывается.
+        """
+        sql = """
+            INSERT INTO activity_log
+            (user_id, actor_role, action_type, entity_id, description, created_at)
+            SELECT %s, 'User', 'TICKET_PURCHASE', t.ticket_id,
+                   'Покупка билета #' || t.ticket_id || ' на сеанс #' || %s || ' (' || %s || ' мест)',
+                   CURRENT_TIMESTAMP
+            FROM unnest(%s::int[]) AS t(ticket_id)
+        """
+        query(sql, [user_id, session_id, len(ticket_ids), list(ticket_ids)])
+
     @staticmethod
     def log_ticket_cancel(user_id, ticket_id, is_admin=False):
         """Логирование отмены билета"""
@@ -180,6 +206,7 @@ class LogModel:
     @staticmethod
     def get_recent_logs(limit=100, user_id=None, action_type=None):
         """Получить последние записи лога"""
+        LogModel.flush()
         sql = """
             SELECT al.log_id, al.user_id, u.login, al.actor_role, al.action_type, 
                    al.entity_id, al.description, al.created_at
@@ -197,17 +224,104 @@ class LogModel:
             sql += " AND al.action_type = %s"
             params.append(action_type)
 
-        sql += " ORDER BY al.created_at DESC LIMIT %s"
+        sql += " ORDER BY al.created_at DESC, al.log_id DESC LIMIT %s"
         params.append(limit)
 
         return query(sql, params) or []
 
     @staticmethod
-    def cleanup_old_logs(days_to_keep=90):
-        """Очистка старых логов"""
-        sql = "DELETE FROM activity_log WHERE created_at < CURRENT_DATE - INTERVAL '%s days'"
-        query(sql, [days_to_keep])
-        return True
+    def get_logs_page(after=None, limit=100, user_login=None, actor_role=None, action_type=None,
+                      action_group=None, entity_id=None, date_from=None, date_to=None, search_text=None):
+        """
+        Страница журнала для обозревателя, от новых записей к старым.
+        after - (created_at, log_id) последней записи предыдущей страницы (keyset, без OFFSET);
+        date_to включительно; search_text - полнотекстовый поиск по описанию.
+        Каждый фильтр опирается на свой индекс (поле, created_at DESC, log_id DESC),
+        границы дат отсекают лишние месячные секции.
+        Возвращает (rows, next_after): строки (log_id, login, actor_role, action_type,
+        entity_id, description, created_at); next_after = None - страница последняя.
+        """
+        LogModel.flush()
+        conditions, params = LogModel._log_filters(user_login, actor_role, action_type, action_group,
+                                                   entity_id, date_from, date_to, search_text)
+        if after is not None:
+            conditions.append("(al.created_at, al.log_id) < (%s, %s)")
+            params.extend(after)
+
+        sql = LogModel.LOGS_SELECT_SQL
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        # Одна лишняя строка показывает, есть ли следующая страница
+        sql += " ORDER BY al.created_at DESC, al.log_id DESC LIMIT %s"
+        params.append(limit + 1)
+
+        rows = query(sql, params) or []
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, (rows[-1][6], rows[-1][0])
+
+    @staticmethod
+    def export_query(user_login=None, actor_role=None, action_type=None, action_group=None,
+                     entity_id=None, date_from=None, date_to=None, search_text=None):
+        """SQL и параметры выгрузки журнала (для COPY) с фильтрами обозревателя, без страниц и сортировки"""
+        LogModel.flush()
+        conditions, params = LogModel._log_filters(user_login, actor_role, action_type, action_group,
+                                                   entity_id, date_from, date_to, search_text)
+        sql = LogModel.LOGS_SELECT_SQL
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        return sql, params
+
+    @staticmethod
+    def _log_filters(user_login, actor_role, action_type, action_group,
+                     entity_id, date_from, date_to, search_text):
+        conditions = []
+        params = []
+
+        if user_login:
+            conditions.append("al.user_id = (SELECT user_id FROM users WHERE login = %s)")
+            params.append(user_login)
+        if actor_role:
+            conditions.append("al.actor_role = %s")
+            params.append(actor_role)
+        if action_type:
+            conditions.append("al.action_type = %s")
+            params.append(action_type)
+        if action_group:
+            conditions.append("al.action_group = %s")
+            params.append(action_group)
+        if entity_id is not None:
+            conditions.append("al.entity_id = %s")
+            params.append(entity_id)
+        if date_from is not None:
+            conditions.append("al.created_at >= %s")
+            params.append(date_from)
+        if date_to is not None:
+            conditions.append("al.created_at < %s::date + 1")
+            params.append(date_to)
+        if search_text:
+            conditions.append("al.description_tsv @@ websearch_to_tsquery('russian', %s)")
+            params.append(search_text)
+        return conditions, params
+
+    @staticmethod
+    def cleanup_old_logs(days_to_keep=90, detach_only=False):
+        """
+        Очистка старых логов: удаляются целые месячные секции, все записи которых старше days_to_keep дней
+        (записи месяца, на который приходится граница, остаются до удаления его секции).
+        detach_only - не удалять, а отсоединить секции (для архивации). Возвращает число секций.
+        """
+        LogModel.flush()
+        sql = "SELECT drop_activity_log_partitions((CURRENT_DATE - %s * INTERVAL '1 day')::date, %s)"
+        result = query(sql, [days_to_keep, detach_only])
+        return result[0][0] if result else 0
+
+    @staticmethod
+    def ensure_partitions(months_ahead=3):
+        """Создать секции журнала на текущий и months_ahead следующих месяцев"""
+        result = query("SELECT ensure_activity_log_partitions(CURRENT_DATE, %s)", [months_ahead])
+        return result[0][0] if result else 0
 
     @staticmethod
     def log_pdf_generation(user_id, ticket_ids, success=True, error_msg=None):
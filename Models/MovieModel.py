@@ -1,51 +1,151 @@
 # Models/MovieModel.py
 from core.database import query
+from core.poster_cache import poster_cache
 
 
 class MovieModel:
+    # Постер в списках не выбирается: миниатюра подставляется из дискового кэша (см. _with_posters)
+    PAGE_COLUMNS = """
+        m.movie_id, m.title, m.description, NULL AS poster,
+        m.base_price, m.rating, m.created_at, m.updated_at, m.image_hash
+    """
+
+    @staticmethod
+    def _with_posters(rows, variant='thumb'):
+        """Заполнить колонку постера (3) по movie_id и updated_at (7)"""
+        if not rows:
+            return []
+        return poster_cache.fill(rows, variant, id_index=0, stamp_index=7, image_index=3)
+
+    @staticmethod
+    def _page_filters(genre_id=None, search_text=None):
+        """JOIN, условия и параметры для постраничных запросов"""
+        joins = ""
+        conditions = []
+        params = []
+        if genre_id:
+            joins = " JOIN movie_genre mg ON m.movie_id = mg.movie_id"
+            conditions.append("mg.genre_id = %s")
+            params.append(genre_id)
+        if search_text:
+            pattern = f"%{search_text}%"
+            conditions.append("(m.title ILIKE %s OR m.description ILIKE %s)")
+            params.extend([pattern, pattern])
+        return joins, conditions, params
+
+    @staticmethod
+    def _page_sort_column(genre_id=None, search_text=None):
+        # Каталог - новинки сверху, жанр и поиск - по рейтингу; movie_id делает порядок однозначным
+        return "m.rating" if genre_id or search_text else "m.created_at"
+
+    @staticmethod
+    def get_page_key(movie_row, genre_id=None, search_text=None):
+        """Ключ (значение сортировки, movie_id) строки из get_movies_page"""
+        if MovieModel._page_sort_column(genre_id, search_text) == "m.rating":
+            return movie_row[5], movie_row[0]
+        return movie_row[6], movie_row[0]
+
+    @staticmethod
+    def get_movies_page(limit, after=None, genre_id=None, search_text=None):
+        """
+        Страница фильмов с keyset-пагинацией.
+        after - ключ последнего фильма предыдущей страницы (см. get_page_key), None для первой.
+        """
+        try:
+            sort_column = MovieModel._page_sort_column(genre_id, search_text)
+            joins, conditions, params = MovieModel._page_filters(genre_id, search_text)
+            if after is not None:
+                conditions.append(f"({sort_column}, m.movie_id) < (%s, %s)")
+                params.extend(after)
+
+            sql = f"SELECT {MovieModel.PAGE_COLUMNS} FROM movies m{joins}"
+            if conditions:
+                sql += " WHERE " + " AND ".join(conditions)
+            sql += f" ORDER BY {sort_column} DESC, m.movie_id DESC LIMIT %s"
+            params.append(limit)
+
+            return MovieModel._with_posters(query(sql, params))
+        except Exception as e:
+            print(f"❌ Ошибка в get_movies_page: {e}")
+            return []
+
+    @staticmethod
+    def get_page_start_key(offset, genre_id=None, search_text=None):
+        """
+        Ключ фильма, после которого начинается страница со смещением offset.
+        Читает только колонки индекса, без постеров - для перехода сразу на N-ю страницу.
+        """
+        if offset <= 0:
+            return None
+        sort_column = MovieModel._page_sort_column(genre_id, search_text)
+        joins, conditions, params = MovieModel._page_filters(genre_id, search_text)
+
+        sql = f"SELECT {sort_column}, m.movie_id FROM movies m{joins}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += f" ORDER BY {sort_column} DESC, m.movie_id DESC OFFSET %s LIMIT 1"
+        params.append(offset - 1)
+
+        rows = query(sql, params)
+        return tuple(rows[0]) if rows else None
+
+    @staticmethod
+    def count_movies(genre_id=None, search_text=None):
+        """Количество фильмов с учётом фильтров (для пагинации)"""
+        joins, conditions, params = MovieModel._page_filters(genre_id, search_text)
+        sql = f"SELECT COUNT(*) FROM movies m{joins}"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        rows = query(sql, params)
+        return rows[0][0] if rows else 0
+
     @staticmethod
     def get_all_movies(limit=None, offset=0):
         try:
-            sql = """
-                SELECT movie_id, title, description, movie_image, 
-                       base_price, rating, created_at, updated_at
-                FROM movies
-                ORDER BY created_at DESC
+            sql = f"""
+                SELECT {MovieModel.PAGE_COLUMNS}
+                FROM movies m
+                ORDER BY m.created_at DESC
             """
             if limit:
                 sql += f" LIMIT {limit} OFFSET {offset}"
 
             rows = query(sql)
-            return rows if rows else []
+            return MovieModel._with_posters(rows)
 
         except Exception as e:
             print(f"❌ Ошибка в get_all_movies: {e}")
             return []
 
+    @staticmethod
+    def get_movie_titles():
+        """Только id и названия фильмов - для выпадающих списков"""
+        sql = "SELECT movie_id, title FROM movies ORDER BY created_at DESC"
+        return query(sql) or []
+
     @staticmethod
     def get_movie_by_id(movie_id):
         sql = """
-            SELECT movie_id, title, description, movie_image, 
-                   base_price, rating, created_at, updated_at
+            SELECT movie_id, title, description, NULL AS poster,
+                   base_price, rating, created_at, updated_at, image_hash
             FROM movies
             WHERE movie_id = %s
         """
-        rows = query(sql, [movie_id])
+        rows = MovieModel._with_posters(query(sql, [movie_id]), 'detail')
         return rows[0] if rows else None
 
     @staticmethod
     def search_movies(search_text):
         try:
-            sql = """
-                SELECT movie_id, title, description, movie_image, 
-                       rating, created_at, updated_at
-                FROM movies
-                WHERE title ILIKE %s OR description ILIKE %s
-                ORDER BY rating DESC, created_at DESC
+            sql = f"""
+                SELECT {MovieModel.PAGE_COLUMNS}
+                FROM movies m
+                WHERE m.title ILIKE %s OR m.description ILIKE %s
+                ORDER BY m.rating DESC, m.created_at DESC
             """
             pattern = f"%{search_text}%"
             rows = query(sql, [pattern, pattern])
-            return rows if rows else []
+            return MovieModel._with_posters(rows)
         except Exception as e:
             print(f"Ошибка в search_movies: {e}")
             return []
@@ -54,16 +154,15 @@ class MovieModel:
     def get_movies_by_genre(genre_id):
         """Получить фильмы по жанру - ИСПРАВЛЕННАЯ ВЕРСИЯ"""
         try:
-            sql = """
-                SELECT m.movie_id, m.title, m.description, m.movie_image, 
-                       m.base_price, m.rating, m.created_at, m.updated_at
+            sql = f"""
+                SELECT {MovieModel.PAGE_COLUMNS}
                 FROM movies m
                 JOIN movie_genre mg ON m.movie_id = mg.movie_id
                 WHERE mg.genre_id = %s
                 ORDER BY m.rating DESC
             """
             rows = query(sql, [genre_id])
-            return rows if rows else []
+            return MovieModel._with_posters(rows)
         except Exception as e:
             print(f"❌ Ошибка в get_movies_by_genre: {e}")
             return []
@@ -91,7 +190,8 @@ class MovieModel:
     def get_movie_directors(movie_id):
         """Получить режиссёров фильма"""
         sql = """
-            SELECT d.director_id, d.name || ' ' || d.lastname AS fullname, d.photo
+            SELECT d.director_id, d.name || ' ' || d.lastname AS fullname,
+                   COALESCE(d.photo_thumb, d.photo), NULL AS role, d.photo_hash
             FROM director d
             JOIN movie_director md ON d.director_id = md.director_id
             WHERE md.movie_id = %s
@@ -102,7 +202,8 @@ class MovieModel:
     def get_movie_actors(movie_id):
         """Получить актёров фильма с ролями"""
         sql = """
-            SELECT a.actor_id, a.name || ' ' || a.lastname AS fullname, a.photo, ma.role
+            SELECT a.actor_id, a.name || ' ' || a.lastname AS fullname,
+                   COALESCE(a.photo_thumb, a.photo), ma.role, a.photo_hash
             FROM actor a
             JOIN movie_actor ma ON a.actor_id = ma.actor_id
             WHERE ma.movie_id = %s
@@ -1,160 +1,171 @@
-from core.database import query
+from core.database import query, iter_query
+from core.copy_export import export_query
+from core.excel_export import write_excel_report
 from datetime import datetime, timedelta
 import os
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
 import tempfile
 
 
 class ReportsModel:
-
-    @staticmethod
-    def get_daily_sales_report(days=30):
-        """Отчет по ежедневным продажам (только актуальные билеты)"""
-        sql = f"""
-            SELECT 
-                DATE(t.purchase_date) as date,
-                COUNT(*) as tickets_sold,
-                SUM(t.final_price) as revenue,
-                AVG(t.final_price) as avg_ticket_price
-            FROM ticket t
-            WHERE t.purchase_date >= CURRENT_DATE - INTERVAL '{days} days'
+    REPORT_NAMES = {
+        "sales": "Отчет по продажам",
+        "movies": "Отчет по популярности фильмов",
+        "halls": "Отчет по загрузке залов",
+        "users": "Отчет по активности пользователей",
+        "financial": "Финансовый отчет",
+    }
+
+    # Ежедневные продажи: параметры - дважды число дней
+    DAILY_SALES_SQL = """
+        SELECT 
+            ds.sale_date as date,
+            SUM(ds.tickets) as tickets_sold,
+            SUM(ds.revenue) as revenue,
+            SUM(ds.revenue) / NULLIF(SUM(ds.tickets), 0) as avg_ticket_price
+        FROM daily_sales ds
+        WHERE ds.sale_date >= CURRENT_DATE - %s
+        AND ds.session_date >= CURRENT_DATE - %s
+        GROUP BY ds.sale_date
+        ORDER BY date DESC
+    """
+
+    # Популярность фильмов: без параметров
+    MOVIES_POPULARITY_SQL = """
+        SELECT 
+            m.movie_id,
+            m.title,
+            COUNT(t.ticket_id) as tickets_sold,
+            SUM(t.final_price) as revenue,
+            AVG(t.final_price) as avg_ticket_price,
+            COUNT(DISTINCT s.session_id) as sessions_count,
+            COALESCE(AVG(r.rating), 0) as avg_rating
+        FROM movies m
+        LEFT JOIN session s ON m.movie_id = s.movie_id 
+            AND s.session_time >= CURRENT_DATE - INTERVAL '365 days'  -- Только актуальные сеансы
+        LEFT JOIN ticket t ON s.session_id = t.session_id
+        LEFT JOIN review r ON m.movie_id = r.movie_id
+        WHERE m.movie_id IN (SELECT DISTINCT movie_id FROM session)  -- Только фильмы с сеансами
+        GROUP BY m.movie_id, m.title
+        ORDER BY tickets_sold DESC, revenue DESC
+    """
+
+    # Загрузка залов: параметр - число дней
+    HALLS_UTILIZATION_SQL = """
+        SELECT 
+            h.hall_id,
+            h.hall_name,
+            h.hall_number,
+            COUNT(s.session_id) as total_sessions,
+            COALESCE(SUM(ss.sold_seats), 0) as tickets_sold,
+            SUM(ss.revenue) as revenue,
+            COUNT(DISTINCT s.movie_id) as unique_movies,
+            ROUND(SUM(ss.sold_seats) * 100.0 / NULLIF(SUM(ss.capacity), 0), 2) as avg_occupancy_percent
+        FROM hall h
+        LEFT JOIN session s ON h.hall_id = s.hall_id 
+            AND s.session_time >= CURRENT_DATE - %s
+            AND s.session_time <= CURRENT_DATE + INTERVAL '1 day'  -- Только прошедшие и ближайшие сеансы
+        LEFT JOIN session_stats ss ON s.session_id = ss.session_id
+        GROUP BY h.hall_id, h.hall_name, h.hall_number
+        ORDER BY revenue DESC NULLS LAST
+    """
+
+    # Активность пользователей: параметры - дважды число дней
+    USERS_ACTIVITY_SQL = """
+        SELECT 
+            u.user_id,
+            u.login,
+            u.email,
+            r.role_name,
+            u.created_at,
+            COUNT(t.ticket_id) as tickets_bought,
+            SUM(t.final_price) as total_spent,
+            COUNT(rev.review_id) as reviews_written,
+            MAX(t.purchase_date) as last_activity
+        FROM users u
+        LEFT JOIN roles r ON u.role_id = r.role_id
+        LEFT JOIN ticket t ON u.user_id = t.user_id 
+            AND t.purchase_date >= CURRENT_DATE - %s
             AND t.session_id IN (
                 SELECT session_id FROM session 
-                WHERE session_time >= CURRENT_DATE - INTERVAL '{days} days'
+                WHERE session_time >= CURRENT_DATE - %s
             )
-            GROUP BY DATE(t.purchase_date)
-            ORDER BY date DESC
+        LEFT JOIN review rev ON u.user_id = rev.user_id
+        WHERE u.status = 'Active'  -- Только активные пользователи
+        GROUP BY u.user_id, u.login, u.email, r.role_name, u.created_at
+        ORDER BY total_spent DESC NULLS LAST, tickets_bought DESC
+    """
+
+    # Финансовая сводка одной строкой (из свёртки продаж): параметры - шесть раз число дней
+    FINANCIAL_SUMMARY_SQL = """
+        SELECT 
+            COALESCE(SUM(ds.revenue), 0) as total_revenue,
+            COALESCE(SUM(ds.tickets), 0) as total_tickets,
+            COALESCE(SUM(ds.revenue) / NULLIF(SUM(ds.tickets), 0), 0) as avg_ticket_price,
+            (SELECT COUNT(DISTINCT dc.user_id) FROM daily_customers dc
+             WHERE dc.sale_date >= CURRENT_DATE - %s
+             AND dc.session_date >= CURRENT_DATE - %s) as unique_customers,
+            (SELECT m.title
+             FROM daily_sales pds
+             JOIN movies m ON m.movie_id = pds.movie_id
+             WHERE pds.sale_date >= CURRENT_DATE - %s
+             AND pds.session_date >= CURRENT_DATE - %s
+             GROUP BY m.movie_id, m.title
+             ORDER BY SUM(pds.tickets) DESC
+             LIMIT 1) as popular_movie
+        FROM daily_sales ds
+        WHERE ds.sale_date >= CURRENT_DATE - %s
+        AND ds.session_date >= CURRENT_DATE - %s
+    """
+
+    @staticmethod
+    def get_daily_sales_report(days=30):
+        """Отчет по ежедневным продажам (только актуальные билеты) - из свёртки daily_sales"""
+        return query(ReportsModel.DAILY_SALES_SQL, [days, days]) or []
+
+    @staticmethod
+    def rebuild_daily_sales():
+        """Пересчитать свёртку продаж по таблице ticket (сверка после ручных правок в БД)"""
+        query("SELECT rebuild_daily_sales()")
+        return True
+
+    @staticmethod
+    def get_daily_sales_diff():
         """
-        return query(sql) or []
+        Строки свёртки продаж, расходящиеся с пересчётом по ticket (пустой список - свёртка верна):
+        (свёртка, дата продажи, дата сеанса, ключ, билетов в свёртке, билетов на деле, выручка в свёртке, выручка на деле)
+        """
+        return query("SELECT * FROM daily_sales_diff()") or []
 
     @staticmethod
     def get_movies_popularity_report():
         """Отчет по популярности фильмов (только актуальные данные)"""
-        sql = """
-            SELECT 
-                m.movie_id,
-                m.title,
-                COUNT(t.ticket_id) as tickets_sold,
-                SUM(t.final_price) as revenue,
-                AVG(t.final_price) as avg_ticket_price,
-                COUNT(DISTINCT s.session_id) as sessions_count,
-                COALESCE(AVG(r.rating), 0) as avg_rating
-            FROM movies m
-            LEFT JOIN session s ON m.movie_id = s.movie_id 
-                AND s.session_time >= CURRENT_DATE - INTERVAL '365 days'  -- Только актуальные сеансы
-            LEFT JOIN ticket t ON s.session_id = t.session_id
-            LEFT JOIN review r ON m.movie_id = r.movie_id
-            WHERE m.movie_id IN (SELECT DISTINCT movie_id FROM session)  -- Только фильмы с сеансами
-            GROUP BY m.movie_id, m.title
-            ORDER BY tickets_sold DESC, revenue DESC
-        """
-        return query(sql) or []
+        return query(ReportsModel.MOVIES_POPULARITY_SQL) or []
 
     @staticmethod
     def get_halls_utilization_report(days=30):
-        """Отчет по загрузке залов (только актуальные сеансы)"""
-        sql = f"""
-            SELECT 
-                h.hall_id,
-                h.hall_name,
-                h.hall_number,
-                COUNT(s.session_id) as total_sessions,
-                COUNT(t.ticket_id) as tickets_sold,
-                SUM(t.final_price) as revenue,
-                COUNT(DISTINCT s.movie_id) as unique_movies,
-                ROUND(
-                    COUNT(t.ticket_id) * 100.0 / 
-                    NULLIF(
-                        (SELECT COUNT(*) FROM seat WHERE hall_id = h.hall_id) * 
-                        COUNT(DISTINCT s.session_id), 
-                    0), 
-                2) as avg_occupancy_percent
-            FROM hall h
-            LEFT JOIN session s ON h.hall_id = s.hall_id 
-                AND s.session_time >= CURRENT_DATE - INTERVAL '{days} days'
-                AND s.session_time <= CURRENT_DATE + INTERVAL '1 day'  -- Только прошедшие и ближайшие сеансы
-            LEFT JOIN ticket t ON s.session_id = t.session_id
-            GROUP BY h.hall_id, h.hall_name, h.hall_number
-            ORDER BY revenue DESC NULLS LAST
-        """
-        return query(sql) or []
+        """Отчет по загрузке залов (только актуальные сеансы) - по счётчикам session_stats"""
+        return query(ReportsModel.HALLS_UTILIZATION_SQL, [days]) or []
 
     @staticmethod
     def get_users_activity_report(days=30):
         """Отчет по активности пользователей (только актуальные покупки)"""
-        sql = f"""
-            SELECT 
-                u.user_id,
-                u.login,
-                u.email,
-                r.role_name,
-                u.created_at,
-                COUNT(t.ticket_id) as tickets_bought,
-                SUM(t.final_price) as total_spent,
-                COUNT(rev.review_id) as reviews_written,
-                MAX(t.purchase_date) as last_activity
-            FROM users u
-            LEFT JOIN roles r ON u.role_id = r.role_id
-            LEFT JOIN ticket t ON u.user_id = t.user_id 
-                AND t.purchase_date >= CURRENT_DATE - INTERVAL '{days} days'
-                AND t.session_id IN (
-                    SELECT session_id FROM session 
-                    WHERE session_time >= CURRENT_DATE - INTERVAL '{days} days'
-                )
-            LEFT JOIN review rev ON u.user_id = rev.user_id
-            WHERE u.status = 'Active'  -- Только активные пользователи
-            GROUP BY u.user_id, u.login, u.email, r.role_name, u.created_at
-            ORDER BY total_spent DESC NULLS LAST, tickets_bought DESC
-        """
-        return query(sql) or []
+        return query(ReportsModel.USERS_ACTIVITY_SQL, [days, days]) or []
 
     @staticmethod
     def get_financial_summary_report(days=30):
         """Финансовый отчет (только актуальные данные)"""
         try:
-            # Числовые показатели (только актуальные билеты)
-            numeric_sql = f"""
-                SELECT 
-                    COALESCE(SUM(t.final_price), 0) as total_revenue,
-                    COALESCE(COUNT(*), 0) as total_tickets,
-                    COALESCE(AVG(t.final_price), 0) as avg_ticket_price,
-                    COALESCE(COUNT(DISTINCT user_id), 0) as unique_customers
-                FROM ticket t
-                WHERE t.purchase_date >= CURRENT_DATE - INTERVAL '{days} days'
-                AND t.session_id IN (
-                    SELECT session_id FROM session 
-                    WHERE session_time >= CURRENT_DATE - INTERVAL '{days} days'
-                )
-            """
-            numeric_result = query(numeric_sql)
-
-            # Самый популярный фильм (только актуальные сеансы)
-            popular_movie_sql = f"""
-                SELECT m.title 
-                FROM movies m
-                JOIN session s ON m.movie_id = s.movie_id
-                JOIN ticket t ON s.session_id = t.session_id
-                WHERE t.purchase_date >= CURRENT_DATE - INTERVAL '{days} days'
-                AND s.session_time >= CURRENT_DATE - INTERVAL '{days} days'
-                GROUP BY m.movie_id, m.title
-                ORDER BY COUNT(*) DESC
-                LIMIT 1
-            """
-            popular_movie_result = query(popular_movie_sql)
+            result = query(ReportsModel.FINANCIAL_SUMMARY_SQL, [days] * 6)
 
             # Формируем результат
-            if numeric_result:
-                total_revenue, total_tickets, avg_ticket_price, unique_customers = numeric_result[0]
-                popular_movie = popular_movie_result[0][0] if popular_movie_result else "Нет данных"
-
+            if result:
+                total_revenue, total_tickets, avg_ticket_price, unique_customers, popular_movie = result[0]
                 return [
                     ("Общая выручка", total_revenue),
                     ("Количество билетов", total_tickets),
                     ("Средний чек", avg_ticket_price),
                     ("Уникальных клиентов", unique_customers),
-                    ("Самый популярный фильм", popular_movie)
+                    ("Самый популярный фильм", popular_movie or "Нет данных")
                 ]
             else:
                 return [
@@ -170,72 +181,40 @@ class ReportsModel:
             return []
 
     @staticmethod
-    def create_excel_report(report_data, headers, title, filename_suffix=""):
-        """Создать Excel файл с отчетом"""
+    def report_query(report_type, days=30):
+        """SQL и параметры отчёта по его типу (sales, movies, halls, users, financial)"""
+        queries = {
+            "sales": (ReportsModel.DAILY_SALES_SQL, [days, days]),
+            "movies": (ReportsModel.MOVIES_POPULARITY_SQL, None),
+            "halls": (ReportsModel.HALLS_UTILIZATION_SQL, [days]),
+            "users": (ReportsModel.USERS_ACTIVITY_SQL, [days, days]),
+            "financial": (ReportsModel.FINANCIAL_SUMMARY_SQL, [days] * 6),
+        }
+        return queries[report_type]
+
+    @staticmethod
+    def export_report_copy(report_type, days=30, file_format="csv"):
+        """
+        Выгрузить отчёт в CSV или Parquet через COPY ... TO STDOUT: строки не загружаются в Python,
+        поэтому выгрузка быстрая и на миллионах строк. Столбцы - как в выборке, без оформления Excel.
+        """
+        sql, params = ReportsModel.report_query(report_type, days)
+        filename = f"report_{report_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{file_format}"
+        return export_query(sql, params, os.path.join(tempfile.gettempdir(), filename))
+
+    @staticmethod
+    def create_excel_report(report_data, headers, title, filename_suffix="", progress=None):
+        """
+        Создать Excel файл с отчетом. report_data - список или итератор строк
+        (например, iter_query): строки пишутся в файл потоково, не накапливаясь в памяти.
+        progress(count) - см. write_excel_report.
+        """
         try:
-            # Создаем рабочую книгу
-            wb = Workbook()
-            ws = wb.active
-            ws.title = "Отчет"
-
-            # Стили
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            title_font = Font(bold=True, size=14)
-            border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-            center_align = Alignment(horizontal='center', vertical='center')
-
-            # Заголовок отчета
-            ws.merge_cells('A1:H1')
-            ws['A1'] = f"Отчет: {title}"
-            ws['A1'].font = title_font
-            ws['A1'].alignment = center_align
-
-            # Дата генерации
-            ws.merge_cells('A2:H2')
-            ws['A2'] = f"Сгенерирован: {datetime.now().strftime('%d.%m.%Y %H:%M')}"
-            ws['A2'].alignment = center_align
-
-            # Заголовки столбцов
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row=4, column=col, value=header)
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = center_align
-                cell.border = border
-
-            # Данные
-            for row, data_row in enumerate(report_data, 5):
-                for col, value in enumerate(data_row, 1):
-                    cell = ws.cell(row=row, column=col, value=value)
-                    cell.border = border
-                    if isinstance(value, (int, float)) and col > 1:  # Числовые данные выравниваем по правому краю
-                        cell.alignment = Alignment(horizontal='right')
-
-            # Автоматическая ширина столбцов
-            for col in range(1, len(headers) + 1):
-                max_length = 0
-                column = get_column_letter(col)
-                for cell in ws[column]:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 50)
-                ws.column_dimensions[column].width = adjusted_width
-
-            # Создаем временный файл
             temp_dir = tempfile.gettempdir()
             filename = f"report_{filename_suffix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
             filepath = os.path.join(temp_dir, filename)
 
-            wb.save(filepath)
+            write_excel_report(filepath, report_data, headers, title, progress=progress)
             return filepath
 
         except Exception as e:
@@ -243,7 +222,7 @@ class ReportsModel:
             return None
 
     @staticmethod
-    def export_daily_sales_report(days=30):
+    def export_daily_sales_report(days=30, progress=None):
         """Экспорт отчета по продажам в Excel"""
         data = ReportsModel.get_daily_sales_report(days)
         headers = ["Дата", "Билетов продано", "Выручка (руб.)", "Средний чек (руб.)"]
@@ -259,10 +238,10 @@ class ReportsModel:
                 float(row[3] or 0)
             ])
 
-        return ReportsModel.create_excel_report(formatted_data, headers, title, "sales")
+        return ReportsModel.create_excel_report(formatted_data, headers, title, "sales", progress=progress)
 
     @staticmethod
-    def export_movies_popularity_report():
+    def export_movies_popularity_report(progress=None):
         """Экспорт отчета по популярности фильмов в Excel"""
         data = ReportsModel.get_movies_popularity_report()
         headers = ["ID", "Название фильма", "Билетов продано", "Выручка (руб.)",
@@ -280,10 +259,11 @@ class ReportsModel:
                 float(row[6] or 0)
             ])
 
-        return ReportsModel.create_excel_report(formatted_data, headers, "Популярность фильмов", "movies")
+        return ReportsModel.create_excel_report(formatted_data, headers, "Популярность фильмов", "movies",
+                                                progress=progress)
 
     @staticmethod
-    def export_halls_utilization_report(days=30):
+    def export_halls_utilization_report(days=30, progress=None):
         """Экспорт отчета по загрузке залов в Excel"""
         data = ReportsModel.get_halls_utilization_report(days)
         headers = ["ID", "Название зала", "Номер", "Всего сеансов", "Билетов продано",
@@ -302,34 +282,34 @@ class ReportsModel:
                 float(row[7] or 0)
             ])
 
-        return ReportsModel.create_excel_report(formatted_data, headers, f"Загрузка залов за {days} дней", "halls")
+        return ReportsModel.create_excel_report(formatted_data, headers, f"Загрузка залов за {days} дней", "halls",
+                                                progress=progress)
 
     @staticmethod
-    def export_users_activity_report(days=30):
-        """Экспорт отчета по активности пользователей в Excel"""
-        data = ReportsModel.get_users_activity_report(days)
+    def export_users_activity_report(days=30, progress=None):
+        """Экспорт отчета по активности пользователей в Excel (строки читаются серверным курсором)"""
+        data = iter_query(ReportsModel.USERS_ACTIVITY_SQL, [days, days])
         headers = ["ID", "Логин", "Email", "Роль", "Дата регистрации",
                    "Куплено билетов", "Потрачено (руб.)", "Написано отзывов", "Последняя активность"]
 
-        formatted_data = []
-        for row in data:
-            formatted_data.append([
-                row[0],
-                row[1],
-                row[2],
-                row[3],
-                row[4].strftime('%d.%m.%Y') if row[4] else '',
-                row[5] or 0,
-                float(row[6] or 0),
-                row[7] or 0,
-                row[8].strftime('%d.%m.%Y %H:%M') if row[8] else 'Нет активности'
-            ])
+        # Генератор, а не список: строки форматируются по мере записи в файл
+        formatted_data = ([
+            row[0],
+            row[1],
+            row[2],
+            row[3],
+            row[4].strftime('%d.%m.%Y') if row[4] else '',
+            row[5] or 0,
+            float(row[6] or 0),
+            row[7] or 0,
+            row[8].strftime('%d.%m.%Y %H:%M') if row[8] else 'Нет активности'
+        ] for row in data)
 
         return ReportsModel.create_excel_report(formatted_data, headers, f"Активность пользователей за {days} дней",
-                                                "users")
+                                                "users", progress=progress)
 
     @staticmethod
-    def export_financial_summary_report(days=30):
+    def export_financial_summary_report(days=30, progress=None):
         """Экспорт финансового отчета в Excel"""
         data = ReportsModel.get_financial_summary_report(days)
         headers = ["Показатель", "Значение"]
@@ -345,19 +325,59 @@ class ReportsModel:
             formatted_data.append([row[0], value])
 
         return ReportsModel.create_excel_report(formatted_data, headers, f"Финансовый отчет за {days} дней",
-                                                "financial")
+                                                "financial", progress=progress)
+
+    @staticmethod
+    def export_report(report_type, days=30, file_format="xlsx", progress=None):
+        """Построить отчёт report_type (ключ REPORT_NAMES) в формате xlsx, csv или parquet; путь к файлу или None"""
+        if file_format != "xlsx":
+            # CSV/Parquet - выгрузка сырой выборки через COPY, без оформления
+            return ReportsModel.export_report_copy(report_type, days, file_format)
+        if report_type == "sales":
+            return ReportsModel.export_daily_sales_report(days, progress)
+        if report_type == "movies":
+            return ReportsModel.export_movies_popularity_report(progress)
+        if report_type == "halls":
+            return ReportsModel.export_halls_utilization_report(days, progress)
+        if report_type == "users":
+            return ReportsModel.export_users_activity_report(days, progress)
+        if report_type == "financial":
+            return ReportsModel.export_financial_summary_report(days, progress)
+        raise ValueError(f"Неизвестный тип отчета: {report_type}")
 
     @staticmethod
     def get_realtime_stats():
-        """Статистика в реальном времени (только актуальные данные)"""
+        """Статистика в реальном времени (только актуальные данные); билеты и выручка за сегодня - из свёртки"""
         sql = """
             SELECT 
-                (SELECT COUNT(*) FROM movies WHERE movie_id IN 
-                    (SELECT DISTINCT movie_id FROM session WHERE session_time >= CURRENT_DATE)) as active_movies,
+                (SELECT COUNT(DISTINCT movie_id) FROM session WHERE session_time >= CURRENT_DATE) as active_movies,
                 (SELECT COUNT(*) FROM session WHERE session_time >= CURRENT_DATE) as upcoming_sessions,
-                (SELECT COUNT(*) FROM ticket WHERE purchase_date >= CURRENT_DATE) as today_tickets,
-                (SELECT COALESCE(SUM(final_price), 0) FROM ticket WHERE purchase_date >= CURRENT_DATE) as today_revenue,
+                COALESCE(SUM(ds.tickets), 0) as today_tickets,
+                COALESCE(SUM(ds.revenue), 0) as today_revenue,
                 (SELECT COUNT(*) FROM users WHERE status = 'Active') as active_users
+            FROM daily_sales ds
+            WHERE ds.sale_date = CURRENT_DATE
         """
         result = query(sql)
-        return result[0] if result else (0, 0, 0, 0, 0)
\ No newline at end of file
+        return result[0] if result else (0, 0, 0, 0, 0)
+
+    @staticmethod
+    def get_realtime_seed():
+        """
+        Начальные значения счётчиков core.realtime_stats: (день сервера, снимок транзакций txid_current_snapshot(),
+        билетов сегодня, выручка сегодня, активных пользователей, [(session_id, movie_id)] сеансов с сегодняшнего дня)
+        или None при ошибке. Всё читается одним оператором, то есть из одного снимка.
+        """
+        rows = query("""
+            SELECT
+                CURRENT_DATE,
+                txid_current_snapshot()::text,
+                (SELECT COALESCE(SUM(tickets), 0) FROM daily_sales WHERE sale_date = CURRENT_DATE),
+                (SELECT COALESCE(SUM(revenue), 0) FROM daily_sales WHERE sale_date = CURRENT_DATE),
+                (SELECT COUNT(*) FROM users WHERE status = 'Active'),
+                (SELECT COALESCE(json_agg(json_build_array(session_id, movie_id)), '[]')
+                 FROM session WHERE session_time >= CURRENT_DATE)
+        """)
+        if not rows:
+            return None
+        return rows[0]
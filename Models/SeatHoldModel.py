@@ -0,0 +1,61 @@
+from Models.SeatMapModel import SeatMapModel
+from core.config import SEAT_HOLD_TTL
+from core.database import query
+
+
+class SeatHoldModel:
+    """
+    Временная бронь мест (таблица seat_hold) на время выбора в схеме зала.
+    Бронь живёт SEAT_HOLD_TTL секунд, пока её не продлят; просроченная бронь никому не мешает
+    и перезаписывается, а purge_expired удаляет её и тем рассылает RELEASE.
+    """
+
+    @staticmethod
+    def hold_seats(session_id, seat_ids, user_id, ttl=SEAT_HOLD_TTL):
+        """
+        Взять или продлить бронь мест одним запросом.
+        Возвращает список seat_id, которые удалось закрепить за user_id
+        (не проданные и не удерживаемые другим покупателем).
+        """
+        seat_ids = list(seat_ids)
+        if not seat_ids:
+            return []
+
+        sql = """
+            INSERT INTO seat_hold (session_id, seat_id, user_id, expires_at)
+            SELECT %s, s.seat_id, %s, CURRENT_TIMESTAMP + %s * INTERVAL '1 second'
+            FROM unnest(%s::int[]) AS s(seat_id)
+            WHERE NOT EXISTS (
+                SELECT 1 FROM ticket t WHERE t.session_id = %s AND t.seat_id = s.seat_id
+            )
+            ON CONFLICT (session_id, seat_id) DO UPDATE
+            SET user_id = EXCLUDED.user_id, expires_at = EXCLUDED.expires_at
+            WHERE seat_hold.user_id = EXCLUDED.user_id
+               OR seat_hold.expires_at < CURRENT_TIMESTAMP
+            RETURNING seat_id
+        """
+        rows = query(sql, [session_id, user_id, ttl, seat_ids, session_id]) or []
+        held = [row[0] for row in rows]
+        SeatMapModel.mark_held(session_id, held, user_id)
+        return held
+
+    @staticmethod
+    def release_seats(session_id, seat_ids, user_id):
+        """Снять свою бронь с мест (отмена выбора)"""
+        seat_ids = list(seat_ids)
+        if not seat_ids:
+            return
+        query("""
+            DELETE FROM seat_hold
+            WHERE session_id = %s AND user_id = %s AND seat_id = ANY(%s)
+        """, [session_id, user_id, seat_ids])
+        SeatMapModel.mark_unheld(session_id, seat_ids)
+
+    @staticmethod
+    def purge_expired():
+        """
+        Удалить просроченную бронь. Продления не рассылаются, поэтому другие кассы узнают
+        об истечении брони только по RELEASE от этого удаления. Возвращает число удалённых записей.
+        """
+        rows = query("DELETE FROM seat_hold WHERE expires_at < CURRENT_TIMESTAMP RETURNING seat_id")
+        return len(rows) if rows else 0
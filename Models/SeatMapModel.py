@@ -0,0 +1,327 @@
+import threading
+from array import array
+from collections import OrderedDict
+
+from PyQt6.QtCore import Qt
+
+from core.database import query
+from core.seat_notifications import CHANNEL, seat_listener
+
+# Сколько сеансов держать в кэше занятости
+MAX_CACHED_SESSIONS = 256
+
+
+class HallLayout:
+    """
+    Неизменяемая схема зала: места в порядке (ряд, номер) в плоских массивах.
+    version - отметка изменения зала и его мест; при несовпадении схема строится заново.
+    """
+    __slots__ = ('hall_id', 'version', 'seat_ids', 'rows', 'numbers', 'extra_prices',
+                 'row_bounds', '_index')
+
+    def __init__(self, hall_id, version, seats):
+        # seats - строки (seat_id, row_number, seat_number, seat_extra_price), отсортированные по ряду и номеру
+        self.hall_id = hall_id
+        self.version = version
+        self.seat_ids = array('i', (seat[0] for seat in seats))
+        self.rows = array('i', (seat[1] for seat in seats))
+        self.numbers = array('i', (seat[2] for seat in seats))
+        self.extra_prices = array('d', (float(seat[3] or 0) for seat in seats))
+        self._index = {seat_id: i for i, seat_id in enumerate(self.seat_ids)}
+
+        # Границы рядов: (номер ряда, начало, конец) - индексы в массивах выше
+        bounds = []
+        start = 0
+        for i in range(1, len(self.rows) + 1):
+            if i == len(self.rows) or self.rows[i] != self.rows[start]:
+                bounds.append((self.rows[start], start, i))
+                start = i
+        self.row_bounds = tuple(bounds)
+
+    def __len__(self):
+        return len(self.seat_ids)
+
+    def index_of(self, seat_id):
+        return self._index.get(seat_id)
+
+    def seat(self, index):
+        """Место в формате get_all_seats_for_hall: (seat_id, row_number, seat_number, seat_extra_price)"""
+        return self.seat_ids[index], self.rows[index], self.numbers[index], self.extra_prices[index]
+
+
+class SessionOccupancy:
+    """
+    Битовая карта проданных мест сеанса; индексы битов - индексы мест в HallLayout.
+    Временная бронь (seat_hold) хранится рядом: индекс места -> user_id. Срока у брони в кэше нет:
+    продления не рассылаются, бронь снимает уведомление RELEASE (отмена выбора или purge_expired).
+    """
+
+    def __init__(self, session_id, layout, occupied_seat_ids=(), holds=()):
+        self.session_id = session_id
+        self.layout = layout
+        self.bits = bytearray((len(layout) + 7) // 8)
+        self.holds = {}
+        self._lock = threading.Lock()
+        self.occupy(occupied_seat_ids)
+        for seat_id, user_id in holds:
+            self.hold([seat_id], user_id)
+
+    def is_occupied(self, index):
+        return bool(self.bits[index >> 3] & (1 << (index & 7)))
+
+    def occupy(self, seat_ids):
+        with self._lock:
+            for seat_id in seat_ids:
+                index = self.layout.index_of(seat_id)
+                if index is not None:
+                    self.bits[index >> 3] |= 1 << (index & 7)
+                    # Проданное место больше не удерживается
+                    self.holds.pop(index, None)
+
+    def release(self, seat_ids):
+        with self._lock:
+            for seat_id in seat_ids:
+                index = self.layout.index_of(seat_id)
+                if index is not None:
+                    self.bits[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+
+    def hold(self, seat_ids, user_id):
+        with self._lock:
+            for seat_id in seat_ids:
+                index = self.layout.index_of(seat_id)
+                if index is not None:
+                    self.holds[index] = user_id
+
+    def unhold(self, seat_ids):
+        with self._lock:
+            for seat_id in seat_ids:
+                index = self.layout.index_of(seat_id)
+                if index is not None:
+                    self.holds.pop(index, None)
+
+    def held_by(self, index):
+        """user_id брони места или None"""
+        return self.holds.get(index)
+
+    def is_available(self, index, user_id=None):
+        """Место не продано и не удерживается другим покупателем"""
+        if self.is_occupied(index):
+            return False
+        holder = self.held_by(index)
+        return holder is None or holder == user_id
+
+    def free_indexes(self):
+        return [i for i in range(len(self.layout)) if not self.is_occupied(i)]
+
+    def occupied_indexes(self):
+        return [i for i in range(len(self.layout)) if self.is_occupied(i)]
+
+
+class PricingSnapshot:
+    """
+    Цены сеанса на момент открытия выбора мест: базовая цена фильма, наценка зала
+    и наценки мест из схемы зала. Итог считается локально, как в триггере calc_ticket_price.
+    """
+    __slots__ = ('session_id', 'base_price', 'hall_extra', 'layout')
+
+    def __init__(self, session_id, base_price, hall_extra, layout):
+        self.session_id = session_id
+        self.base_price = float(base_price or 0)
+        self.hall_extra = float(hall_extra or 0)
+        self.layout = layout
+
+    def seat_price(self, seat_id):
+        index = self.layout.index_of(seat_id)
+        seat_extra = self.layout.extra_prices[index] if index is not None else 0.0
+        return self.base_price + self.hall_extra + seat_extra
+
+    def total(self, seat_ids):
+        return sum(self.seat_price(seat_id) for seat_id in seat_ids)
+
+    def __eq__(self, other):
+        return (isinstance(other, PricingSnapshot)
+                and self.session_id == other.session_id
+                and self.base_price == other.base_price
+                and self.hall_extra == other.hall_extra
+                and self.layout.version == other.layout.version)
+
+    def __hash__(self):
+        return hash((self.session_id, self.base_price, self.hall_extra, self.layout.version))
+
+
+class SeatMapModel:
+    _layouts = {}
+    _sessions = OrderedDict()
+    _lock = threading.Lock()
+    # Растёт при каждом сбросе кэша: загрузка, начатая до сброса, свой снимок в кэш не кладёт
+    _generation = 0
+    _following = False
+
+    @staticmethod
+    def follow_changes():
+        """
+        Подписать кэш занятости на общий слушатель LISTEN/NOTIFY (вызывать из GUI-потока).
+        Уведомления о местах применяются к битовым картам прямо в потоке слушателя - до того,
+        как представления получат ticket_changed; после переподключения кэш сбрасывается,
+        т.к. изменения за время обрыва пропущены.
+        """
+        if SeatMapModel._following:
+            return
+        SeatMapModel._following = True
+        listener = seat_listener()
+        listener.notification.connect(SeatMapModel.on_notification, Qt.ConnectionType.DirectConnection)
+        listener.listening.connect(SeatMapModel.invalidate, Qt.ConnectionType.DirectConnection)
+
+    @staticmethod
+    def on_notification(channel, data):
+        """Уведомление о месте (канал ticket_changes): отметить место в битовой карте сеанса"""
+        if channel != CHANNEL:
+            return
+        try:
+            op = data["op"]
+            session_id = int(data["session_id"])
+            seat_ids = [int(data["seat_id"])]
+            user_id = int(data.get("user_id") or 0)
+        except (ValueError, KeyError, TypeError):
+            return  # слушатель уже сообщил о некорректном уведомлении
+
+        if op == "INSERT":
+            SeatMapModel.mark_booked(session_id, seat_ids)
+        elif op == "DELETE":
+            SeatMapModel.mark_released(session_id, seat_ids)
+        elif op == "HOLD":
+            SeatMapModel.mark_held(session_id, seat_ids, user_id)
+        elif op == "RELEASE":
+            SeatMapModel.mark_unheld(session_id, seat_ids)
+
+    @staticmethod
+    def invalidate():
+        """Сбросить кэш занятости сеансов (схемы залов проверяются по версии и остаются)"""
+        with SeatMapModel._lock:
+            SeatMapModel._generation += 1
+            SeatMapModel._sessions.clear()
+
+    @staticmethod
+    def load(session_id):
+        """
+        Схема зала и занятость сеанса. Один запрос даёт версию схемы зала и занятые места;
+        места зала читаются из БД только если схема изменилась или ещё не в кэше.
+        Возвращает SessionOccupancy (схема - в .layout) или None, если сеанса нет.
+        """
+        generation = SeatMapModel._generation
+        sql = """
+            SELECT s.hall_id,
+                   GREATEST(h.updated_at, (SELECT MAX(updated_at) FROM seat WHERE hall_id = s.hall_id)),
+                   (SELECT COUNT(*) FROM seat WHERE hall_id = s.hall_id),
+                   ARRAY(SELECT seat_id FROM ticket WHERE session_id = s.session_id),
+                   (SELECT json_agg(json_build_array(seat_id, user_id))
+                    FROM seat_hold
+                    WHERE session_id = s.session_id AND expires_at > CURRENT_TIMESTAMP)
+            FROM session s
+            JOIN hall h ON s.hall_id = h.hall_id
+            WHERE s.session_id = %s
+        """
+        rows = query(sql, [session_id])
+        if not rows:
+            return None
+        hall_id, updated_at, seats_count, occupied_ids, holds = rows[0]
+
+        layout = SeatMapModel.get_layout(hall_id, (updated_at, seats_count))
+        occupancy = SessionOccupancy(session_id, layout, occupied_ids or [], holds or [])
+        with SeatMapModel._lock:
+            if generation != SeatMapModel._generation:
+                return occupancy
+            SeatMapModel._sessions[session_id] = occupancy
+            SeatMapModel._sessions.move_to_end(session_id)
+            while len(SeatMapModel._sessions) > MAX_CACHED_SESSIONS:
+                SeatMapModel._sessions.popitem(last=False)
+        return occupancy
+
+    @staticmethod
+    def get_layout(hall_id, version):
+        """Схема зала из кэша, если версия совпадает, иначе - из БД"""
+        layout = SeatMapModel._layouts.get(hall_id)
+        if layout is not None and layout.version == version:
+            return layout
+
+        seats = query("""
+            SELECT seat_id, row_number, seat_number, seat_extra_price
+            FROM seat
+            WHERE hall_id = %s
+            ORDER BY row_number, seat_number
+        """, [hall_id]) or []
+        layout = HallLayout(hall_id, version, seats)
+        with SeatMapModel._lock:
+            SeatMapModel._layouts[hall_id] = layout
+        return layout
+
+    @staticmethod
+    def get_occupancy(session_id):
+        """Занятость из кэша; при первом обращении к сеансу - загрузка"""
+        with SeatMapModel._lock:
+            occupancy = SeatMapModel._sessions.get(session_id)
+        if occupancy is not None:
+            return occupancy
+        return SeatMapModel.load(session_id)
+
+    @staticmethod
+    def get_cached_occupancy(session_id):
+        """Занятость из кэша без запроса к БД (None, если сеанса в кэше нет)"""
+        with SeatMapModel._lock:
+            return SeatMapModel._sessions.get(session_id)
+
+    @staticmethod
+    def mark_booked(session_id, seat_ids):
+        """Отметить места занятыми после бронирования (без запроса к БД)"""
+        with SeatMapModel._lock:
+            occupancy = SeatMapModel._sessions.get(session_id)
+        if occupancy is not None:
+            occupancy.occupy(seat_ids)
+
+    @staticmethod
+    def mark_released(session_id, seat_ids):
+        """Освободить места после отмены билетов"""
+        with SeatMapModel._lock:
+            occupancy = SeatMapModel._sessions.get(session_id)
+        if occupancy is not None:
+            occupancy.release(seat_ids)
+
+    @staticmethod
+    def mark_held(session_id, seat_ids, user_id):
+        """Отметить временную бронь мест"""
+        with SeatMapModel._lock:
+            occupancy = SeatMapModel._sessions.get(session_id)
+        if occupancy is not None:
+            occupancy.hold(seat_ids, user_id)
+
+    @staticmethod
+    def mark_unheld(session_id, seat_ids):
+        """Снять отметку временной брони"""
+        with SeatMapModel._lock:
+            occupancy = SeatMapModel._sessions.get(session_id)
+        if occupancy is not None:
+            occupancy.unhold(seat_ids)
+
+    @staticmethod
+    def get_pricing(session_id, layout=None):
+        """
+        Снимок цен сеанса. layout - уже загруженная схема зала; если не передана
+        или устарела, берётся актуальная.
+        """
+        rows = query("""
+            SELECT m.base_price, h.hall_extra_price, h.hall_id,
+                   GREATEST(h.updated_at, (SELECT MAX(updated_at) FROM seat WHERE hall_id = h.hall_id)),
+                   (SELECT COUNT(*) FROM seat WHERE hall_id = h.hall_id)
+            FROM session s
+            JOIN movies m ON s.movie_id = m.movie_id
+            JOIN hall h ON s.hall_id = h.hall_id
+            WHERE s.session_id = %s
+        """, [session_id])
+        if not rows:
+            return None
+        base_price, hall_extra, hall_id, updated_at, seats_count = rows[0]
+
+        version = (updated_at, seats_count)
+        if layout is None or layout.hall_id != hall_id or layout.version != version:
+            layout = SeatMapModel.get_layout(hall_id, version)
+        return PricingSnapshot(session_id, base_price, hall_extra, layout)
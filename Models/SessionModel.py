@@ -3,13 +3,15 @@ from core.database import query
 class SessionModel:
     @staticmethod
     def get_sessions_by_movie(movie_id):
-        """Получить сеансы для конкретного фильма"""
+        """Получить сеансы для конкретного фильма (с числом проданных мест и вместимостью)"""
         sql = """
-            SELECT s.session_id, m.title, m.movie_image, h.hall_name, 
-                   s.session_time, m.base_price + h.hall_extra_price as price
+            SELECT s.session_id, m.title, m.image_hash, h.hall_name, 
+                   s.session_time, m.base_price + h.hall_extra_price as price,
+                   COALESCE(ss.sold_seats, 0), COALESCE(ss.capacity, h.capacity)
             FROM session s
             JOIN movies m ON s.movie_id = m.movie_id
             JOIN hall h ON s.hall_id = h.hall_id
+            LEFT JOIN session_stats ss ON s.session_id = ss.session_id
             WHERE m.movie_id = %s AND s.session_time > CURRENT_TIMESTAMP
             ORDER BY s.session_time
         """
@@ -51,10 +53,11 @@ class SessionModel:
         sql = """
             SELECT s.session_id, m.title, h.hall_name, s.session_time,
                    m.base_price + h.hall_extra_price as price,
-                   s.created_at
+                   s.created_at, ss.sold_seats, ss.capacity, ss.revenue
             FROM session s
             JOIN movies m ON s.movie_id = m.movie_id
             JOIN hall h ON s.hall_id = h.hall_id
+            LEFT JOIN session_stats ss ON s.session_id = ss.session_id
             ORDER BY s.session_time DESC
         """
         return query(sql) or []
\ No newline at end of file
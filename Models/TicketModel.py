@@ -1,5 +1,15 @@
 from Models.LogModel import LogModel
-from core.database import query
+from Models.SeatMapModel import SeatMapModel
+from core.database import query, transaction
+
+
+class _SeatConflict(Exception):
+    """Часть мест уже занята - откатываем всю бронь"""
+
+    def __init__(self, seat_ids):
+        super().__init__(f"Места уже заняты: {seat_ids}")
+        self.seat_ids = seat_ids
+
 
 class TicketModel:
     @staticmethod
@@ -13,29 +23,85 @@ class TicketModel:
 
         if result:
             ticket_id = result[0][0]
+            SeatMapModel.mark_booked(session_id, [seat_id])
             LogModel.log_ticket_purchase(user_id, ticket_id, session_id, 1)
             return ticket_id
         return None
 
     @staticmethod
-    def get_user_tickets(user_id):
-        """Получить билеты пользователя"""
+    def create_tickets_bulk(session_id, user_id, seat_ids):
+        """
+        Забронировать несколько мест одной транзакцией: один INSERT на все места и одна запись в журнал.
+        Всё или ничего. Возвращает (ticket_ids, conflicting_seat_ids):
+        при конфликте билеты не создаются, а во втором списке - уже занятые места
+        или места, которые сейчас удерживает другой покупатель (seat_hold).
+        """
+        seat_ids = list(dict.fromkeys(seat_ids))
+        if not seat_ids:
+            return [], []
+
         sql = """
-            SELECT t.ticket_id, m.title, h.hall_name, s.session_time,
-                   st.row_number, st.seat_number, t.final_price,
-                   t.purchase_date, t.final_price
-            FROM ticket t
-            JOIN session s ON t.session_id = s.session_id
-            JOIN movies m ON s.movie_id = m.movie_id
-            JOIN hall h ON s.hall_id = h.hall_id
-            JOIN seat st ON t.seat_id = st.seat_id
-            WHERE t.user_id = %s
-            ORDER BY s.session_time DESC
+            INSERT INTO ticket (session_id, user_id, seat_id)
+            SELECT %s, %s, seat_id
+            FROM unnest(%s::int[]) AS s(seat_id)
+            WHERE NOT EXISTS (
+                SELECT 1 FROM seat_hold sh
+                WHERE sh.session_id = %s AND sh.seat_id = s.seat_id
+                AND sh.user_id <> %s AND sh.expires_at > CURRENT_TIMESTAMP
+            )
+            ON CONFLICT ON CONSTRAINT unique_session_seat DO NOTHING
+            RETURNING ticket_id, seat_id
         """
+        try:
+            with transaction():
+                rows = query(sql, [session_id, user_id, seat_ids, session_id, user_id]) or []
+                booked = {seat_id: ticket_id for ticket_id, seat_id in rows}
+
+                conflicts = [seat_id for seat_id in seat_ids if seat_id not in booked]
+                if conflicts:
+                    raise _SeatConflict(conflicts)
+
+                ticket_ids = [booked[seat_id] for seat_id in seat_ids]
+                # Места выкуплены - своя временная бронь больше не нужна
+                query("DELETE FROM seat_hold WHERE session_id = %s AND seat_id = ANY(%s)",
+                      [session_id, seat_ids])
+                LogModel.log_ticket_purchase_bulk(user_id, ticket_ids, session_id)
+            SeatMapModel.mark_booked(session_id, seat_ids)
+            return ticket_ids, []
+
+        except _SeatConflict as e:
+            return [], e.seat_ids
+        except Exception as e:
+            print(f"Ошибка при бронировании: {e}")
+            return [], []
+
+    USER_TICKET_SQL = """
+        SELECT t.ticket_id, m.title, h.hall_name, s.session_time,
+               st.row_number, st.seat_number, t.final_price,
+               t.purchase_date, t.final_price
+        FROM ticket t
+        JOIN session s ON t.session_id = s.session_id
+        JOIN movies m ON s.movie_id = m.movie_id
+        JOIN hall h ON s.hall_id = h.hall_id
+        JOIN seat st ON t.seat_id = st.seat_id
+    """
+
+    @staticmethod
+    def get_user_tickets(user_id):
+        """Получить билеты пользователя"""
+        sql = TicketModel.USER_TICKET_SQL + " WHERE t.user_id = %s ORDER BY s.session_time DESC"
         return query(sql, [user_id]) or []
 
     @staticmethod
-    def get_available_seats(session_id):
+    def get_user_ticket(ticket_id):
+        """Один билет в формате get_user_tickets - для точечного обновления списка"""
+        sql = TicketModel.USER_TICKET_SQL + " WHERE t.ticket_id = %s"
+        rows = query(sql, [ticket_id])
+        return rows[0] if rows else None
+
+    @staticmethod
+    def get_available_seats(session_id, user_id=None):
+        """Свободные места: не проданы и не удерживаются другим покупателем"""
         try:
             sql = """
                 SELECT s.seat_id, s.row_number, s.seat_number, s.seat_extra_price,
@@ -47,9 +113,15 @@ class TicketModel:
                 AND s.seat_id NOT IN (
                     SELECT seat_id FROM ticket WHERE session_id = %s
                 )
+                AND NOT EXISTS (
+                    SELECT 1 FROM seat_hold sh
+                    WHERE sh.session_id = %s AND sh.seat_id = s.seat_id
+                    AND sh.expires_at > CURRENT_TIMESTAMP
+                    AND sh.user_id IS DISTINCT FROM %s
+                )
                 ORDER BY s.row_number, s.seat_number
             """
-            result = query(sql, [session_id, session_id]) or []
+            result = query(sql, [session_id, session_id, session_id, user_id]) or []
 
             return result
         except Exception as e:
@@ -58,25 +130,34 @@ class TicketModel:
 
     @staticmethod
     def get_occupied_seats(session_id):
-        """Получить занятые места для сеанса"""
-        sql = """
-            SELECT s.seat_id, s.row_number, s.seat_number
-            FROM seat s
-            JOIN ticket t ON s.seat_id = t.seat_id
-            WHERE t.session_id = %s
-            ORDER BY s.row_number, s.seat_number
-        """
-        return query(sql, [session_id]) or []
+        """Получить занятые места для сеанса (по битовой карте SeatMapModel)"""
+        occupancy = SeatMapModel.get_occupancy(session_id)
+        if occupancy is None:
+            return []
+        layout = occupancy.layout
+        return [(layout.seat_ids[i], layout.rows[i], layout.numbers[i]) for i in occupancy.occupied_indexes()]
 
     @staticmethod
-    def is_seat_available(session_id, seat_id):
-        sql = """
-            SELECT COUNT(*) 
-            FROM ticket 
-            WHERE session_id = %s AND seat_id = %s
+    def is_seat_available(session_id, seat_id, user_id=None):
         """
-        result = query(sql, [session_id, seat_id])
-        return result[0][0] == 0 if result else True
+        Свободно ли место для user_id по кэшу занятости (с учётом временной брони).
+        Окончательную проверку делает create_tickets_bulk.
+        """
+        occupancy = SeatMapModel.get_occupancy(session_id)
+        if occupancy is None:
+            return True
+        index = occupancy.layout.index_of(seat_id)
+        return index is None or occupancy.is_available(index, user_id)
+
+    @staticmethod
+    def get_sold_seat_ids(session_id, seat_ids):
+        """Какие из мест seat_ids уже проданы на сеанс (по БД, не по кэшу)"""
+        seat_ids = list(seat_ids)
+        if not seat_ids:
+            return []
+        rows = query("SELECT seat_id FROM ticket WHERE session_id = %s AND seat_id = ANY(%s)",
+                     [session_id, seat_ids]) or []
+        return [row[0] for row in rows]
 
     @staticmethod
     def get_ticket_by_id(ticket_id):
@@ -93,7 +174,7 @@ class TicketModel:
                     st.seat_number,
                     t.final_price,
                     t.purchase_date,
-                    m.movie_image,
+                    m.image_hash,
                     s.session_id,
                     m.movie_id,
                     t.user_id
@@ -124,10 +205,12 @@ class TicketModel:
                 user_id = ticket_info[0][0]
 
             # Удаляем билет
-            sql = "DELETE FROM ticket WHERE ticket_id = %s RETURNING ticket_id"
+            sql = "DELETE FROM ticket WHERE ticket_id = %s RETURNING ticket_id, session_id, seat_id"
             result = query(sql, [ticket_id])
 
             if result:
+                _, session_id, seat_id = result[0]
+                SeatMapModel.mark_released(session_id, [seat_id])
                 LogModel.log_ticket_cancel(user_id, ticket_id)
                 return True
             else:
@@ -145,7 +228,7 @@ class TicketModel:
         """Получить информацию о сеансе"""
         sql = """
             SELECT s.session_id, m.title, m.base_price, h.hall_name, 
-                   h.hall_extra_price, s.session_time, m.movie_image,
+                   h.hall_extra_price, s.session_time, m.image_hash,
                    h.hall_id
             FROM session s
             JOIN movies m ON s.movie_id = m.movie_id
@@ -193,6 +276,49 @@ class TicketModel:
 
         return query(sql) or []
 
+    @staticmethod
+    def export_query(date_from=None, date_to=None, status="all"):
+        """
+        SQL и параметры выгрузки билетов (для COPY): те же фильтры, что в админ-панели,
+        даты и суммы - без форматирования. date_to включительно; status - all, active или used.
+        Без ORDER BY: на миллионах строк сортировка заняла бы дольше самой выгрузки.
+        """
+        conditions = []
+        params = []
+        if date_from is not None:
+            conditions.append("t.purchase_date >= %s")
+            params.append(date_from)
+        if date_to is not None:
+            conditions.append("t.purchase_date < %s::date + 1")
+            params.append(date_to)
+        if status == "active":
+            conditions.append("s.session_time > NOW()")
+        elif status == "used":
+            conditions.append("s.session_time <= NOW()")
+
+        sql = """
+            SELECT
+                t.ticket_id,
+                t.session_id,
+                m.title as movie_title,
+                u.login as user_login,
+                h.hall_name,
+                s.session_time,
+                st.row_number,
+                st.seat_number,
+                t.final_price,
+                t.purchase_date
+            FROM ticket t
+            JOIN session s ON t.session_id = s.session_id
+            JOIN movies m ON s.movie_id = m.movie_id
+            JOIN users u ON t.user_id = u.user_id
+            JOIN hall h ON s.hall_id = h.hall_id
+            JOIN seat st ON t.seat_id = st.seat_id
+        """
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        return sql, params
+
     @staticmethod
     def get_tickets_by_session(session_id):
         """Получить все билеты для конкретного сеанса"""
@@ -230,18 +356,18 @@ class TicketModel:
 
     @staticmethod
     def get_daily_revenue(days=30):
-        """Получить ежедневную выручку за последние N дней"""
-        sql = f"""
+        """Получить ежедневную выручку за последние N дней (из свёртки daily_sales)"""
+        sql = """
             SELECT 
-                DATE(t.purchase_date) as date,
-                COUNT(*) as tickets_sold,
-                SUM(t.final_price) as daily_revenue
-            FROM ticket t
-            WHERE t.purchase_date >= CURRENT_DATE - INTERVAL '{days} days'
-            GROUP BY DATE(t.purchase_date)
+                sale_date as date,
+                SUM(tickets) as tickets_sold,
+                SUM(revenue) as daily_revenue
+            FROM daily_sales
+            WHERE sale_date >= CURRENT_DATE - %s
+            GROUP BY sale_date
             ORDER BY date DESC
         """
-        return query(sql) or []
+        return query(sql, [days]) or []
 
     @staticmethod
     def cancel_ticket_admin(ticket_id, admin_id):
@@ -265,6 +391,7 @@ class TicketModel:
 
             if result is not None:
                 print(f"✅ Админ успешно отменил билет #{ticket_id}")
+                SeatMapModel.mark_released(session_id, [seat_id])
 
                 LogModel.log_ticket_cancel(user_id, ticket_id, is_admin=True)
                 # Дополнительное логирование для админа
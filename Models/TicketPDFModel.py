@@ -1,5 +1,7 @@
 import os
 import tempfile
+import threading
+from collections import OrderedDict
 from reportlab.lib.pagesizes import A5
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import mm
@@ -13,12 +15,50 @@ from io import BytesIO
 from Models.LogModel import LogModel
 from Models.TicketModel import TicketModel
 
+# Макет билета на странице A5 (билет по центру); все координаты постоянные
+PAGE_WIDTH, PAGE_HEIGHT = A5
+TICKET_WIDTH = 120 * mm
+LEFT_MARGIN = (PAGE_WIDTH - TICKET_WIDTH) / 2
+RIGHT_MARGIN = LEFT_MARGIN + TICKET_WIDTH
+HEADER_HEIGHT = 30 * mm
+Y_HEADER_START = PAGE_HEIGHT - 15 * mm - HEADER_HEIGHT
+CONTENT_MARGIN = LEFT_MARGIN + 10 * mm
+Y_MOVIE = Y_HEADER_START - 15 * mm
+Y_HALL = Y_MOVIE - 20 * mm
+Y_TIME = Y_HALL - 10 * mm
+Y_SEAT = Y_TIME - 10 * mm
+Y_NUMBER = Y_SEAT - 20 * mm
+QR_SIZE = 55 * mm
+QR_X = (PAGE_WIDTH - QR_SIZE) / 2
+QR_Y = Y_NUMBER - 15 * mm - QR_SIZE
+
+PRIMARY_COLOR = Color(0 / 255, 168 / 255, 232 / 255)
+ACCENT_COLOR = Color(31 / 255, 41 / 255, 55 / 255)
+TEXT_COLOR = black
+LOGO_PATH = "images/headerLogo.png"
+# Сколько матриц QR-кодов держать в кэше
+QR_CACHE_SIZE = 1024
+# Имя PDF-формы (XObject) с неизменной частью билета: рисуется один раз на документ
+TEMPLATE_FORM = "ticket_static"
+
 
 class TicketPDFModel:
+    # Кэш на процесс: результат регистрации шрифтов и декодированный логотип (False - логотипа нет)
+    _fonts_registered = None
+    _logo = None
+    # LRU матриц QR-кодов по содержимому
+    _qr_matrices = OrderedDict()
+    _qr_lock = threading.Lock()
 
     @staticmethod
     def register_fonts():
-        """Регистрация шрифтов для поддержки кириллицы"""
+        """Регистрация шрифтов для поддержки кириллицы (один раз на процесс)"""
+        if TicketPDFModel._fonts_registered is None:
+            TicketPDFModel._fonts_registered = TicketPDFModel._register_fonts()
+        return TicketPDFModel._fonts_registered
+
+    @staticmethod
+    def _register_fonts():
         try:
             if os.name == 'nt':  # Windows
                 font_dir = "C:/Windows/Fonts/"
@@ -36,151 +76,202 @@ class TicketPDFModel:
             return False
 
     @staticmethod
-    def generate_qr_code(data):
-        """Генерация QR кода"""
+    def get_logo():
+        """Логотип шапки, прочитанный и декодированный один раз на процесс; None - логотипа нет"""
+        if TicketPDFModel._logo is None:
+            try:
+                with open(LOGO_PATH, "rb") as f:
+                    logo = ImageReader(BytesIO(f.read()))
+                # getRGBData() декодирует PNG и запоминает результат в ImageReader
+                logo.getRGBData()
+                TicketPDFModel._logo = logo
+            except Exception:
+                TicketPDFModel._logo = False
+        return TicketPDFModel._logo or None
+
+    @staticmethod
+    def qr_matrix(data):
+        """
+        Матрица QR-кода (кортеж строк из bool, с белой рамкой) для data.
+        Последние QR_CACHE_SIZE матриц кэшируются: повторная выгрузка тех же билетов QR не пересчитывает.
+        """
+        with TicketPDFModel._qr_lock:
+            matrix = TicketPDFModel._qr_matrices.get(data)
+            if matrix is not None:
+                TicketPDFModel._qr_matrices.move_to_end(data)
+                return matrix
+
         qr = qrcode.QRCode(
-            version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=10, border=2
+            version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, border=2
         )
         qr.add_data(data)
         qr.make(fit=True)
-        img = qr.make_image(fill_color="black", back_color="white")
-        buffer = BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
-        return buffer
+        matrix = tuple(tuple(row) for row in qr.get_matrix())
+
+        with TicketPDFModel._qr_lock:
+            TicketPDFModel._qr_matrices[data] = matrix
+            while len(TicketPDFModel._qr_matrices) > QR_CACHE_SIZE:
+                TicketPDFModel._qr_matrices.popitem(last=False)
+        return matrix
 
     @staticmethod
-    def _draw_single_ticket_content(c, ticket_id, user_id, ticket_info, fonts_registered, page_info=""):
-        page_width, page_height = A5
+    def draw_qr_code(c, data, x, y, size):
+        """
+        Нарисовать QR-код векторно: белый квадрат и один залитый путь из тёмных модулей,
+        соседние модули строки объединены в один прямоугольник. Без растровой картинки.
+        """
+        matrix = TicketPDFModel.qr_matrix(data)
+        module = size / len(matrix)
+
+        c.setFillColor(white)
+        c.rect(x, y, size, size, fill=1, stroke=0)
+
+        path = c.beginPath()
+        for row_index, row in enumerate(matrix):
+            # Строки матрицы идут сверху вниз, а ось y в PDF - снизу вверх
+            row_y = y + size - (row_index + 1) * module
+            run_start = None
+            for col_index, dark in enumerate(row + (False,)):
+                if dark and run_start is None:
+                    run_start = col_index
+                elif not dark and run_start is not None:
+                    path.rect(x + run_start * module, row_y, (col_index - run_start) * module, module)
+                    run_start = None
+        c.setFillColor(black)
+        c.drawPath(path, fill=1, stroke=0)
 
-        # --- Настройки макета билета (центрируем на странице) ---
-        ticket_width = 120 * mm
-        left_margin = (page_width - ticket_width) / 2
-        right_margin = left_margin + ticket_width
+    @staticmethod
+    def _fonts(fonts_registered):
+        return ("Arial", "Arial-Bold") if fonts_registered else ("Helvetica", "Helvetica-Bold")
 
-        # Настройка цветов и шрифтов
-        primary_color = Color(0 / 255, 168 / 255, 232 / 255)
-        accent_color = Color(31 / 255, 41 / 255, 55 / 255)
-        text_color = black
-        font_name = "Arial" if fonts_registered else "Helvetica"
-        font_bold = "Arial-Bold" if fonts_registered else "Helvetica-Bold"
+    @staticmethod
+    def _draw_template(c, fonts_registered):
+        """
+        Неизменная часть билета - фон, тень, шапка с логотипом, подписи полей, рамка номера, колонтитул -
+        как PDF-форма: в документе она хранится один раз, каждая страница лишь ссылается на неё.
+        """
+        font_name, font_bold = TicketPDFModel._fonts(fonts_registered)
+        c.beginForm(TEMPLATE_FORM)
 
-        # --- Отрисовка ---
         # Фон страницы
         c.setFillColor(Color(0.95, 0.95, 0.95))  # Слегка серый фон для контраста
-        c.rect(0, 0, page_width, page_height, fill=1, stroke=0)
+        c.rect(0, 0, PAGE_WIDTH, PAGE_HEIGHT, fill=1, stroke=0)
 
-        # Белая подложка для самого билета
-        c.setFillColor(white)
         # Рисуем тень для эффекта объема
         c.setFillColor(Color(0.8, 0.8, 0.8))
-        c.rect(left_margin + 1 * mm, 15 * mm - 1 * mm, ticket_width, page_height - 30 * mm, fill=1, stroke=0)
+        c.rect(LEFT_MARGIN + 1 * mm, 15 * mm - 1 * mm, TICKET_WIDTH, PAGE_HEIGHT - 30 * mm, fill=1, stroke=0)
         # Сам билет
         c.setFillColor(white)
-        c.rect(left_margin, 15 * mm, ticket_width, page_height - 30 * mm, fill=1, stroke=0)
+        c.rect(LEFT_MARGIN, 15 * mm, TICKET_WIDTH, PAGE_HEIGHT - 30 * mm, fill=1, stroke=0)
 
         # Шапка
-        header_height = 30 * mm
-        y_header_start = page_height - 15 * mm - header_height
-        c.setFillColor(primary_color)
-        c.rect(left_margin, y_header_start, ticket_width, header_height, fill=1, stroke=0)
+        c.setFillColor(PRIMARY_COLOR)
+        c.rect(LEFT_MARGIN, Y_HEADER_START, TICKET_WIDTH, HEADER_HEIGHT, fill=1, stroke=0)
 
         # Логотип
         c.setFillColor(white)
-        logo_path = "images/headerLogo.png"
-        try:
-            if os.path.exists(logo_path):
-                logo = ImageReader(logo_path)
-                c.drawImage(logo, left_margin + 10 * mm, y_header_start + 5 * mm, width=40 * mm, height=20 * mm,
-                            mask='auto', preserveAspectRatio=True)
-            else:
-                raise FileNotFoundError()
-        except Exception:
+        logo = TicketPDFModel.get_logo()
+        if logo is not None:
+            c.drawImage(logo, LEFT_MARGIN + 10 * mm, Y_HEADER_START + 5 * mm, width=40 * mm, height=20 * mm,
+                        mask='auto', preserveAspectRatio=True)
+        else:
             c.setFont(font_bold, 20)
-            c.drawString(left_margin + 10 * mm, y_header_start + 10 * mm, "CINEMAVAIB")
+            c.drawString(LEFT_MARGIN + 10 * mm, Y_HEADER_START + 10 * mm, "CINEMAVAIB")
 
         # Текст "ЭЛЕКТРОННЫЙ БИЛЕТ"
         c.setFont(font_bold, 9)
-        c.drawRightString(right_margin - 10 * mm, y_header_start + 22 * mm, "ЭЛЕКТРОННЫЙ БИЛЕТ")
+        c.drawRightString(RIGHT_MARGIN - 10 * mm, Y_HEADER_START + 22 * mm, "ЭЛЕКТРОННЫЙ БИЛЕТ")
+
+        # Подписи полей
+        c.setFillColor(TEXT_COLOR)
+        c.setFont(font_bold, 12)
+        c.drawString(CONTENT_MARGIN, Y_MOVIE, "ФИЛЬМ:")
+        c.setFont(font_bold, 11)
+        c.drawString(CONTENT_MARGIN, Y_HALL, "ЗАЛ:")
+        c.drawString(CONTENT_MARGIN, Y_TIME, "ДАТА И ВРЕМЯ:")
+        c.drawString(CONTENT_MARGIN, Y_SEAT, "МЕСТО:")
+        c.drawString(CONTENT_MARGIN + 60 * mm, Y_SEAT, "ЦЕНА:")
+
+        # Рамка номера билета
+        c.setFillColor(Color(0.95, 0.95, 0.95))
+        c.setStrokeColor(Color(0.85, 0.85, 0.85))
+        c.rect(LEFT_MARGIN + 5 * mm, Y_NUMBER - 7 * mm, TICKET_WIDTH - 10 * mm, 12 * mm, fill=1, stroke=1)
+
+        # Нижний колонтитул: документ создаётся целиком за раз, время генерации у всех страниц общее
+        c.setFillColor(Color(0.5, 0.5, 0.5))
+        c.setFont(font_name, 8)
+        c.drawRightString(PAGE_WIDTH - 10 * mm, 8 * mm, f"Сгенерировано: {datetime.now().strftime('%d.%m.%Y %H:%M')}")
+        c.drawString(10 * mm, 8 * mm, "Приятного просмотра!")
+
+        c.endForm()
 
-        # --- Основная информация ---
-        y_position = y_header_start - 15 * mm
-        content_margin = left_margin + 10 * mm
+    @staticmethod
+    def _draw_single_ticket_content(c, ticket_id, user_id, ticket_info, fonts_registered, page_info=""):
+        """Страница билета: форма-шаблон и поверх неё только данные билета и QR-код"""
+        font_name, font_bold = TicketPDFModel._fonts(fonts_registered)
+        c.doForm(TEMPLATE_FORM)
 
         # Фильм
-        c.setFillColor(text_color)
-        c.setFont(font_bold, 12)
-        c.drawString(content_margin, y_position, "ФИЛЬМ:")
+        c.setFillColor(TEXT_COLOR)
         c.setFont(font_name, 12)
-        movie_title = str(ticket_info[1])
-        c.drawString(content_margin, y_position - 7 * mm, movie_title)
-        y_position -= 20 * mm
+        c.drawString(CONTENT_MARGIN, Y_MOVIE - 7 * mm, str(ticket_info[1]))
 
         # Зал
-        c.setFont(font_bold, 11)
-        c.drawString(content_margin, y_position, "ЗАЛ:")
         c.setFont(font_name, 11)
         hall_display = f"№{ticket_info[3]} - {ticket_info[2]}" if ticket_info[3] else str(ticket_info[2])
-        c.drawString(content_margin + 15 * mm, y_position, hall_display)
-        y_position -= 10 * mm
+        c.drawString(CONTENT_MARGIN + 15 * mm, Y_HALL, hall_display)
 
         # Дата и время
-        c.setFont(font_bold, 11)
-        c.drawString(content_margin, y_position, "ДАТА И ВРЕМЯ:")
-        c.setFont(font_name, 11)
         session_time = ticket_info[4]
         time_str = session_time.strftime('%d.%m.%Y %H:%M') if not isinstance(session_time, str) else session_time
-        c.drawString(content_margin + 35 * mm, y_position, time_str)
-        y_position -= 10 * mm
+        c.drawString(CONTENT_MARGIN + 35 * mm, Y_TIME, time_str)
 
         # Место и Стоимость в одну строку
-        c.setFont(font_bold, 11)
-        c.drawString(content_margin, y_position, "МЕСТО:")
-        c.setFont(font_name, 11)
-        c.drawString(content_margin + 20 * mm, y_position, f"Ряд {ticket_info[5]}, Место {ticket_info[6]}")
-
-        c.setFont(font_bold, 11)
-        c.drawString(content_margin + 60 * mm, y_position, "ЦЕНА:")
-        c.setFont(font_name, 11)
+        c.drawString(CONTENT_MARGIN + 20 * mm, Y_SEAT, f"Ряд {ticket_info[5]}, Место {ticket_info[6]}")
         price = float(ticket_info[7]) if ticket_info[7] else 0.0
-        c.drawString(content_margin + 75 * mm, y_position, f"{price:.0f} руб.")
-        y_position -= 20 * mm
+        c.drawString(CONTENT_MARGIN + 75 * mm, Y_SEAT, f"{price:.0f} руб.")
 
         # Номер билета
-        c.setFillColor(Color(0.95, 0.95, 0.95))
-        c.setStrokeColor(Color(0.85, 0.85, 0.85))
-        c.rect(left_margin + 5 * mm, y_position - 7 * mm, ticket_width - 10 * mm, 12 * mm, fill=1, stroke=1)
-        c.setFillColor(accent_color)
+        c.setFillColor(ACCENT_COLOR)
         c.setFont(font_bold, 14)
-        c.drawCentredString(page_width / 2, y_position - 3 * mm, f"БИЛЕТ №{ticket_id}")
+        c.drawCentredString(PAGE_WIDTH / 2, Y_NUMBER - 3 * mm, f"БИЛЕТ №{ticket_id}")
 
         # QR-код
-        qr_size = 55 * mm
-        qr_y = y_position - 15 * mm - qr_size
-        qr_x = (page_width - qr_size) / 2
         try:
             qr_data = f"TICKET:{ticket_id}:USER:{user_id}:SESSION:{ticket_info[10]}"
-            qr_image = ImageReader(TicketPDFModel.generate_qr_code(qr_data))
-            c.drawImage(qr_image, qr_x, qr_y, width=qr_size, height=qr_size)
-            c.setFillColor(text_color)
+            TicketPDFModel.draw_qr_code(c, qr_data, QR_X, QR_Y, QR_SIZE)
+            c.setFillColor(TEXT_COLOR)
             c.setFont(font_name, 9)
-            c.drawCentredString(page_width / 2, qr_y - 2 * mm, "Покажите этот QR-код на входе в кинозал")
+            c.drawCentredString(PAGE_WIDTH / 2, QR_Y - 2 * mm, "Покажите этот QR-код на входе в кинозал")
         except Exception as e:
             print(f"Ошибка при генерации QR кода: {e}")
 
-        # Нижний колонтитул страницы
-        c.setFillColor(Color(0.5, 0.5, 0.5))
-        c.setFont(font_name, 8)
+        # Номер страницы
         if page_info:
-            c.drawCentredString(page_width / 2, 8 * mm, page_info)
-        c.drawRightString(page_width - 10 * mm, 8 * mm, f"Сгенерировано: {datetime.now().strftime('%d.%m.%Y %H:%M')}")
-        c.drawString(10 * mm, 8 * mm, "Приятного просмотра!")
+            c.setFillColor(Color(0.5, 0.5, 0.5))
+            c.setFont(font_name, 8)
+            c.drawCentredString(PAGE_WIDTH / 2, 8 * mm, page_info)
+
+    @staticmethod
+    def render_tickets_pdf(filepath, tickets, user_id, page_numbers=False):
+        """Записать билеты в PDF, каждый на своей странице A5. tickets - список (ticket_id, ticket_info)"""
+        fonts_registered = TicketPDFModel.register_fonts()
+        c = canvas.Canvas(filepath, pagesize=A5)
+        TicketPDFModel._draw_template(c, fonts_registered)
+
+        total_pages = len(tickets)
+        for i, (ticket_id, ticket_info) in enumerate(tickets):
+            if i > 0: c.showPage()
+            page_info = f"Страница {i + 1} из {total_pages}" if page_numbers else ""
+            TicketPDFModel._draw_single_ticket_content(c, ticket_id, user_id, ticket_info, fonts_registered,
+                                                       page_info)
+        c.save()
+        return filepath
 
     @staticmethod
     def generate_ticket_pdf(ticket_id, user_id):
         """Сгенерировать PDF одного билета на странице A5."""
         try:
-            fonts_registered = TicketPDFModel.register_fonts()
             ticket_info = TicketModel.get_ticket_by_id(ticket_id)
 
             if not ticket_info: raise Exception("Билет не найден")
@@ -190,9 +281,7 @@ class TicketPDFModel:
             filename = f"ticket_{ticket_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
             filepath = os.path.join(temp_dir, filename)
 
-            c = canvas.Canvas(filepath, pagesize=A5)
-            TicketPDFModel._draw_single_ticket_content(c, ticket_id, user_id, ticket_info, fonts_registered)
-            c.save()
+            TicketPDFModel.render_tickets_pdf(filepath, [(ticket_id, ticket_info)], user_id)
 
             LogModel.log_pdf_generation(user_id, ticket_id, True)
             return filepath
@@ -204,14 +293,10 @@ class TicketPDFModel:
     def generate_multiple_tickets_pdf(ticket_ids, user_id):
         """Сгенерировать PDF с несколькими билетами, каждый на своей странице A5."""
         try:
-            fonts_registered = TicketPDFModel.register_fonts()
-
             temp_dir = tempfile.gettempdir()
             filename = f"tickets_{user_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
             filepath = os.path.join(temp_dir, filename)
 
-            c = canvas.Canvas(filepath, pagesize=A5)
-
             valid_tickets = []
             for ticket_id in ticket_ids:
                 ticket_info = TicketModel.get_ticket_by_id(ticket_id)
@@ -221,14 +306,7 @@ class TicketPDFModel:
             if not valid_tickets:
                 raise Exception("Не найдено действительных билетов для указанного пользователя.")
 
-            total_pages = len(valid_tickets)
-            for i, (ticket_id, ticket_info) in enumerate(valid_tickets):
-                if i > 0: c.showPage()
-                page_info = f"Страница {i + 1} из {total_pages}"
-                TicketPDFModel._draw_single_ticket_content(c, ticket_id, user_id, ticket_info, fonts_registered,
-                                                           page_info)
-
-            c.save()
+            TicketPDFModel.render_tickets_pdf(filepath, valid_tickets, user_id, page_numbers=True)
             LogModel.log_pdf_generation(user_id, [tid for tid, _ in valid_tickets], True)
             return filepath
         except Exception as e:
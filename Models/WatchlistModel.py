@@ -1,4 +1,5 @@
 from core.database import query
+from core.poster_cache import poster_cache
 
 
 class WatchlistModel:
@@ -7,13 +8,18 @@ class WatchlistModel:
         """Получить избранные фильмы пользователя"""
         sql = """
             SELECT w.watchlist_id, m.movie_id, m.title, m.description, 
-                   m.movie_image, m.base_price, m.rating, w.status, w.created_at
+                   NULL AS poster, m.base_price, m.rating,
+                   w.status, w.created_at, m.image_hash, m.updated_at
             FROM watchlist w
             JOIN movies m ON w.movie_id = m.movie_id
             WHERE w.user_id = %s
             ORDER BY w.created_at DESC
         """
-        return query(sql, [user_id]) or []
+        rows = query(sql, [user_id])
+        if not rows:
+            return []
+        # Постеры - из дискового кэша, из БД только изменённые
+        return poster_cache.fill(rows, 'thumb', id_index=1, stamp_index=10, image_index=4)
 
     @staticmethod
     def add_to_watchlist(user_id, movie_id, status='Planned'):
@@ -143,7 +143,7 @@ class AdminPanelHallsView(QWidget):
         """Обновить таблицу залов"""
         self.halls_model = datagrid_model(
             "SELECT hall_id, hall_number, hall_name, hall_type, "
-            "hall_extra_price, created_at FROM hall ORDER BY hall_number"
+            "hall_extra_price, capacity, created_at FROM hall ORDER BY hall_number"
         )
         self.halls_view.setModel(self.halls_model)
 
@@ -177,7 +177,7 @@ class AdminPanelHallsView(QWidget):
         # Обновляем информацию о зале
         hall = HallModel.get_hall_by_id(hall_id)
         if hall:
-            seats_count = len(SeatModel.get_seats_by_hall(hall_id))
+            seats_count = hall[7]
             rows_summary = SeatModel.get_rows_summary(hall_id)
 
             info_text = f"Зал: {hall[2]} (№{hall[1]}, {hall[3]}) - "
@@ -1,11 +1,17 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QTableView, QSizePolicy, QMessageBox, QSpacerItem,
-    QGroupBox, QComboBox, QDateEdit, QFormLayout
+    QGroupBox, QComboBox, QDateEdit, QLineEdit, QGridLayout, QFileDialog
 )
 from PyQt6.QtCore import Qt, QDate
-from core.database import datagrid_model
+from PyQt6.QtGui import QStandardItem, QStandardItemModel
 from Models.LogModel import LogModel
+from core.async_query import run_query_async
+from core.copy_export import export_file_filter, export_query
+
+HEADERS = ["ID", "Пользователь", "Роль", "Тип действия", "ID сущности", "Описание", "Время"]
+# Нижняя граница QDateEdit, означающая "без ограничения"
+NO_DATE = QDate(2000, 1, 1)
 
 
 class AdminPanelLogsView(QWidget):
@@ -13,6 +19,12 @@ class AdminPanelLogsView(QWidget):
         super().__init__()
         self.user_id = user_id
         self.go_back = go_back
+        self.model = QStandardItemModel(0, len(HEADERS), self)
+        self.model.setHorizontalHeaderLabels(HEADERS)
+
+        # Keyset-пагинация: начало каждой открытой страницы - (created_at, log_id) или None для первой
+        self.page_starts = [None]
+        self.next_after = None
 
         self.setup_ui()
         self.load_logs()
@@ -38,52 +50,89 @@ class AdminPanelLogsView(QWidget):
 
         layout.addLayout(header)
 
-        # Фильтры - ИСПРАВЛЕНИЕ: передаем layout в метод
         filter_group = self.create_filters_section()
-        layout.addWidget(filter_group)  # Добавляем группу фильтров в layout
+        layout.addWidget(filter_group)
 
-        # Таблица логов
+        # Таблица логов (порядок задаёт сервер: от новых к старым)
         self.logs_view = QTableView()
         self.logs_view.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
         self.logs_view.setAlternatingRowColors(True)
-        self.logs_view.setSortingEnabled(True)
+        self.logs_view.setModel(self.model)
         layout.addWidget(self.logs_view, stretch=1)
 
         # Кнопки управления
         btns = QHBoxLayout()
+
+        self.btn_prev = QPushButton("◀ Новее")
+        self.btn_prev.clicked.connect(self.prev_page)
+        btns.addWidget(self.btn_prev)
+
+        self.page_label = QLabel()
+        self.page_label.setStyleSheet("color: #CCCCCC;")
+        btns.addWidget(self.page_label)
+
+        self.btn_next = QPushButton("Старее ▶")
+        self.btn_next.clicked.connect(self.next_page)
+        btns.addWidget(self.btn_next)
+
         btns.addSpacerItem(QSpacerItem(40, 20, QSizePolicy.Policy.Expanding))
 
         self.btn_refresh = QPushButton("🔄 Обновить")
         self.btn_refresh.clicked.connect(self.load_logs)
         btns.addWidget(self.btn_refresh)
 
+        self.btn_export = QPushButton("📤 Экспорт")
+        self.btn_export.clicked.connect(self.export_logs)
+        btns.addWidget(self.btn_export)
+
         self.btn_cleanup = QPushButton("🗑️ Очистить старые логи")
         self.btn_cleanup.setObjectName("LogoutButton")
         self.btn_cleanup.clicked.connect(self.cleanup_old_logs)
         btns.addWidget(self.btn_cleanup)
 
-        btns.addSpacerItem(QSpacerItem(40, 20, QSizePolicy.Policy.Expanding))
         layout.addLayout(btns)
 
     def create_filters_section(self):
         """Создать секцию фильтров и вернуть готовый виджет"""
         filter_group = QGroupBox("Фильтры")
-        layout = QHBoxLayout(filter_group)
+        layout = QGridLayout(filter_group)
 
-        # Фильтр по типу действия
-        layout.addWidget(QLabel("Тип действия:"))
+        # Фильтр по группе действий
+        layout.addWidget(QLabel("Тип действия:"), 0, 0)
         self.action_filter = QComboBox()
-        self.action_filter.addItem("Все действия", "all")
-        self.action_filter.addItem("Вход/выход", "USER_")
-        self.action_filter.addItem("Покупки билетов", "TICKET_")
-        self.action_filter.addItem("Действия с фильмами", "MOVIE_")
-        self.action_filter.addItem("Отзывы", "REVIEW_")
-        self.action_filter.addItem("Ошибки", "ERROR_")
+        self.action_filter.addItem("Все действия", None)
+        self.action_filter.addItem("Вход/выход", "USER")
+        self.action_filter.addItem("Покупки билетов", "TICKET")
+        self.action_filter.addItem("Действия с фильмами", "MOVIE")
+        self.action_filter.addItem("Отзывы", "REVIEW")
+        self.action_filter.addItem("Ошибки", "ERROR")
         self.action_filter.currentIndexChanged.connect(self.apply_filters)
-        layout.addWidget(self.action_filter)
+        layout.addWidget(self.action_filter, 0, 1)
+
+        # Фильтр по роли
+        layout.addWidget(QLabel("Роль:"), 0, 2)
+        self.role_filter = QComboBox()
+        self.role_filter.addItem("Все роли", None)
+        for role in ("User", "Admin", "System"):
+            self.role_filter.addItem(role, role)
+        self.role_filter.currentIndexChanged.connect(self.apply_filters)
+        layout.addWidget(self.role_filter, 0, 3)
+
+        # Период; минимальная дата означает "без ограничения"
+        layout.addWidget(QLabel("С:"), 0, 4)
+        self.date_from = QDateEdit(QDate.currentDate().addDays(-30))
+        layout.addWidget(QLabel("По:"), 0, 6)
+        self.date_to = QDateEdit(QDate.currentDate())
+        for column, date_edit in ((5, self.date_from), (7, self.date_to)):
+            date_edit.setCalendarPopup(True)
+            date_edit.setMinimumDate(NO_DATE)
+            date_edit.setSpecialValueText("—")
+            date_edit.setDisplayFormat("dd.MM.yyyy")
+            date_edit.dateChanged.connect(self.apply_filters)
+            layout.addWidget(date_edit, 0, column)
 
-        # Фильтр по количеству записей
-        layout.addWidget(QLabel("Показать:"))
+        # Размер страницы
+        layout.addWidget(QLabel("На странице:"), 0, 8)
         self.limit_filter = QComboBox()
         self.limit_filter.addItem("50 записей", 50)
         self.limit_filter.addItem("100 записей", 100)
@@ -91,87 +140,139 @@ class AdminPanelLogsView(QWidget):
         self.limit_filter.addItem("500 записей", 500)
         self.limit_filter.setCurrentIndex(1)
         self.limit_filter.currentIndexChanged.connect(self.apply_filters)
-        layout.addWidget(self.limit_filter)
+        layout.addWidget(self.limit_filter, 0, 9)
+
+        # Пользователь, сущность и поиск по описанию - применяются по Enter
+        layout.addWidget(QLabel("Логин:"), 1, 0)
+        self.login_filter = QLineEdit()
+        self.login_filter.setPlaceholderText("Любой")
+        layout.addWidget(self.login_filter, 1, 1)
+
+        layout.addWidget(QLabel("ID сущности:"), 1, 2)
+        self.entity_filter = QLineEdit()
+        self.entity_filter.setPlaceholderText("Любой")
+        layout.addWidget(self.entity_filter, 1, 3)
+
+        layout.addWidget(QLabel("Поиск:"), 1, 4)
+        self.search_filter = QLineEdit()
+        self.search_filter.setPlaceholderText("Слова из описания")
+        layout.addWidget(self.search_filter, 1, 5, 1, 5)
 
-        layout.addStretch()
+        for line_edit in (self.login_filter, self.entity_filter, self.search_filter):
+            line_edit.returnPressed.connect(self.apply_filters)
 
-        return filter_group  # Возвращаем готовый виджет
+        return filter_group
+
+    def get_filters(self):
+        """Значения фильтров - именованные аргументы LogModel.get_logs_page"""
+        entity_text = self.entity_filter.text().strip()
+        date_from = self.date_from.date()
+        date_to = self.date_to.date()
+        return {
+            "limit": self.limit_filter.currentData(),
+            "user_login": self.login_filter.text().strip() or None,
+            "actor_role": self.role_filter.currentData(),
+            "action_group": self.action_filter.currentData(),
+            "entity_id": int(entity_text) if entity_text.isdigit() else None,
+            "date_from": date_from.toPyDate() if date_from != NO_DATE else None,
+            "date_to": date_to.toPyDate() if date_to != NO_DATE else None,
+            "search_text": self.search_filter.text().strip() or None,
+        }
 
     def load_logs(self):
-        """Загрузить логи"""
-        try:
-            limit = self.limit_filter.currentData()
-
-            # Создаем модель для таблицы (без параметра для LIMIT)
-            sql = f"""
-                SELECT 
-                    al.log_id as "ID",
-                    COALESCE(u.login, 'Система') as "Пользователь",
-                    al.actor_role as "Роль",
-                    al.action_type as "Тип действия",
-                    al.entity_id as "ID сущности",
-                    al.description as "Описание",
-                    TO_CHAR(al.created_at, 'DD.MM.YYYY HH24:MI:SS') as "Время"
-                FROM activity_log al
-                LEFT JOIN users u ON al.user_id = u.user_id
-                ORDER BY al.created_at DESC
-                LIMIT {limit}
-            """
-
-            self.model = datagrid_model(sql)
-            self.logs_view.setModel(self.model)
-
-        except Exception as e:
-            print(f"Ошибка при загрузке логов: {e}")
-            QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить логи: {str(e)}")
+        """Загрузить первую страницу журнала"""
+        self.apply_filters()
 
     def apply_filters(self):
-        """Применить фильтры"""
-        try:
-            limit = self.limit_filter.currentData()
-            action_filter = self.action_filter.currentData()
-
-            # Базовый SQL
-            sql = f"""
-                SELECT 
-                    al.log_id as "ID",
-                    COALESCE(u.login, 'Система') as "Пользователь",
-                    al.actor_role as "Роль",
-                    al.action_type as "Тип действия",
-                    al.entity_id as "ID сущности",
-                    al.description as "Описание",
-                    TO_CHAR(al.created_at, 'DD.MM.YYYY HH24:MI:SS') as "Время"
-                FROM activity_log al
-                LEFT JOIN users u ON al.user_id = u.user_id
-                WHERE 1=1
-            """
-
-            # Применяем фильтр по типу действия
-            if action_filter != "all":
-                sql += f" AND al.action_type LIKE '{action_filter}%'"
-
-            sql += f" ORDER BY al.created_at DESC LIMIT {limit}"
-
-            self.model = datagrid_model(sql)
-            self.logs_view.setModel(self.model)
-
-        except Exception as e:
-            print(f"Ошибка при применении фильтров: {e}")
-            QMessageBox.critical(self, "Ошибка", f"Ошибка при применении фильтров: {str(e)}")
+        """Применить фильтры - журнал открывается с самых новых записей"""
+        self.page_starts = [None]
+        self.load_page()
+
+    def next_page(self):
+        if self.next_after is not None:
+            self.page_starts.append(self.next_after)
+            self.load_page()
+
+    def prev_page(self):
+        if len(self.page_starts) > 1:
+            self.page_starts.pop()
+            self.load_page()
+
+    def load_page(self):
+        filters = self.get_filters()
+        self.btn_prev.setEnabled(False)
+        self.btn_next.setEnabled(False)
+        self.page_label.setText("Загрузка...")
+        run_query_async(AdminPanelLogsView.fetch_page, self.page_starts[-1], tuple(sorted(filters.items())),
+                        on_result=self.show_page, on_error=self.on_page_failed,
+                        owner=self, channel="logs", coalesce=True)
+
+    @staticmethod
+    def fetch_page(after, filters):
+        return LogModel.get_logs_page(after=after, **dict(filters))
+
+    def show_page(self, result):
+        rows, self.next_after = result
+        self.model.removeRows(0, self.model.rowCount())
+        for row in rows:
+            log_id, login, role, action_type, entity_id, description, created_at = row
+            values = [log_id, login or "Система", role, action_type, entity_id, description,
+                      created_at.strftime("%d.%m.%Y %H:%M:%S") if created_at else None]
+            self.model.appendRow([QStandardItem("" if value is None else str(value)) for value in values])
+        self.logs_view.resizeColumnsToContents()
+
+        page = len(self.page_starts)
+        self.page_label.setText(f"Страница {page}" if rows else "Записей не найдено")
+        self.btn_prev.setEnabled(page > 1)
+        self.btn_next.setEnabled(self.next_after is not None)
+
+    def on_page_failed(self, error):
+        print(f"Ошибка при загрузке логов: {error}")
+        self.page_label.setText("")
+        self.btn_prev.setEnabled(len(self.page_starts) > 1)
+        QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить логи: {str(error)}")
+
+    def export_logs(self):
+        """Выгрузить весь журнал по текущим фильтрам (все страницы) в CSV или Parquet"""
+        filepath, _ = QFileDialog.getSaveFileName(self, "Экспорт журнала", "activity_log.csv", export_file_filter())
+        if not filepath:
+            return
+        filters = self.get_filters()
+        filters.pop("limit")
+        self.btn_export.setEnabled(False)
+        self.btn_export.setText("⏳ Экспорт...")
+        run_query_async(AdminPanelLogsView.write_export, tuple(sorted(filters.items())), filepath,
+                        on_result=self.on_export_done, on_error=self.on_export_failed)
+
+    @staticmethod
+    def write_export(filters, filepath):
+        sql, params = LogModel.export_query(**dict(filters))
+        return export_query(sql, params, filepath)
+
+    def on_export_done(self, filepath):
+        self.btn_export.setEnabled(True)
+        self.btn_export.setText("📤 Экспорт")
+        QMessageBox.information(self, "Успех", f"Журнал выгружен: {filepath}")
+
+    def on_export_failed(self, error):
+        print(f"Ошибка при экспорте логов: {error}")
+        self.btn_export.setEnabled(True)
+        self.btn_export.setText("📤 Экспорт")
+        QMessageBox.critical(self, "Ошибка", f"Не удалось выгрузить журнал: {str(error)}")
 
     def cleanup_old_logs(self):
         """Очистить старые логи"""
         confirm = QMessageBox.question(
             self,
             "Очистка логов",
-            "Удалить логи старше 90 дней?",
+            "Удалить логи старше 90 дней?\n(удаляются целые месяцы журнала)",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
 
         if confirm == QMessageBox.StandardButton.Yes:
             try:
-                LogModel.cleanup_old_logs(90)
-                QMessageBox.information(self, "Успех", "Старые логи очищены")
+                dropped = LogModel.cleanup_old_logs(90)
+                QMessageBox.information(self, "Успех", f"Старые логи очищены (месяцев удалено: {dropped})")
                 self.load_logs()
             except Exception as e:
-                QMessageBox.critical(self, "Ошибка", f"Не удалось очистить логи: {str(e)}")
\ No newline at end of file
+                QMessageBox.critical(self, "Ошибка", f"Не удалось очистить логи: {str(e)}")
@@ -9,7 +9,8 @@ from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QPixmap
 
 from Models.LogModel import LogModel
-from core.database import datagrid_model, query, image_to_binary
+from core.database import datagrid_model, query
+from core.thumbnails import movie_image_variants
 
 class AdminPanelMoviesView(QWidget):
     def __init__(self, go_back=None, user_id=None):
@@ -132,13 +133,15 @@ class AdminPanelMoviesView(QWidget):
                     return
 
                 # Создаём фильм
-                photo_binary = image_to_binary(photo_path)
+                image = movie_image_variants(photo_path)
                 sql = """
-                    INSERT INTO movies (title, description, movie_image, base_price, rating)
-                    VALUES (%s, %s, %s, %s, 0.0)
+                    INSERT INTO movies (title, description, movie_image, movie_thumb, movie_detail,
+                                        image_hash, base_price, rating)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, 0.0)
                     RETURNING movie_id
                 """
-                result = query(sql, (title, description, photo_binary, price))
+                result = query(sql, (title, description, image['movie_image'], image['movie_thumb'],
+                                     image['movie_detail'], image['image_hash'], price))
                 movie_id = result[0][0]
 
                 LogModel.log_movie_action(
@@ -191,14 +194,16 @@ class AdminPanelMoviesView(QWidget):
 
                 # Обновляем основную информацию
                 if photo_path:
-                    photo_binary = image_to_binary(photo_path)
+                    image = movie_image_variants(photo_path)
                     sql = """
                         UPDATE movies 
-                        SET title = %s, description = %s, movie_image = %s, 
+                        SET title = %s, description = %s, movie_image = %s, movie_thumb = %s,
+                            movie_detail = %s, image_hash = %s,
                             base_price = %s, updated_at = CURRENT_TIMESTAMP
                         WHERE movie_id = %s
                     """
-                    query(sql, (title, description, photo_binary, price, movie['movie_id']))
+                    query(sql, (title, description, image['movie_image'], image['movie_thumb'],
+                                image['movie_detail'], image['image_hash'], price, movie['movie_id']))
                 else:
                     sql = """
                         UPDATE movies 
@@ -1,50 +1,28 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QMessageBox, QGroupBox, QSpinBox, QProgressBar, QFileDialog, QScrollArea
+    QMessageBox, QGroupBox, QSpinBox, QProgressBar, QFileDialog, QScrollArea, QComboBox,
+    QListWidget
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtCore import Qt
 from Models.ReportsModel import ReportsModel
+from core.copy_export import parquet_available
+from core.realtime_stats import realtime_stats
+from core.report_jobs import ReportJobRunner
 import os
-
-
-class ReportGenerationThread(QThread):
-    """Поток для генерации отчетов"""
-    finished = pyqtSignal(str, str)  # filepath, report_name
-    error = pyqtSignal(str)
-
-    def __init__(self, report_type, days=30):
-        super().__init__()
-        self.report_type = report_type
-        self.days = days
-
-    def run(self):
-        try:
-            if self.report_type == "sales":
-                filepath = ReportsModel.export_daily_sales_report(self.days)
-                report_name = "Отчет по продажам"
-            elif self.report_type == "movies":
-                filepath = ReportsModel.export_movies_popularity_report()
-                report_name = "Отчет по популярности фильмов"
-            elif self.report_type == "halls":
-                filepath = ReportsModel.export_halls_utilization_report(self.days)
-                report_name = "Отчет по загрузке залов"
-            elif self.report_type == "users":
-                filepath = ReportsModel.export_users_activity_report(self.days)
-                report_name = "Отчет по активности пользователей"
-            elif self.report_type == "financial":
-                filepath = ReportsModel.export_financial_summary_report(self.days)
-                report_name = "Финансовый отчет"
-            else:
-                self.error.emit("Неизвестный тип отчета")
-                return
-
-            if filepath:
-                self.finished.emit(filepath, report_name)
-            else:
-                self.error.emit("Ошибка создания отчета")
-
-        except Exception as e:
-            self.error.emit(str(e))
+import shutil
+import time
+
+SAVE_FILTERS = {
+    ".xlsx": "Excel Files (*.xlsx)",
+    ".csv": "CSV (*.csv)",
+    ".parquet": "Parquet (*.parquet)",
+}
+STATUS_COLORS = {
+    "info": "#00A8E8",
+    "progress": "#FFA726",
+    "success": "#55C78C",
+    "error": "#E63946",
+}
 
 
 class AdminPanelReportsView(QWidget):
@@ -52,10 +30,23 @@ class AdminPanelReportsView(QWidget):
         super().__init__()
         self.user_id = user_id
         self.go_back = go_back
-        self.current_report_thread = None
+
+        # Отчёты строятся параллельно в пуле процессов; job_id -> {"name", "item", "bundle"}
+        self.runner = ReportJobRunner(self)
+        self.runner.job_started.connect(self.on_job_started)
+        self.runner.job_progress.connect(self.on_job_progress)
+        self.runner.job_finished.connect(self.on_job_finished)
+        self.runner.job_failed.connect(self.on_job_failed)
+        self.runner.job_cancelled.connect(self.on_job_cancelled)
+        self.jobs = {}
+        # Пакет "все отчёты": папка назначения, ожидаемые задания и итоги
+        self.bundle = None
 
         self.setup_ui()
 
+        # Счётчики ведутся по уведомлениям БД; пока их заполняют, показ - по сигналу changed
+        realtime_stats().changed.connect(self.on_realtime_changed)
+
     def setup_ui(self):
         # Главный layout для всего виджета
         main_layout = QVBoxLayout(self)
@@ -95,23 +86,17 @@ class AdminPanelReportsView(QWidget):
         # Виды отчетов
         self.create_reports_section(layout)
 
+        # Задания: ход каждого отчёта и отмена
+        self.create_jobs_section(layout)
+
         # Прогресс бар
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
         layout.addWidget(self.progress_bar)
 
         # Статус
-        self.status_label = QLabel("Выберите отчет для генерации")
-        self.status_label.setStyleSheet("""
-            QLabel {
-                color: #00A8E8;
-                font-size: 12px;
-                padding: 8px;
-                background-color: #1C1E22;
-                border-radius: 5px;
-                border-left: 3px solid #00A8E8;
-            }
-        """)
+        self.status_label = QLabel()
+        self.set_status("Выберите отчет для генерации", "info")
         layout.addWidget(self.status_label)
 
         layout.addStretch()
@@ -140,6 +125,15 @@ class AdminPanelReportsView(QWidget):
         self.days_spinbox.setFixedWidth(100)
         period_layout.addWidget(self.days_spinbox)
 
+        period_layout.addWidget(QLabel("Формат:"))
+
+        self.format_combo = QComboBox()
+        self.format_combo.addItem("Excel (оформленный)", "xlsx")
+        self.format_combo.addItem("CSV (быстрая выгрузка)", "csv")
+        if parquet_available():
+            self.format_combo.addItem("Parquet (быстрая выгрузка)", "parquet")
+        period_layout.addWidget(self.format_combo)
+
         period_layout.addStretch()
         parent_layout.addWidget(period_group)
 
@@ -180,53 +174,167 @@ class AdminPanelReportsView(QWidget):
         financial_btn.clicked.connect(lambda: self.generate_report("financial"))
         reports_layout.addWidget(financial_btn)
 
-        parent_layout.addWidget(reports_group)
-
-    def generate_report(self, report_type):
-        """Генерация отчета"""
-        if self.current_report_thread and self.current_report_thread.isRunning():
-            QMessageBox.warning(self, "Внимание", "Дождитесь завершения текущей генерации отчета")
-            return
+        # Все отчеты сразу - строятся параллельно
+        bundle_btn = QPushButton("📦 Все отчеты за период")
+        bundle_btn.setFixedHeight(50)
+        bundle_btn.clicked.connect(self.generate_bundle)
+        reports_layout.addWidget(bundle_btn)
 
-        days = self.days_spinbox.value()
+        parent_layout.addWidget(reports_group)
 
-        # Показываем прогресс
-        self.progress_bar.setVisible(True)
-        self.progress_bar.setRange(0, 0)  # Бесконечный прогресс
-        self.status_label.setText("🔄 Генерация отчета...")
-        self.status_label.setStyleSheet("""
-            QLabel {
-                color: #FFA726;
+    def create_jobs_section(self, parent_layout):
+        """Создать секцию текущих заданий"""
+        jobs_group = QGroupBox("⏳ Задания")
+        jobs_layout = QVBoxLayout(jobs_group)
+
+        self.jobs_list = QListWidget()
+        self.jobs_list.setMaximumHeight(130)
+        jobs_layout.addWidget(self.jobs_list)
+
+        btns = QHBoxLayout()
+        btns.addStretch()
+        self.btn_cancel_jobs = QPushButton("⛔ Отменить все")
+        self.btn_cancel_jobs.setObjectName("LogoutButton")
+        self.btn_cancel_jobs.setEnabled(False)
+        self.btn_cancel_jobs.clicked.connect(self.cancel_jobs)
+        btns.addWidget(self.btn_cancel_jobs)
+        jobs_layout.addLayout(btns)
+
+        parent_layout.addWidget(jobs_group)
+
+    def set_status(self, text, kind):
+        """Текст статуса; kind - ключ STATUS_COLORS"""
+        color = STATUS_COLORS[kind]
+        self.status_label.setText(text)
+        self.status_label.setStyleSheet(f"""
+            QLabel {{
+                color: {color};
                 font-size: 12px;
                 padding: 8px;
                 background-color: #1C1E22;
                 border-radius: 5px;
-                border-left: 3px solid #FFA726;
-            }
+                border-left: 3px solid {color};
+            }}
         """)
 
-        # Запускаем в отдельном потоке
-        self.current_report_thread = ReportGenerationThread(report_type, days)
-        self.current_report_thread.finished.connect(self.on_report_generated)
-        self.current_report_thread.error.connect(self.on_report_error)
-        self.current_report_thread.start()
+    def generate_report(self, report_type, bundle=None):
+        """Поставить отчет в очередь генерации; несколько отчетов строятся параллельно"""
+        days = self.days_spinbox.value()
+        file_format = self.format_combo.currentData()
+        job_id = self.runner.submit(ReportsModel.export_report, report_type, days, file_format)
+
+        name = ReportsModel.REPORT_NAMES[report_type]
+        self.jobs[job_id] = {"name": name, "item": None, "bundle": bundle}
+        self.jobs_list.addItem(f"🕓 {name}: в очереди")
+        self.jobs[job_id]["item"] = self.jobs_list.item(self.jobs_list.count() - 1)
+
+        self.update_jobs_state()
+        return job_id
+
+    def generate_bundle(self):
+        """Все отчеты за период в выбранную папку (например, для закрытия месяца)"""
+        if self.bundle is not None:
+            QMessageBox.warning(self, "Внимание", "Дождитесь завершения текущего пакета отчетов")
+            return
+
+        folder = QFileDialog.getExistingDirectory(self, "Папка для отчетов")
+        if not folder:
+            return
+
+        self.bundle = {"folder": folder, "pending": set(), "saved": [], "failed": [],
+                       "started": time.monotonic()}
+        for report_type in ReportsModel.REPORT_NAMES:
+            self.bundle["pending"].add(self.generate_report(report_type, bundle=self.bundle))
+
+    def cancel_jobs(self):
+        """Отменить все незавершенные отчеты (запросы прерываются и на сервере)"""
+        self.runner.cancel()
+        self.btn_cancel_jobs.setEnabled(False)
+        self.set_status("⛔ Отмена заданий...", "progress")
+
+    def update_jobs_state(self):
+        running = self.runner.has_jobs()
+        self.progress_bar.setVisible(running)
+        self.progress_bar.setRange(0, 0)  # Бесконечный прогресс
+        self.btn_cancel_jobs.setEnabled(running)
+        if running:
+            self.set_status(f"🔄 Генерация отчетов: {len(self.jobs)}", "progress")
+
+    def set_job_text(self, job_id, text):
+        job = self.jobs.get(job_id)
+        if job is not None:
+            job["item"].setText(f"{text} {job['name']}")
+
+    def on_job_started(self, job_id):
+        self.set_job_text(job_id, "🔄")
+
+    def on_job_progress(self, job_id, rows):
+        job = self.jobs.get(job_id)
+        if job is not None:
+            job["item"].setText(f"🔄 {job['name']}: строк {rows:,}")
+
+    def on_job_finished(self, job_id, filepath):
+        job = self.finish_job(job_id, "✅")
+        if job is None:
+            return
+        if job["bundle"] is not None:
+            self.on_bundle_job_done(job_id, job, filepath)
+        else:
+            self.on_report_generated(filepath, job["name"])
+
+    def on_job_failed(self, job_id, error_message):
+        job = self.finish_job(job_id, "❌")
+        if job is None:
+            return
+        error_message = error_message or "Ошибка создания отчета"
+        if job["bundle"] is not None:
+            self.on_bundle_job_done(job_id, job, None, error_message)
+        else:
+            self.on_report_error(error_message)
+
+    def on_job_cancelled(self, job_id):
+        job = self.finish_job(job_id, "⛔")
+        if job is None:
+            return
+        if job["bundle"] is not None:
+            self.on_bundle_job_done(job_id, job, None, "отменен")
+        elif not self.jobs:
+            self.set_status("⛔ Генерация отменена", "info")
+
+    def finish_job(self, job_id, mark):
+        """Убрать задание из текущих; возвращает его описание"""
+        self.set_job_text(job_id, mark)
+        job = self.jobs.pop(job_id, None)
+        self.update_jobs_state()
+        return job
+
+    def on_bundle_job_done(self, job_id, job, filepath, error_message=None):
+        bundle = job["bundle"]
+        bundle["pending"].discard(job_id)
+        if filepath:
+            try:
+                bundle["saved"].append(shutil.move(filepath, bundle["folder"]))
+            except OSError as e:
+                bundle["failed"].append(f"{job['name']}: {e}")
+        else:
+            bundle["failed"].append(f"{job['name']}: {error_message}")
+
+        if bundle["pending"]:
+            return
+        self.bundle = None
+        elapsed = time.monotonic() - bundle["started"]
+        text = f"Сохранено отчетов: {len(bundle['saved'])} за {elapsed:.1f} сек\n{bundle['folder']}"
+        if bundle["failed"]:
+            self.set_status("⚠️ Пакет отчетов сформирован не полностью", "error")
+            QMessageBox.warning(self, "Пакет отчетов", text + "\n\nНе удалось:\n" + "\n".join(bundle["failed"]))
+        else:
+            self.set_status("✅ Пакет отчетов сформирован", "success")
+            QMessageBox.information(self, "Пакет отчетов", text)
 
     def on_report_generated(self, filepath, report_name):
         """Обработчик успешной генерации отчета"""
-        self.progress_bar.setVisible(False)
-
         # Показываем успешный статус
-        self.status_label.setText(f"✅ Отчет '{report_name}' успешно сгенерирован")
-        self.status_label.setStyleSheet("""
-            QLabel {
-                color: #55C78C;
-                font-size: 12px;
-                padding: 8px;
-                background-color: #1C1E22;
-                border-radius: 5px;
-                border-left: 3px solid #55C78C;
-            }
-        """)
+        self.set_status(f"✅ Отчет '{report_name}' успешно сгенерирован", "success")
 
         # Предлагаем открыть или сохранить файл
         reply = QMessageBox.question(
@@ -248,42 +356,26 @@ class AdminPanelReportsView(QWidget):
                 self,
                 "Сохранить отчет",
                 os.path.basename(filepath),
-                "Excel Files (*.xlsx)"
+                SAVE_FILTERS.get(os.path.splitext(filepath)[1], "")
             )
             if new_path:
-                import shutil
                 shutil.copy2(filepath, new_path)
                 QMessageBox.information(self, "Успех", f"Отчет сохранен: {new_path}")
 
     def on_report_error(self, error_message):
         """Обработчик ошибки генерации отчета"""
-        self.progress_bar.setVisible(False)
-
-        self.status_label.setText(f"❌ Ошибка: {error_message}")
-        self.status_label.setStyleSheet("""
-            QLabel {
-                color: #E63946;
-                font-size: 12px;
-                padding: 8px;
-                background-color: #1C1E22;
-                border-radius: 5px;
-                border-left: 3px solid #E63946;
-            }
-        """)
-
+        self.set_status(f"❌ Ошибка: {error_message}", "error")
         QMessageBox.critical(self, "Ошибка", f"Не удалось сгенерировать отчет:\n{error_message}")
 
     def closeEvent(self, event):
-        """Обработчик закрытия окна"""
-        if self.current_report_thread and self.current_report_thread.isRunning():
-            self.current_report_thread.terminate()
-            self.current_report_thread.wait()
+        """Обработчик закрытия окна: задания отменяются, процессы сами завершают их корректно"""
+        self.runner.cancel()
         event.accept()
 
     def update_realtime_stats(self):
-        """Обновить статистику в реальном времени"""
+        """Обновить статистику в реальном времени - из счётчиков в памяти, без запроса к БД"""
         try:
-            stats = ReportsModel.get_realtime_stats()
+            stats = realtime_stats().snapshot()
             if stats:
                 active_movies, upcoming_sessions, today_tickets, today_revenue, active_users = stats
 
@@ -316,6 +408,10 @@ class AdminPanelReportsView(QWidget):
         except Exception as e:
             print(f"Ошибка обновления статистики: {e}")
 
+    def on_realtime_changed(self):
+        if self.isVisible():
+            self.update_realtime_stats()
+
     def showEvent(self, event):
         """Обработчик показа виджета"""
         super().showEvent(event)
@@ -5,7 +5,7 @@ from PyQt6.QtWidgets import (
     QGroupBox
 )
 from PyQt6.QtCore import Qt, QDateTime
-from core.database import datagrid_model
+from core.lazy_table import LazyTableModel
 from Models.SessionModel import SessionModel
 from Models.MovieModel import MovieModel
 from Models.HallModel import HallModel
@@ -15,6 +15,7 @@ class AdminPanelSessionsView(QWidget):
     def __init__(self, go_back=None):
         super().__init__()
         self.go_back = go_back
+        self.sessions_model = LazyTableModel(parent=self)
         self.setup_ui()
         self.refresh_sessions_table()
 
@@ -48,6 +49,7 @@ class AdminPanelSessionsView(QWidget):
         self.sessions_view.setSelectionMode(QTableView.SelectionMode.SingleSelection)
         self.sessions_view.setAlternatingRowColors(True)
         self.sessions_view.setSortingEnabled(True)
+        self.sessions_view.setModel(self.sessions_model)
         layout.addWidget(self.sessions_view, stretch=1)
 
         # Кнопки управления
@@ -84,7 +86,7 @@ class AdminPanelSessionsView(QWidget):
         self.movie_filter_combo = QComboBox()
         self.movie_filter_combo.addItem("Все фильмы", 0)
 
-        movies = MovieModel.get_all_movies()
+        movies = MovieModel.get_movie_titles()
         for movie in movies:
             self.movie_filter_combo.addItem(movie[1], movie[0])  # title, movie_id
 
@@ -108,16 +110,18 @@ class AdminPanelSessionsView(QWidget):
 
     def refresh_sessions_table(self):
         """Обновить таблицу сеансов"""
-        self.sessions_model = datagrid_model(
+        self.sessions_model.set_query(
             "SELECT s.session_id, m.title, h.hall_name, "
             "s.session_time, m.base_price + h.hall_extra_price as price, "
+            "ss.sold_seats || ' / ' || ss.capacity as sold, ss.revenue, "
             "s.created_at "
             "FROM session s "
             "JOIN movies m ON s.movie_id = m.movie_id "
             "JOIN hall h ON s.hall_id = h.hall_id "
-            "ORDER BY s.session_time DESC"
+            "LEFT JOIN session_stats ss ON s.session_id = ss.session_id "
+            "ORDER BY s.session_time DESC",
+            count_sql="SELECT COUNT(*) FROM session"
         )
-        self.sessions_view.setModel(self.sessions_model)
 
     def apply_filters(self):
         """Применить фильтры"""
@@ -138,10 +142,12 @@ class AdminPanelSessionsView(QWidget):
         sql = f"""
             SELECT s.session_id, m.title, h.hall_name, 
                    s.session_time, m.base_price + h.hall_extra_price as price,
+                   ss.sold_seats || ' / ' || ss.capacity as sold, ss.revenue,
                    s.created_at 
             FROM session s
             JOIN movies m ON s.movie_id = m.movie_id
             JOIN hall h ON s.hall_id = h.hall_id
+            LEFT JOIN session_stats ss ON s.session_id = ss.session_id
         """
 
         if where_conditions:
@@ -149,8 +155,7 @@ class AdminPanelSessionsView(QWidget):
 
         sql += " ORDER BY s.session_time DESC"
 
-        self.sessions_model = datagrid_model(sql, params)
-        self.sessions_view.setModel(self.sessions_model)
+        self.sessions_model.set_query(sql, params)
 
     def get_selected_session(self):
         """Получить выбранный сеанс"""
@@ -160,9 +165,9 @@ class AdminPanelSessionsView(QWidget):
 
         row = selection[0].row()
         return {
-            'session_id': self.sessions_model.item(row, 0).text(),
-            'movie_title': self.sessions_model.item(row, 1).text(),
-            'hall_name': self.sessions_model.item(row, 2).text()
+            'session_id': self.sessions_model.data(self.sessions_model.index(row, 0)),
+            'movie_title': self.sessions_model.data(self.sessions_model.index(row, 1)),
+            'hall_name': self.sessions_model.data(self.sessions_model.index(row, 2))
         }
 
     def add_session(self):
@@ -242,7 +247,7 @@ class SessionDialog(QDialog):
 
         # Выбор фильма
         self.movie_combo = QComboBox()
-        movies = MovieModel.get_all_movies()
+        movies = MovieModel.get_movie_titles()
         for movie in movies:
             self.movie_combo.addItem(movie[1], movie[0])  # title, movie_id
         layout.addRow("Фильм:", self.movie_combo)
@@ -2,14 +2,19 @@ from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QTableView, QSizePolicy, QMessageBox, QSpacerItem,
     QGroupBox, QDateEdit, QHeaderView, QTabWidget, QComboBox,
-    QScrollArea
+    QScrollArea, QFileDialog
 )
 from PyQt6.QtCore import Qt, QDate
-from core.database import datagrid_model
+from core.async_query import run_query_async
+from core.copy_export import export_file_filter, export_query
+from core.lazy_table import LazyTableModel
 from Models.TicketModel import TicketModel
 
 
 class AdminPanelTicketsView(QWidget):
+    # Новые покупки сверху; блоки таблицы читаются по ключу (purchase_date, ticket_id) - индекс idx_ticket_purchase_date_id
+    TICKETS_ORDER_BY = (("purchase_key", "ID"), True)
+
     def __init__(self, user_id, go_back=None):
         super().__init__()
 
@@ -18,7 +23,9 @@ class AdminPanelTicketsView(QWidget):
 
         self.stats_label = None
         self.revenue_label = None
-        self.model = None
+        self.model = LazyTableModel(parent=self)
+        # Фильтры, по которым построена таблица, - аргументы TicketModel.export_query
+        self.export_filters = {}
 
         # ✅ Устанавливаем минимальный размер для всего виджета
         self.setMinimumSize(600, 400)
@@ -124,6 +131,7 @@ class AdminPanelTicketsView(QWidget):
         self.tickets_view = QTableView()
         self.tickets_view.setAlternatingRowColors(True)
         self.tickets_view.setSortingEnabled(True)
+        self.tickets_view.setModel(self.model)
 
         # ✅ Настройки адаптивности таблицы
         self.tickets_view.setMinimumHeight(300)
@@ -151,6 +159,11 @@ class AdminPanelTicketsView(QWidget):
         self.btn_refresh.clicked.connect(self.load_tickets)
         btns.addWidget(self.btn_refresh)
 
+        self.btn_export = QPushButton("📤 Экспорт")
+        self.btn_export.setMaximumWidth(150)
+        self.btn_export.clicked.connect(self.export_tickets)
+        btns.addWidget(self.btn_export)
+
         btns.addSpacerItem(QSpacerItem(40, 20, QSizePolicy.Policy.Expanding))
         layout.addLayout(btns)
 
@@ -302,18 +315,20 @@ class AdminPanelTicketsView(QWidget):
                     CASE 
                         WHEN s.session_time > NOW() THEN 'Активный'
                         ELSE 'Использован'
-                    END as "Статус"
+                    END as "Статус",
+                    t.purchase_date as purchase_key
                 FROM ticket t
                 JOIN session s ON t.session_id = s.session_id
                 JOIN movies m ON s.movie_id = m.movie_id
                 JOIN users u ON t.user_id = u.user_id
                 JOIN hall h ON s.hall_id = h.hall_id
                 JOIN seat st ON t.seat_id = st.seat_id
-                ORDER BY t.purchase_date DESC
             """
 
-            self.model = datagrid_model(sql)
-            self.tickets_view.setModel(self.model)
+            # Все JOIN идут по обязательным внешним ключам, поэтому строк столько же, сколько билетов
+            self.model.set_query(sql, count_sql="SELECT COUNT(*) FROM ticket",
+                                 order_by=self.TICKETS_ORDER_BY, hidden_columns=("purchase_key",))
+            self.export_filters = {}
 
             self.update_stats()
 
@@ -421,7 +436,7 @@ class AdminPanelTicketsView(QWidget):
             date_to = self.date_to.date().toString("yyyy-MM-dd")
             status = self.status_filter_combo.currentData()
 
-            sql = f"""
+            sql = """
                 SELECT 
                     t.ticket_id as "ID",
                     m.title as "Фильм", 
@@ -435,26 +450,35 @@ class AdminPanelTicketsView(QWidget):
                     CASE 
                         WHEN s.session_time > NOW() THEN 'Активный'
                         ELSE 'Использован'
-                    END as "Статус"
+                    END as "Статус",
+                    t.purchase_date as purchase_key
                 FROM ticket t
                 JOIN session s ON t.session_id = s.session_id
                 JOIN movies m ON s.movie_id = m.movie_id
                 JOIN users u ON t.user_id = u.user_id
                 JOIN hall h ON s.hall_id = h.hall_id
                 JOIN seat st ON t.seat_id = st.seat_id
-                WHERE DATE(t.purchase_date) BETWEEN '{date_from}' AND '{date_to}'
+                WHERE t.purchase_date >= %s::date AND t.purchase_date < %s::date + 1
+            """
+            count_sql = """
+                SELECT COUNT(*)
+                FROM ticket t
+                JOIN session s ON t.session_id = s.session_id
+                WHERE t.purchase_date >= %s::date AND t.purchase_date < %s::date + 1
             """
 
+            status_condition = ""
             if status == "active":
-                sql += " AND s.session_time > NOW()"
+                status_condition = " AND s.session_time > NOW()"
             elif status == "used":
-                sql += " AND s.session_time <= NOW()"
-
-            sql += " ORDER BY t.purchase_date DESC"
+                status_condition = " AND s.session_time <= NOW()"
 
-            self.model = datagrid_model(sql)
-            self.tickets_view.setModel(self.model)
+            sql += status_condition
+            count_sql += status_condition
 
+            self.model.set_query(sql, [date_from, date_to], count_sql, [date_from, date_to],
+                                 order_by=self.TICKETS_ORDER_BY, hidden_columns=("purchase_key",))
+            self.export_filters = {"date_from": date_from, "date_to": date_to, "status": status}
 
             row_count = self.model.rowCount()
             QMessageBox.information(
@@ -466,6 +490,32 @@ class AdminPanelTicketsView(QWidget):
         except Exception as e:
             QMessageBox.critical(self, "Ошибка", f"Не удалось применить фильтр: {str(e)}")
 
+    def export_tickets(self):
+        """Выгрузить билеты по текущим фильтрам таблицы в CSV или Parquet (через COPY, без загрузки в память)"""
+        filepath, _ = QFileDialog.getSaveFileName(self, "Экспорт билетов", "tickets.csv", export_file_filter())
+        if not filepath:
+            return
+        self.btn_export.setEnabled(False)
+        self.btn_export.setText("⏳ Экспорт...")
+        run_query_async(AdminPanelTicketsView.write_export, tuple(sorted(self.export_filters.items())), filepath,
+                        on_result=self.on_export_done, on_error=self.on_export_failed)
+
+    @staticmethod
+    def write_export(filters, filepath):
+        sql, params = TicketModel.export_query(**dict(filters))
+        return export_query(sql, params, filepath)
+
+    def on_export_done(self, filepath):
+        self.btn_export.setEnabled(True)
+        self.btn_export.setText("📤 Экспорт")
+        QMessageBox.information(self, "Успех", f"Билеты выгружены: {filepath}")
+
+    def on_export_failed(self, error):
+        print(f"Ошибка при экспорте билетов: {error}")
+        self.btn_export.setEnabled(True)
+        self.btn_export.setText("📤 Экспорт")
+        QMessageBox.critical(self, "Ошибка", f"Не удалось выгрузить билеты: {str(error)}")
+
     def reset_filters(self):
         """Сбросить фильтры"""
         self.date_from.setDate(QDate.currentDate().addDays(-30))
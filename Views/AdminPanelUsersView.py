@@ -4,7 +4,8 @@ from PyQt6.QtWidgets import (
     QComboBox, QFormLayout, QDialogButtonBox
 )
 from PyQt6.QtCore import Qt
-from core.database import query, datagrid_model
+from core.database import query
+from core.lazy_table import LazyTableModel
 
 
 class AdminPanelUsersView(QWidget):
@@ -34,8 +35,8 @@ class AdminPanelUsersView(QWidget):
 
         layout.addLayout(header)
 
-        # Таблица пользователей
-        self.refresh_table()
+        # Таблица пользователей (редактируются только логин и email)
+        self.model = LazyTableModel(editable_columns=(1, 2), parent=self)
 
         self.view = QTableView()
         self.view.setModel(self.model)
@@ -87,29 +88,19 @@ class AdminPanelUsersView(QWidget):
         btns.addSpacerItem(QSpacerItem(40, 20, QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum))
         layout.addLayout(btns)
 
+        self.refresh_table()
+
     # ----------------------------------------------------------
     def refresh_table(self):
         """Обновить таблицу пользователей"""
-        self.model = datagrid_model(
+        self.model.set_query(
             "SELECT u.user_id, u.login, u.email, r.role_name, u.status, "
             "u.created_at, u.updated_at, u.last_login "
             "FROM users u JOIN roles r ON u.role_id = r.role_id "
-            "ORDER BY u.user_id"
+            "ORDER BY u.user_id",
+            count_sql="SELECT COUNT(*) FROM users"
         )
 
-        if hasattr(self, 'view'):
-            self.view.setModel(self.model)
-            # Переподключаем обработчик после обновления модели
-            self.view.selectionModel().selectionChanged.connect(self.on_selection_changed)
-
-        # Делаем определенные колонки нередактируемыми
-        for row in range(self.model.rowCount()):
-            # user_id, role_name, status, created_at, updated_at, last_login - только для чтения
-            for col in [0, 3, 4, 5, 6, 7]:
-                item = self.model.item(row, col)
-                if item:
-                    item.setEditable(False)
-
     # ----------------------------------------------------------
     def on_selection_changed(self):
         """Обработчик изменения выбора в таблице - обновляет текст кнопки бана"""
@@ -143,10 +134,10 @@ class AdminPanelUsersView(QWidget):
             return None
 
         row = selection[0].row()
-        user_id = self.model.item(row, 0).text()
-        login = self.model.item(row, 1).text()
-        current_role = self.model.item(row, 3).text()
-        current_status = self.model.item(row, 4).text()
+        user_id = self.model.data(self.model.index(row, 0))
+        login = self.model.data(self.model.index(row, 1))
+        current_role = self.model.data(self.model.index(row, 3))
+        current_status = self.model.data(self.model.index(row, 4))
 
         return {
             'user_id': user_id,
@@ -268,10 +259,11 @@ class AdminPanelUsersView(QWidget):
         """Сохранить изменения логина и email (редактируемые поля)"""
         try:
             updated_count = 0
-            for row in range(self.model.rowCount()):
-                user_id = self.model.item(row, 0).text()
-                login = self.model.item(row, 1).text().strip()
-                email = self.model.item(row, 2).text().strip()
+            # Сохраняем только строки, которые правились в таблице
+            for row, values in self.model.edited_rows().items():
+                user_id = values[0]
+                login = values[1].strip()
+                email = values[2].strip()
 
                 # Валидация
                 if not login or not email:
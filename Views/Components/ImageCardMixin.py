@@ -0,0 +1,64 @@
+from PyQt6.QtCore import QTimer
+from core.image_loader import image_loader
+
+
+class ImageCardMixin:
+    """
+    Фоновая загрузка картинки карточки через image_loader.
+    Запрос, вытесненный из очереди, повторяется только для карточки в области видимости
+    и только когда в очереди есть место, поэтому повтор никого не вытесняет.
+    Байты картинки держатся только до декодирования.
+    """
+    image_request = None
+    _image_source = None
+    _image_handlers = None
+    _image_dropped = False
+    _waiting_room = False
+
+    def load_image(self, image_bytes, width, height, content_key, on_ready, on_failed):
+        self._image_source = (image_bytes, width, height, content_key)
+        self._image_handlers = (on_ready, on_failed)
+        self._request_image()
+
+    def _request_image(self):
+        self._image_dropped = False
+        if self._waiting_room:
+            self._waiting_room = False
+            image_loader().room_available.disconnect(self._retry_dropped_image)
+        image_bytes, width, height, content_key = self._image_source
+        self.image_request = image_loader().load(
+            image_bytes, width, height, content_key,
+            on_ready=self._on_image_ready, on_failed=self._on_image_failed, on_dropped=self._on_image_dropped
+        )
+        if self.image_request is not None:
+            # Карточку убрали (смена страницы) - декодировать её картинку уже не нужно
+            self.destroyed.connect(self.image_request.cancel)
+
+    def _on_image_ready(self, pixmap):
+        self.image_request = None
+        self._image_source = None
+        self._image_handlers[0](pixmap)
+
+    def _on_image_failed(self):
+        self.image_request = None
+        self._image_source = None
+        self._image_handlers[1]()
+
+    def _on_image_dropped(self):
+        """Запрос вытеснили из очереди более новые: повторить, когда карточка на экране и есть место"""
+        self.image_request = None
+        self._image_dropped = True
+        if not self._waiting_room:
+            self._waiting_room = True
+            image_loader().room_available.connect(self._retry_dropped_image)
+
+    def _retry_dropped_image(self):
+        if not self._image_dropped or self.visibleRegion().isEmpty() or not image_loader().has_room():
+            return
+        self._request_image()
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self._image_dropped:
+            # Карточку отрисовывают - она показана или её прокрутили в область видимости
+            QTimer.singleShot(0, self._retry_dropped_image)
@@ -1,9 +1,10 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QFrame
 from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QPixmap, QCursor
+from PyQt6.QtGui import QCursor
+from Views.Components.ImageCardMixin import ImageCardMixin
 
 
-class MovieCard(QFrame):
+class MovieCard(ImageCardMixin, QFrame):
     """Карточка фильма"""
     clicked = pyqtSignal(int)
 
@@ -14,6 +15,7 @@ class MovieCard(QFrame):
         self.description = movie_data[2]
         self.image_bytes = movie_data[3]
         self.rating = movie_data[5]
+        self.image_hash = movie_data[8] if len(movie_data) > 8 else None
 
         self.is_hovered = False
         self.setup_ui()
@@ -43,24 +45,11 @@ class MovieCard(QFrame):
             }
         """)
 
-        # Загружаем изображение
+        # Постер декодируется в фоне, до этого видна пустая подложка
         if self.image_bytes:
-            try:
-                pixmap = QPixmap()
-                pixmap.loadFromData(bytes(self.image_bytes))
-
-                if not pixmap.isNull():
-                    scaled_pixmap = pixmap.scaled(
-                        215, 275,
-                        Qt.AspectRatioMode.KeepAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation
-                    )
-                    self.poster_label.setPixmap(scaled_pixmap)
-                else:
-                    self.set_placeholder()
-            except Exception as e:
-                print(f"Ошибка загрузки изображения: {e}")
-                self.set_placeholder()
+            self.load_image(self.image_bytes, 215, 275, self.image_hash, self.on_image_ready, self.set_placeholder)
+            # Байты держит только запрос загрузки - до декодирования
+            self.image_bytes = None
         else:
             self.set_placeholder()
 
@@ -101,6 +90,10 @@ class MovieCard(QFrame):
 
         layout.addWidget(info_container)
 
+    def on_image_ready(self, pixmap):
+        """Постер готов - показать его вместо подложки"""
+        self.poster_label.setPixmap(pixmap)
+
     def set_placeholder(self):
         """Заглушка для отсутствующего изображения"""
         self.poster_label.clear()
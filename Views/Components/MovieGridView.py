@@ -5,6 +5,7 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, pyqtSignal
 from Views.Components.MovieCard import MovieCard
 from Models.MovieModel import MovieModel
+from core.async_query import run_query_async
 
 
 class MovieGridView(QWidget):
@@ -18,6 +19,7 @@ class MovieGridView(QWidget):
         self.current_page = 1
         self.movies_per_page = 20  # 5 рядов по 4 фильма = 20 фильмов на странице
         self.total_movies = 0
+        self.page_keys = {1: None}  # номер страницы -> ключ последнего фильма предыдущей страницы
 
         self.setup_ui()
         self.load_movies()
@@ -169,20 +171,45 @@ class MovieGridView(QWidget):
             page = 1
 
         self.current_page = page
+        self.reset_paging()
+        self.apply_filters()
 
-        # Сбрасываем фильтры при обычной загрузке
-        if not hasattr(self, 'search_text') and not hasattr(self, 'current_genre_id'):
-            movies = MovieModel.get_all_movies()
-            self.display_movies(movies, page)
-        else:
-            # Используем текущие фильтры
-            self.apply_filters()
+    def get_filter_args(self):
+        """Текущие фильтры в виде (genre_id, search_text)"""
+        search_text = getattr(self, 'search_text', '')
+        if len(search_text) < 2:
+            # Поиск включается с двух символов (см. on_search)
+            search_text = None
+        genre_id = getattr(self, 'current_genre_id', 0) or None
+        if search_text:
+            # Поиск работает по всему каталогу, как и раньше
+            genre_id = None
+        return genre_id, search_text
+
+    def reset_paging(self):
+        """Сбросить ключи страниц; общее количество пересчитается вместе со следующей страницей"""
+        self.page_keys = {1: None}
+        self.total_movies = None
+
+    @staticmethod
+    def fetch_page(page, limit, page_key, key_known, genre_id, search_text, with_total):
+        """
+        Всё, что нужно для страницы, одним фоновым вызовом:
+        ключ начала страницы (keyset-пагинация), фильмы и при необходимости общее количество.
+        """
+        if not key_known:
+            page_key = MovieModel.get_page_start_key((page - 1) * limit, genre_id, search_text)
+        total = MovieModel.count_movies(genre_id, search_text) if with_total else None
+        movies = MovieModel.get_movies_page(limit, page_key, genre_id, search_text)
+        next_key = MovieModel.get_page_key(movies[-1], genre_id, search_text) if movies else None
+        return page, page_key, next_key, total, movies
 
     def on_search(self, text):
         """Обработка поиска"""
         self.search_text = text.strip()
         if len(self.search_text) >= 2:
             self.current_page = 1
+            self.reset_paging()
             self.apply_filters()
         elif len(self.search_text) == 0:
             self.current_page = 1
@@ -195,31 +222,44 @@ class MovieGridView(QWidget):
         genre_id = self.genre_combo.currentData()
         self.current_genre_id = genre_id
         self.current_page = 1
+        self.reset_paging()
         self.apply_filters()
 
     def apply_filters(self):
-        """Применить фильтры и пагинацию"""
-        try:
-            # Определяем какие фильмы загружать
-            if hasattr(self, 'search_text') and self.search_text:
-                movies = MovieModel.search_movies(self.search_text)
-            elif hasattr(self, 'current_genre_id') and self.current_genre_id != 0:
-                movies = MovieModel.get_movies_by_genre(self.current_genre_id)
-            else:
-                movies = MovieModel.get_all_movies()
-
-            self.display_movies(movies, self.current_page)
-
-        except Exception as e:
-            print(f"Ошибка при применении фильтров: {e}")
-
-    def display_movies(self, movies, page=1):
-        """Отобразить карточки фильмов для указанной страницы"""
-        # Очищаем старые карточки
+        """Загрузить из БД только текущую страницу с учётом фильтров (в фоне)"""
+        genre_id, search_text = self.get_filter_args()
+        page = self.current_page
+        # Ответы на устаревшие запросы (быстрый ввод в поиске, частые клики) отбрасываются
+        run_query_async(MovieGridView.fetch_page, page, self.movies_per_page,
+                        self.page_keys.get(page), page in self.page_keys,
+                        genre_id, search_text, self.total_movies is None,
+                        on_result=self.on_page_loaded, on_error=self.on_page_failed,
+                        owner=self, channel="page", coalesce=True)
+
+    def on_page_failed(self, error):
+        print(f"Ошибка при применении фильтров: {error}")
+
+    def on_page_loaded(self, result):
+        page, page_key, next_key, total, movies = result
+        self.page_keys[page] = page_key
+        if next_key is not None:
+            # Запоминаем начало следующей страницы, чтобы "Вперед" не требовал OFFSET
+            self.page_keys[page + 1] = next_key
+        if total is not None:
+            self.total_movies = total
+        self.display_movies(movies)
+
+    def display_movies(self, movies):
+        """Отобразить карточки фильмов текущей страницы"""
+        # Очищаем старые карточки; недекодированные постеры ушедшей страницы отменяем сразу
         while self.cards_layout.count():
             item = self.cards_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
+            widget = item.widget()
+            if widget:
+                request = getattr(widget, 'image_request', None)
+                if request is not None:
+                    request.cancel()
+                widget.deleteLater()
 
         # Очищаем номера страниц
         while self.pages_layout.count():
@@ -228,7 +268,6 @@ class MovieGridView(QWidget):
                 item.widget().deleteLater()
 
         self.current_movies = movies
-        self.total_movies = len(movies)
 
         if not movies:
             # Показать сообщение "Ничего не найдено"
@@ -246,17 +285,13 @@ class MovieGridView(QWidget):
             return
 
         # Рассчитываем пагинацию
-        total_pages = (self.total_movies + self.movies_per_page - 1) // self.movies_per_page
-        start_index = (page - 1) * self.movies_per_page
-        end_index = min(start_index + self.movies_per_page, self.total_movies)
-
-        current_page_movies = movies[start_index:end_index]
+        total_pages = ((self.total_movies or 0) + self.movies_per_page - 1) // self.movies_per_page
 
         # Отображаем карточки в сетке (4 в ряд)
         row, col = 0, 0
         max_cols = 4
 
-        for movie_data in current_page_movies:
+        for movie_data in movies:
             card = MovieCard(movie_data)
             card.clicked.connect(self.on_movie_clicked)
 
@@ -337,7 +372,7 @@ class MovieGridView(QWidget):
 
     def next_page(self):
         """Перейти на следующую страницу"""
-        total_pages = (self.total_movies + self.movies_per_page - 1) // self.movies_per_page
+        total_pages = ((self.total_movies or 0) + self.movies_per_page - 1) // self.movies_per_page
         if self.current_page < total_pages:
             self.go_to_page(self.current_page + 1)
 
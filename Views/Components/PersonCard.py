@@ -1,16 +1,17 @@
 # Views/Components/PersonCard.py - ПРЯМОУГОЛЬНЫЕ КАРТОЧКИ
 from PyQt6.QtWidgets import QFrame, QVBoxLayout, QLabel, QWidget
 from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QPixmap
+from Views.Components.ImageCardMixin import ImageCardMixin
 
 
-class PersonCard(QFrame):
+class PersonCard(ImageCardMixin, QFrame):
     def __init__(self, person_data, is_director=False, parent=None):
         super().__init__(parent)
         self.person_id = person_data[0]
         self.fullname = person_data[1]
         self.photo_bytes = person_data[2] if len(person_data) > 2 else None
         self.role = person_data[3] if len(person_data) > 3 else None
+        self.photo_hash = person_data[4] if len(person_data) > 4 else None
         self.is_director = is_director
 
         self.setup_ui()
@@ -35,22 +36,11 @@ class PersonCard(QFrame):
             }
         """)
 
+        # Фото декодируется в фоне, до этого видна пустая подложка
         if self.photo_bytes:
-            try:
-                pixmap = QPixmap()
-                pixmap.loadFromData(bytes(self.photo_bytes))
-                if not pixmap.isNull():
-                    scaled_pixmap = pixmap.scaled(
-                        180, 200,
-                        Qt.AspectRatioMode.KeepAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation
-                    )
-                    self.photo_label.setPixmap(scaled_pixmap)
-                else:
-                    self.set_placeholder_photo()
-            except Exception as e:
-                print(f"Ошибка загрузки фото: {e}")
-                self.set_placeholder_photo()
+            self.load_image(self.photo_bytes, 180, 200, self.photo_hash, self.on_photo_ready, self.set_placeholder_photo)
+            # Байты держит только запрос загрузки - до декодирования
+            self.photo_bytes = None
         else:
             self.set_placeholder_photo()
 
@@ -132,6 +122,9 @@ class PersonCard(QFrame):
             }
         """)
 
+    def on_photo_ready(self, pixmap):
+        self.photo_label.setPixmap(pixmap)
+
     def set_placeholder_photo(self):
         """Заглушка для фото в стиле фильмов"""
         placeholder_text = "🎬\n\nРежиссёр" if self.is_director else "🎭\n\nАктёр"
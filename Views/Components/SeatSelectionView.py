@@ -3,18 +3,24 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                              QScrollArea)
 from PyQt6.QtCore import Qt, pyqtSignal, QTimer
 from Models.TicketModel import TicketModel
+from Models.SeatMapModel import SeatMapModel
+from Models.SeatHoldModel import SeatHoldModel
+from core.async_query import run_query_async
+from core.config import SEAT_HOLD_TTL
+from core.seat_notifications import seat_listener
 
 
 class SeatWidget(QFrame):
     seat_clicked = pyqtSignal(int, int, float)  # seat_id, seat_number, price
 
-    def __init__(self, seat_data, is_available=True, parent=None):
+    def __init__(self, seat_data, is_available=True, is_held=False, parent=None):
         super().__init__(parent)
         self.seat_id = seat_data[0]
         self.row = seat_data[1]
         self.number = seat_data[2]
         self.price = float(seat_data[3]) if seat_data[3] else 0.0
         self.is_available = is_available
+        self.is_held = is_held and not is_available  # место выбирает другой покупатель
         self.is_selected = False
 
         self.setup_ui()
@@ -42,7 +48,16 @@ class SeatWidget(QFrame):
         self.update_style()
 
     def update_style(self):
-        if not self.is_available:
+        if self.is_held:
+            # Место временно удерживает другой покупатель
+            self.setStyleSheet("""
+                QFrame {
+                    background-color: #F4A261;
+                    border: 2px solid #C9753D;
+                    border-radius: 8px;
+                }
+            """)
+        elif not self.is_available:
             # Занятое место
             self.setStyleSheet("""
                 QFrame {
@@ -85,6 +100,15 @@ class SeatWidget(QFrame):
         self.update_style()
         self.seat_clicked.emit(self.seat_id, self.number, self.price)
 
+    def set_available(self, available, held=False):
+        """Место продали, освободили или временно заняли в другом окне/кассе"""
+        self.is_available = available
+        self.is_held = held and not available
+        if not available:
+            self.is_selected = False
+        self.setCursor(Qt.CursorShape.PointingHandCursor if available else Qt.CursorShape.ForbiddenCursor)
+        self.update_style()
+
     def set_selected(self, selected):
         """Установить состояние выбора извне"""
         if self.is_available:
@@ -101,11 +125,26 @@ class SeatSelectionView(QWidget):
         self.session_id = session_id
         self.user_id = user_id
         self.selected_seats = {}  # словарь {seat_id: (seat_number, price)}
+        self.held_seats = set()  # места, бронь которых в БД сейчас за нами
+        # Места, по которым выполняется hold/release: следующая операция места ждёт результата предыдущей
+        self.seat_ops = set()
         self.seat_widgets = {}  # словарь {seat_id: SeatWidget}
+        self.pricing = None  # PricingSnapshot - цены сеанса, загружаются вместе со схемой зала
+        self.occupancy = None  # SessionOccupancy, по которой построена схема
+        self.booking = False  # идёт сверка цен или бронирование
 
         self.setup_ui()
         self.load_seats()
 
+        # Выбранные места держим за собой (seat_hold); продлеваем раньше, чем истечёт TTL
+        self.hold_timer = QTimer(self)
+        self.hold_timer.setInterval(max(SEAT_HOLD_TTL // 3, 5) * 1000)
+        self.hold_timer.timeout.connect(self.refresh_holds)
+        self.hold_timer.start()
+
+        # Продажи и отмены с других касс применяются к схеме без перезагрузки
+        seat_listener().ticket_changed.connect(self.on_ticket_changed)
+
     def setup_ui(self):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(20, 20, 20, 20)
@@ -159,6 +198,17 @@ class SeatSelectionView(QWidget):
         selected_legend.addWidget(selected_label)
         legend_layout.addLayout(selected_legend)
 
+        # Выбирает другой покупатель
+        held_legend = QHBoxLayout()
+        held_color = QLabel()
+        held_color.setFixedSize(20, 20)
+        held_color.setStyleSheet("background-color: #F4A261; border-radius: 4px;")
+        held_label = QLabel("Выбирают")
+        held_label.setStyleSheet("color: #CCCCCC;")
+        held_legend.addWidget(held_color)
+        held_legend.addWidget(held_label)
+        legend_layout.addLayout(held_legend)
+
         legend_layout.addStretch()
         layout.addLayout(legend_layout)
 
@@ -244,8 +294,12 @@ class SeatSelectionView(QWidget):
 
     def load_session_info(self):
         """Загрузить информацию о сеансе"""
+        run_query_async(TicketModel.get_session_info, self.session_id,
+                        on_result=self.show_session_info, owner=self, channel="session_info",
+                        coalesce=True)
+
+    def show_session_info(self, session_info):
         try:
-            session_info = TicketModel.get_session_info(self.session_id)
             if session_info:
                 # session_info[1] - title, session_info[3] - hall_name, session_info[5] - session_time
                 info_text = f"🎬 {session_info[1]} | 🎭 {session_info[3]} | 🕒 {session_info[5].strftime('%d.%m.%Y %H:%M')}"
@@ -253,9 +307,32 @@ class SeatSelectionView(QWidget):
         except Exception as e:
             print(f"Ошибка при загрузке информации о сеансе: {e}")
 
+    @staticmethod
+    def fetch_seats(session_id):
+        """Схема зала (из кэша) и занятость сеанса - выполняется в фоновом потоке"""
+        occupancy = SeatMapModel.load(session_id)
+        if occupancy is None:
+            raise Exception("Не удалось получить информацию о сеансе")
+        pricing = SeatMapModel.get_pricing(session_id, occupancy.layout)
+        return occupancy, pricing
+
     def load_seats(self):
         """Загрузить места зала"""
+        run_query_async(SeatSelectionView.fetch_seats, self.session_id,
+                        on_result=self.show_seats, on_error=self.on_seats_failed,
+                        owner=self, channel="seats")
+
+    def on_seats_failed(self, error):
+        print(f"Ошибка при загрузке мест: {error}")
+        QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить схему зала: {str(error)}")
+
+    def show_seats(self, seats):
+        """Построить схему зала"""
         try:
+            occupancy, self.pricing = seats
+            self.occupancy = occupancy
+            layout = occupancy.layout
+
             # Очищаем предыдущие виджеты
             while self.seats_layout.count():
                 child = self.seats_layout.takeAt(0)
@@ -263,52 +340,31 @@ class SeatSelectionView(QWidget):
                     child.widget().deleteLater()
 
             self.seat_widgets.clear()
+            # Выбор сбрасывается вместе со схемой - отпускаем и бронь этих мест
             self.selected_seats.clear()
+            self.sync_holds(list(self.held_seats))
+            self.update_selection_info()
 
-            # Получаем информацию о сеансе
-            session_info = TicketModel.get_session_info(self.session_id)
-            if not session_info:
-                raise Exception("Не удалось получить информацию о сеансе")
-
-            hall_id = session_info[7]  # hall_id - последний элемент
-
-            # Получаем все места зала
-            all_seats = TicketModel.get_all_seats_for_hall(hall_id)
-
-            # Получаем занятые места для этого сеанса
-            occupied_seats = TicketModel.get_occupied_seats(self.session_id)
-            occupied_ids = {seat[0] for seat in occupied_seats}
-
-            # Группируем места по рядам
-            rows = {}
-            for seat in all_seats:
-                row = seat[1]
-                if row not in rows:
-                    rows[row] = []
-                rows[row].append(seat)
-
-            # Сортируем ряды
-            sorted_rows = sorted(rows.keys())
-
-            # Создаем виджеты мест
-            for row_index, row_num in enumerate(sorted_rows):
+            # Схема уже упорядочена по рядам и номерам - группировать не нужно
+            for row_index, (row_num, start, end) in enumerate(layout.row_bounds):
                 # Метка ряда
                 row_label = QLabel(f"Ряд {row_num}")
                 row_label.setStyleSheet("color: #FFFFFF; font-weight: 600; margin-right: 10px;")
                 self.seats_layout.addWidget(row_label, row_index, 0)
 
                 # Места в ряду
-                seats_in_row = sorted(rows[row_num], key=lambda x: x[2])
-                for col_index, seat_data in enumerate(seats_in_row):
-                    # Проверяем доступность места
-                    is_available = seat_data[0] not in occupied_ids
+                for col_index, seat_index in enumerate(range(start, end)):
+                    seat_data = layout.seat(seat_index)
+                    # Проверяем доступность места: не продано и не выбрано другим покупателем
+                    is_available = occupancy.is_available(seat_index, self.user_id)
+                    is_held = not is_available and not occupancy.is_occupied(seat_index)
 
                     # Создаем виджет места
-                    seat_widget = SeatWidget(seat_data, is_available)
+                    seat_widget = SeatWidget(seat_data, is_available, is_held)
 
-                    # Подключаем сигнал только для доступных мест
-                    if is_available:
-                        seat_widget.seat_clicked.connect(self.on_seat_clicked)
+                    # Клик по занятому месту виджет не передаёт, поэтому подключаем все места:
+                    # место может освободиться, пока схема открыта
+                    seat_widget.seat_clicked.connect(self.on_seat_clicked)
 
                     # Сохраняем виджет
                     self.seat_widgets[seat_data[0]] = seat_widget
@@ -319,19 +375,148 @@ class SeatSelectionView(QWidget):
             print(f"Ошибка при загрузке мест: {e}")
             QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить схему зала: {str(e)}")
 
+    def on_ticket_changed(self, op, ticket_id, session_id, seat_id, user_id):
+        """Изменение из LISTEN/NOTIFY: обновляем одно место"""
+        if session_id != self.session_id:
+            return
+        seat_widget = self.seat_widgets.get(seat_id)
+        if seat_widget is None:
+            return
+
+        if op == "INSERT":
+            seat_widget.set_available(False)
+            self.held_seats.discard(seat_id)
+            if self.selected_seats.pop(seat_id, None) is not None:
+                # Выбранное место купили на другой кассе
+                self.update_selection_info()
+        elif op == "DELETE":
+            seat_widget.set_available(True)
+        elif op == "HOLD" and user_id != self.user_id:
+            if not seat_widget.is_available and not seat_widget.is_held:
+                return  # место уже продано
+            seat_widget.set_available(False, held=True)
+            self.held_seats.discard(seat_id)
+            if self.selected_seats.pop(seat_id, None) is not None:
+                self.update_selection_info()
+        elif op == "RELEASE" and seat_widget.is_held:
+            seat_widget.set_available(True)
+
     def on_seat_clicked(self, seat_id, seat_number, price):
-        """Обработчик выбора места"""
+        """Обработчик выбора места: выбор виден сразу, бронь места берётся в фоне"""
         try:
             if seat_id in self.selected_seats:
                 del self.selected_seats[seat_id]
             else:
                 self.selected_seats[seat_id] = (seat_number, float(price))
+            self.sync_holds([seat_id])
 
             self.update_selection_info()
 
         except Exception as e:
             print(f"Ошибка при обработке выбора места: {e}")
 
+    def sync_holds(self, seat_ids):
+        """
+        Привести бронь мест в БД к текущему выбору. По каждому месту выполняется не больше одной
+        операции: пока идёт hold или release, место ждёт её результата, и уже из него
+        запускается следующая - так отпускание не обгонит бронь, взятую раньше.
+        """
+        to_hold, to_release = [], []
+        for seat_id in seat_ids:
+            if seat_id in self.seat_ops:
+                continue
+            if seat_id in self.selected_seats and seat_id not in self.held_seats:
+                to_hold.append(seat_id)
+            elif seat_id not in self.selected_seats and seat_id in self.held_seats:
+                to_release.append(seat_id)
+
+        if to_hold:
+            self.seat_ops.update(to_hold)
+            run_query_async(SeatSelectionView.hold_seats, self.session_id, tuple(to_hold), self.user_id,
+                            on_result=self.on_hold_result)
+        if to_release:
+            self.seat_ops.update(to_release)
+            self.held_seats.difference_update(to_release)
+            run_query_async(SeatSelectionView.release_seats, self.session_id, tuple(to_release), self.user_id,
+                            on_result=self.on_release_result)
+
+    @staticmethod
+    def hold_seats(session_id, seat_ids, user_id):
+        """
+        Взять или продлить бронь мест (в фоновом потоке).
+        Возвращает (seat_ids, удержанные, проданные из неудержанных).
+        """
+        held = SeatHoldModel.hold_seats(session_id, seat_ids, user_id)
+        failed = [seat_id for seat_id in seat_ids if seat_id not in held]
+        return seat_ids, held, TicketModel.get_sold_seat_ids(session_id, failed)
+
+    @staticmethod
+    def release_seats(session_id, seat_ids, user_id):
+        SeatHoldModel.release_seats(session_id, seat_ids, user_id)
+        return seat_ids
+
+    def on_hold_result(self, result):
+        """Место успел выбрать или купить кто-то другой - снимаем выбор"""
+        seat_ids, held, sold = result
+        held, sold = set(held), set(sold)
+        lost_sold = lost_held = 0
+        for seat_id in seat_ids:
+            self.seat_ops.discard(seat_id)
+            if seat_id in held:
+                self.held_seats.add(seat_id)
+                continue
+            self.held_seats.discard(seat_id)
+            if seat_id not in self.selected_seats:
+                continue
+            del self.selected_seats[seat_id]
+            seat_widget = self.seat_widgets.get(seat_id)
+            if seat_widget is not None:
+                seat_widget.set_available(False, held=seat_id not in sold)
+            if seat_id in sold:
+                lost_sold += 1
+            else:
+                lost_held += 1
+
+        # Выбор могли изменить, пока шёл запрос
+        self.sync_holds(seat_ids)
+
+        if lost_sold or lost_held:
+            self.update_selection_info()
+            reason = "Место уже купили" if lost_sold else "Место уже выбрал другой покупатель"
+            self.selection_info.setText(self.selection_info.text() + f" | {reason}")
+
+    def on_release_result(self, seat_ids):
+        for seat_id in seat_ids:
+            self.seat_ops.discard(seat_id)
+        self.sync_holds(seat_ids)
+
+    def refresh_holds(self):
+        """Продлить бронь выбранных мест и удалить истёкшую бронь"""
+        # Продление - такая же операция hold: места, по которым что-то выполняется, пропускаем
+        to_extend = [seat_id for seat_id in self.selected_seats
+                     if seat_id in self.held_seats and seat_id not in self.seat_ops]
+        if to_extend:
+            self.seat_ops.update(to_extend)
+            run_query_async(SeatSelectionView.hold_seats, self.session_id, tuple(to_extend), self.user_id,
+                            on_result=self.on_hold_result)
+
+        # Просроченная чужая бронь удаляется, и RELEASE возвращает места в продажу (on_ticket_changed)
+        run_query_async(SeatHoldModel.purge_expired)
+
+    def hideEvent(self, event):
+        """Диалог выбора мест закрыт - освобождаем свою бронь, не дожидаясь TTL"""
+        if not event.spontaneous():
+            self.hold_timer.stop()
+            # Места с незавершённой операцией отпустит её результат
+            self.selected_seats.clear()
+            self.sync_holds(list(self.held_seats))
+        super().hideEvent(event)
+
+    def showEvent(self, event):
+        if not event.spontaneous():
+            self.hold_timer.start()
+        super().showEvent(event)
+
     def update_selection_info(self):
         """Обновить информацию о выборе"""
         try:
@@ -349,73 +534,103 @@ class SeatSelectionView(QWidget):
                 f"Выбрано мест: {len(self.selected_seats)} ({seats_text}) | "
                 f"Итого: {total_price:.0f} руб."
             )
-            self.book_btn.setEnabled(True)
+            self.book_btn.setEnabled(not self.booking)
 
         except Exception as e:
             print(f"Ошибка при обновлении информации о выборе: {e}")
 
     def calculate_total_price(self):
-        """Рассчитать общую стоимость"""
+        """Рассчитать общую стоимость по снимку цен - без запросов к БД"""
         try:
-            session_info = TicketModel.get_session_info(self.session_id)
-            if session_info:
-                # session_info[2] - base_price, session_info[4] - hall_extra_price
-                base_price = float(session_info[2]) if session_info[2] else 0.0
-                hall_extra = float(session_info[4]) if session_info[4] else 0.0
-            else:
-                base_price = 0.0
-                hall_extra = 0.0
-
-            # Суммируем цены мест
-            seats_price = sum(float(seat[1]) for seat in self.selected_seats.values())
-
-            # Общая цена
-            total = seats_price + (base_price + hall_extra) * len(self.selected_seats)
-            return total
+            if self.pricing is None:
+                return 0.0
+            return self.pricing.total(self.selected_seats.keys())
 
         except Exception as e:
             print(f"Ошибка при расчете цены: {e}")
             return 0.0
 
     def book_tickets(self):
-        """Забронировать выбранные места"""
-        if not self.selected_seats:
+        """Забронировать выбранные места: сверка цен и бронирование выполняются в фоне"""
+        if not self.selected_seats or self.booking:
+            return
+
+        self.booking = True
+        self.book_btn.setEnabled(False)
+        # Снимок цен сверяем с БД только при оформлении
+        run_query_async(SeatMapModel.get_pricing, self.session_id, self.pricing.layout if self.pricing else None,
+                        on_result=self.confirm_booking, on_error=lambda e: self.confirm_booking(None), owner=self)
+
+    def confirm_booking(self, fresh_pricing):
+        """Цены сверены: спросить подтверждение и отправить бронирование"""
+        price_note = ""
+        if fresh_pricing is not None and fresh_pricing != self.pricing:
+            old_total = self.calculate_total_price()
+            self.pricing = fresh_pricing
+            self.update_selection_info()
+            price_note = f"\n\nЦены сеанса изменились (было {old_total:.0f} руб.)."
+
+        seat_ids = list(self.selected_seats.keys())
+        if not seat_ids:
+            self.finish_booking()
             return
 
         total_price = self.calculate_total_price()
         confirm = QMessageBox.question(
             self,
             "Подтверждение бронирования",
-            f"Забронировать {len(self.selected_seats)} мест?\n\n"
-            f"Стоимость: {total_price:.0f} руб.",
+            f"Забронировать {len(seat_ids)} мест?\n\n"
+            f"Стоимость: {total_price:.0f} руб.{price_note}",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
 
-        if confirm == QMessageBox.StandardButton.Yes:
-            try:
-                successful_bookings = []
-                for seat_id in self.selected_seats.keys():
-                    ticket_id = TicketModel.create_ticket(self.session_id, self.user_id, seat_id)
-                    if ticket_id:
-                        successful_bookings.append(ticket_id)
-
-                if successful_bookings:
-                    QMessageBox.information(
-                        self,
-                        "Успех!",
-                        f"Бронь оформлена!\n"
-                        f"Забронировано мест: {len(successful_bookings)}\n"
-                        f"Номера билетов: {', '.join(map(str, successful_bookings))}"
-                    )
-                    self.booking_complete.emit(successful_bookings)
-                    # Перезагружаем места после бронирования
-                    self.load_seats()
-                else:
-                    QMessageBox.critical(self, "Ошибка", "Не удалось забронировать места")
-
-            except Exception as e:
-                print(f"Ошибка при бронировании: {e}")
-                QMessageBox.critical(self, "Ошибка", f"Ошибка при бронировании: {str(e)}")
+        if confirm != QMessageBox.StandardButton.Yes:
+            self.finish_booking()
+            return
+
+        run_query_async(TicketModel.create_tickets_bulk, self.session_id, self.user_id, seat_ids,
+                        on_result=self.on_booking_result, on_error=self.on_booking_failed, owner=self)
+
+    def on_booking_result(self, result):
+        successful_bookings, conflicts = result
+        self.finish_booking()
+
+        if conflicts:
+            taken = ", ".join(
+                f"ряд {self.seat_widgets[seat_id].row}, место {self.seat_widgets[seat_id].number}"
+                if seat_id in self.seat_widgets else f"#{seat_id}"
+                for seat_id in conflicts
+            )
+            QMessageBox.warning(
+                self,
+                "Места заняты",
+                f"Пока вы выбирали, эти места уже забронировали: {taken}.\n"
+                f"Бронь не оформлена, выберите другие места."
+            )
+            self.load_seats()
+        elif successful_bookings:
+            QMessageBox.information(
+                self,
+                "Успех!",
+                f"Бронь оформлена!\n"
+                f"Забронировано мест: {len(successful_bookings)}\n"
+                f"Номера билетов: {', '.join(map(str, successful_bookings))}"
+            )
+            self.booking_complete.emit(successful_bookings)
+            # Перезагружаем места после бронирования
+            self.load_seats()
+        else:
+            QMessageBox.critical(self, "Ошибка", "Не удалось забронировать места")
+
+    def on_booking_failed(self, error):
+        print(f"Ошибка при бронировании: {error}")
+        self.finish_booking()
+        QMessageBox.critical(self, "Ошибка", f"Ошибка при бронировании: {str(error)}")
+
+    def finish_booking(self):
+        """Бронирование завершено или отменено - кнопку снова можно нажать"""
+        self.booking = False
+        self.update_selection_info()
 
     def refresh(self):
         """Обновить виджет при повторном открытии"""
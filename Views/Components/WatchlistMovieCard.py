@@ -1,10 +1,11 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QLabel, QFrame, QComboBox, QHBoxLayout
 from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QPixmap, QCursor
+from PyQt6.QtGui import QCursor
+from Views.Components.ImageCardMixin import ImageCardMixin
 from Models.WatchlistModel import WatchlistModel
 
 
-class WatchlistMovieCard(QFrame):
+class WatchlistMovieCard(ImageCardMixin, QFrame):
     """Карточка фильма в избранном с выбором статуса просмотра"""
     clicked = pyqtSignal(int)  # movie_id
     status_changed = pyqtSignal(int, str)  # movie_id, new_status
@@ -18,6 +19,7 @@ class WatchlistMovieCard(QFrame):
         self.image_bytes = watchlist_data[4]
         self.rating = watchlist_data[6]
         self.current_status = watchlist_data[7]  # статус из БД
+        self.image_hash = watchlist_data[9] if len(watchlist_data) > 9 else None
         self.user_id = user_id
 
         self.is_hovered = False
@@ -48,24 +50,11 @@ class WatchlistMovieCard(QFrame):
             }
         """)
 
-        # Загружаем изображение
+        # Постер декодируется в фоне, до этого видна пустая подложка
         if self.image_bytes:
-            try:
-                pixmap = QPixmap()
-                pixmap.loadFromData(bytes(self.image_bytes))
-
-                if not pixmap.isNull():
-                    scaled_pixmap = pixmap.scaled(
-                        215, 275,
-                        Qt.AspectRatioMode.KeepAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation
-                    )
-                    self.poster_label.setPixmap(scaled_pixmap)
-                else:
-                    self.set_placeholder()
-            except Exception as e:
-                print(f"Ошибка загрузки изображения: {e}")
-                self.set_placeholder()
+            self.load_image(self.image_bytes, 215, 275, self.image_hash, self.on_image_ready, self.set_placeholder)
+            # Байты держит только запрос загрузки - до декодирования
+            self.image_bytes = None
         else:
             self.set_placeholder()
 
@@ -205,6 +194,10 @@ class WatchlistMovieCard(QFrame):
         from PyQt6.QtCore import QTimer
         QTimer.singleShot(500, lambda: self.setStyleSheet(original_style))
 
+    def on_image_ready(self, pixmap):
+        """Постер готов - показать его вместо подложки"""
+        self.poster_label.setPixmap(pixmap)
+
     def set_placeholder(self):
         """Заглушка для отсутствующего изображения"""
         self.poster_label.clear()
@@ -3,8 +3,10 @@ from PyQt6.QtWidgets import (
     QScrollArea, QFrame, QTextEdit, QComboBox, QMessageBox,
     QGridLayout, QTabWidget, QSizePolicy
 )
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QPixmap
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from core.async_query import run_query_async
+from core.image_cache import image_cache
+from core.seat_notifications import seat_listener
 from Models.MovieModel import MovieModel
 from Models.ReviewModel import ReviewModel
 from Models.SessionModel import SessionModel
@@ -22,6 +24,10 @@ class SessionCard(QFrame):
         self.hall_name = session_data[3]
         self.session_time = session_data[4]
         self.price = session_data[5]
+        # Счётчики session_stats: продано мест и вместимость зала
+        self.sold_seats = session_data[6] if len(session_data) > 6 else 0
+        self.capacity = session_data[7] if len(session_data) > 7 else 0
+        self.is_sold_out = bool(self.capacity) and self.sold_seats >= self.capacity
         self.setup_ui()
 
     def setup_ui(self):
@@ -33,7 +39,8 @@ class SessionCard(QFrame):
         layout.setContentsMargins(20, 16, 20, 16)
         layout.setSpacing(12)
 
-        # Название зала
+        # Название зала и свободные места
+        hall_layout = QHBoxLayout()
         hall_label = QLabel(f"🎭 {self.hall_name}")
         hall_label.setStyleSheet("""
             color: #FFFFFF;
@@ -41,7 +48,20 @@ class SessionCard(QFrame):
             font-size: 16px;
             font-family: 'Montserrat', sans-serif;
         """)
-        layout.addWidget(hall_label)
+        hall_layout.addWidget(hall_label)
+        hall_layout.addStretch()
+
+        if self.capacity:
+            free_seats = max(self.capacity - self.sold_seats, 0)
+            seats_label = QLabel("Мест нет" if self.is_sold_out else f"Свободно: {free_seats}")
+            seats_label.setStyleSheet(f"""
+                color: {'#E63946' if self.is_sold_out else '#888888'};
+                font-size: 12px;
+                font-weight: {'700' if self.is_sold_out else '400'};
+                font-family: 'Roboto', sans-serif;
+            """)
+            hall_layout.addWidget(seats_label)
+        layout.addLayout(hall_layout)
 
         # Время сеанса
         time_label = QLabel(f"🕒 {self.session_time.strftime('%d.%m.%Y в %H:%M')}")
@@ -75,9 +95,10 @@ class SessionCard(QFrame):
 
         bottom_layout.addStretch()
 
-        book_btn = QPushButton("Забронировать")
+        book_btn = QPushButton("Распродано" if self.is_sold_out else "Забронировать")
         book_btn.setFixedSize(150, 36)
         book_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        book_btn.setEnabled(not self.is_sold_out)
         book_btn.clicked.connect(self.on_book_clicked)
         bottom_layout.addWidget(book_btn)
 
@@ -209,8 +230,15 @@ class MovieDetailView(QWidget):
         super().__init__(parent)
         self.movie_id = movie_id
         self.user_id = user_id
+        self.session_ids = set()
+        # Продажи и возвраты по показанным сеансам: перечитать счётчики одним запросом на пачку уведомлений
+        self.sessions_reload_timer = QTimer(self)
+        self.sessions_reload_timer.setSingleShot(True)
+        self.sessions_reload_timer.setInterval(300)
+        self.sessions_reload_timer.timeout.connect(lambda: self.load_sessions(fresh=True))
         self.setup_ui()
         self.load_movie_data()
+        seat_listener().ticket_changed.connect(self.on_ticket_changed)
 
     def setup_ui(self):
         main_layout = QVBoxLayout(self)
@@ -608,23 +636,31 @@ class MovieDetailView(QWidget):
         parent_layout.addWidget(form)
 
     def load_movie_data(self):
-        """Загрузить данные фильма"""
-        movie_data = MovieModel.get_movie_by_id(self.movie_id)
+        """Загрузить данные фильма - запросы идут в фоне, секции заполняются по мере ответа"""
+        run_query_async(MovieModel.get_movie_by_id, self.movie_id,
+                        on_result=self.show_movie_data, owner=self, channel="movie", coalesce=True)
+        run_query_async(MovieModel.get_movie_genres, self.movie_id,
+                        on_result=self.show_genres, owner=self, channel="genres", coalesce=True)
+
+        # Обновляем кнопку избранного
+        self.update_favorite_button()
+
+        self.load_sessions()
+        self.load_reviews()
+        self.load_people()
+
+    def show_movie_data(self, movie_data):
+        """Заполнить постер и информацию о фильме"""
         if not movie_data:
             QMessageBox.critical(self, "Ошибка", "Фильм не найден")
             self.go_back.emit()
             return
 
         if movie_data[3]:
-            pixmap = QPixmap()
-            pixmap.loadFromData(bytes(movie_data[3]))
-            if not pixmap.isNull():
-                scaled_pixmap = pixmap.scaled(
-                    250, 370,
-                    Qt.AspectRatioMode.KeepAspectRatio,
-                    Qt.TransformationMode.SmoothTransformation
-                )
-                self.poster_label.setPixmap(scaled_pixmap)
+            image_hash = movie_data[8] if len(movie_data) > 8 else None
+            pixmap = image_cache.get_pixmap(movie_data[3], 250, 370, image_hash)
+            if pixmap is not None:
+                self.poster_label.setPixmap(pixmap)
             else:
                 self.set_placeholder_poster()
         else:
@@ -636,22 +672,14 @@ class MovieDetailView(QWidget):
         self.rating_label.setText(f"⭐ {movie_data[5]:.1f}")
         self.price_label.setText(f"{int(movie_data[4])} ₽")
 
-        # Жанры
-        genres = MovieModel.get_movie_genres(self.movie_id)
+    def show_genres(self, genres):
+        """Жанры фильма"""
         genre_names = [genre[1] for genre in genres]
         if genre_names:
             self.genres_label.setText("🎭 " + " • ".join(genre_names))
         else:
             self.genres_label.setText("🎭 Жанр не указан")
 
-        # Обновляем кнопку избранного
-        self.update_favorite_button()
-
-        self.load_sessions()
-        self.load_reviews()
-        self.load_directors()
-        self.load_actors()
-
     def set_placeholder_poster(self):
         """Заглушка для постера"""
         self.poster_label.setText("🎬\n\nПостер\nотсутствует")
@@ -666,9 +694,19 @@ class MovieDetailView(QWidget):
             }
         """)
 
-    def load_sessions(self):
-        """Загрузить сеансы"""
-        sessions = SessionModel.get_sessions_by_movie(self.movie_id)
+    def load_sessions(self, fresh=False):
+        """Загрузить сеансы; fresh - не присоединяться к уже идущему запросу (счётчики мест изменились)"""
+        run_query_async(SessionModel.get_sessions_by_movie, self.movie_id,
+                        on_result=self.show_sessions, owner=self, channel="sessions", coalesce=not fresh)
+
+    def on_ticket_changed(self, op, ticket_id, session_id, seat_id, user_id):
+        """Изменение из LISTEN/NOTIFY: продажа или возврат на показанном сеансе меняет число свободных мест"""
+        if op in ("INSERT", "DELETE") and session_id in self.session_ids:
+            self.sessions_reload_timer.start()
+
+    def show_sessions(self, sessions):
+        """Отобразить сеансы"""
+        self.session_ids = {session_data[0] for session_data in sessions}
 
         # Очистка
         while self.sessions_layout.count():
@@ -701,8 +739,11 @@ class MovieDetailView(QWidget):
 
     def load_reviews(self):
         """Загрузить отзывы"""
-        reviews = ReviewModel.get_movie_reviews(self.movie_id)
+        run_query_async(ReviewModel.get_movie_reviews, self.movie_id,
+                        on_result=self.show_reviews, owner=self, channel="reviews")
 
+    def show_reviews(self, reviews):
+        """Отобразить отзывы"""
         # Очистка
         while self.reviews_layout.count():
             item = self.reviews_layout.takeAt(0)
@@ -725,11 +766,24 @@ class MovieDetailView(QWidget):
             review_widget = ReviewWidget(review_data)
             self.reviews_layout.addWidget(review_widget)
 
-    def load_directors(self):
-        """Загрузить режиссёров фильма"""
-        try:
-            directors = MovieModel.get_movie_directors(self.movie_id)
+    @staticmethod
+    def fetch_people(movie_id):
+        """Режиссёры и актёры одним фоновым вызовом - секции добавляются в фиксированном порядке"""
+        return MovieModel.get_movie_directors(movie_id), MovieModel.get_movie_actors(movie_id)
+
+    def load_people(self):
+        """Загрузить режиссёров и актёров фильма"""
+        run_query_async(MovieDetailView.fetch_people, self.movie_id,
+                        on_result=self.show_people, owner=self, channel="people", coalesce=True)
+
+    def show_people(self, people):
+        directors, actors = people
+        self.show_directors(directors)
+        self.show_actors(actors)
 
+    def show_directors(self, directors):
+        """Отобразить режиссёров фильма"""
+        try:
             # Если режиссёров нет, не создаем секцию
             if not directors:
                 return
@@ -768,11 +822,9 @@ class MovieDetailView(QWidget):
         except Exception as e:
             print(f"Ошибка при загрузке режиссёров: {e}")
 
-    def load_actors(self):
-        """Загрузить актеров фильма"""
+    def show_actors(self, actors):
+        """Отобразить актеров фильма"""
         try:
-            actors = MovieModel.get_movie_actors(self.movie_id)
-
             # Если актеров нет, не создаем секцию
             if not actors:
                 return
@@ -900,9 +952,8 @@ class MovieDetailView(QWidget):
                 self.load_reviews()
 
                 # Обновляем рейтинг
-                movie_data = MovieModel.get_movie_by_id(self.movie_id)
-                if movie_data:
-                    self.rating_label.setText(f"⭐ {movie_data[5]:.1f}")
+                run_query_async(MovieModel.get_movie_by_id, self.movie_id,
+                                on_result=self.show_rating, owner=self, channel="rating")
             else:
                 QMessageBox.critical(self, "Ошибка", "Не удалось добавить отзыв")
 
@@ -913,10 +964,15 @@ class MovieDetailView(QWidget):
                 f"Ошибка при добавлении отзыва: {str(e)}"
             )
 
+    def show_rating(self, movie_data):
+        if movie_data:
+            self.rating_label.setText(f"⭐ {movie_data[5]:.1f}")
+
     def on_booking_complete(self, ticket_ids, dialog):
         """Обработчик успешного бронирования"""
         if ticket_ids:
             dialog.accept()
+            self.load_sessions(fresh=True)
             QMessageBox.information(
                 self,
                 "Успех!",
@@ -929,8 +985,11 @@ class MovieDetailView(QWidget):
             return
 
         from Models.WatchlistModel import WatchlistModel
-        is_favorite = WatchlistModel.is_in_watchlist(self.user_id, self.movie_id)
+        run_query_async(WatchlistModel.is_in_watchlist, self.user_id, self.movie_id,
+                        on_result=self.show_favorite_state, owner=self, channel="favorite")
 
+    def show_favorite_state(self, is_favorite):
+        """Вид кнопки избранного по ответу из БД"""
         if is_favorite:
             self.favorite_btn.setText("❤️ В избранном")
             self.favorite_btn.setStyleSheet("""
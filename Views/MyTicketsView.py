@@ -10,6 +10,8 @@ from PyQt6.QtWidgets import (QFileDialog, QFrame, QHeaderView,
 
 from Models.TicketModel import TicketModel
 from ViewModels.TicketViewModel import TicketViewModel
+from core.async_query import run_query_async
+from core.seat_notifications import seat_listener
 
 
 class MyTicketsView(QWidget):
@@ -26,6 +28,9 @@ class MyTicketsView(QWidget):
         self.vm.pdf_generated.connect(self.on_pdf_generated)
         self.vm.pdf_generation_failed.connect(self.on_pdf_generation_failed)
 
+        # Покупки и отмены (в т.ч. админом или с другой кассы) - точечно, без перезагрузки списка
+        seat_listener().ticket_changed.connect(self.on_ticket_changed)
+
     def setup_ui(self):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(30, 30, 30, 30)
@@ -115,50 +120,33 @@ class MyTicketsView(QWidget):
             layout.addWidget(btn_back)
 
     def load_tickets(self):
+        run_query_async(TicketModel.get_user_tickets, self.user_id,
+                        on_result=self.show_tickets, on_error=self.on_tickets_failed,
+                        owner=self, channel="tickets")
+
+    def on_tickets_failed(self, error):
+        print(f"Ошибка при загрузке билетов: {error}")
+        self.loading_label.setText("❌ Ошибка загрузки билетов")
+        self.loading_label.setVisible(True)
+
+    def show_tickets(self, tickets):
         try:
             if self._is_loaded:
                 self.tickets_table.setRowCount(0)
 
-            tickets = TicketModel.get_user_tickets(self.user_id)
-
             if not tickets:
                 self.loading_label.setText("🎫 У вас пока нет билетов")
                 self.loading_label.setVisible(True)
                 self.tickets_table.setVisible(False)
                 self.actions_widget.setVisible(False)
                 self.selection_hint_label.setVisible(False)
+                self._is_loaded = True
                 return
 
             self.tickets_table.setRowCount(len(tickets))
 
             for row, ticket in enumerate(tickets):
-                ticket_id, movie_title, hall_name, session_time, seat_row, seat_number, price, *_ = ticket
-
-                can_cancel = self.can_cancel_ticket(session_time)
-                status_text, status_color = self.get_ticket_status(session_time, can_cancel)
-
-                film_item = QTableWidgetItem(str(movie_title))
-                film_item.setData(Qt.ItemDataRole.UserRole, {'id': ticket_id, 'can_cancel': can_cancel})
-                self.tickets_table.setItem(row, 0, film_item)
-
-                self.tickets_table.setItem(row, 1, QTableWidgetItem(str(hall_name)))
-                self.tickets_table.setItem(row, 2, QTableWidgetItem(session_time.strftime('%d.%m.%Y %H:%M')))
-                self.tickets_table.setItem(row, 3, QTableWidgetItem(f"Ряд {seat_row}, Место {seat_number}"))
-                self.tickets_table.setItem(row, 4, QTableWidgetItem(f"{float(price):.0f} руб."))
-
-                status_item = QTableWidgetItem(status_text)
-                if status_color == "green":
-                    status_item.setForeground(Qt.GlobalColor.green)
-                elif status_color == "red":
-                    status_item.setForeground(Qt.GlobalColor.red)
-                elif status_color == "orange":
-                    status_item.setForeground(Qt.GlobalColor.yellow)
-                self.tickets_table.setItem(row, 5, status_item)
-
-                for col in range(6):
-                    item = self.tickets_table.item(row, col)
-                    if item:
-                        item.setTextAlignment(Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignVCenter)
+                self.fill_ticket_row(row, ticket)
 
             self.loading_label.setVisible(False)
             self.tickets_table.setVisible(True)
@@ -172,6 +160,80 @@ class MyTicketsView(QWidget):
             self.loading_label.setText("❌ Ошибка загрузки билетов")
             self.loading_label.setVisible(True)
 
+    def fill_ticket_row(self, row, ticket):
+        """Заполнить строку таблицы билетом в формате get_user_tickets"""
+        ticket_id, movie_title, hall_name, session_time, seat_row, seat_number, price, *_ = ticket
+
+        can_cancel = self.can_cancel_ticket(session_time)
+        status_text, status_color = self.get_ticket_status(session_time, can_cancel)
+
+        film_item = QTableWidgetItem(str(movie_title))
+        film_item.setData(Qt.ItemDataRole.UserRole,
+                          {'id': ticket_id, 'can_cancel': can_cancel, 'session_time': session_time})
+        self.tickets_table.setItem(row, 0, film_item)
+
+        self.tickets_table.setItem(row, 1, QTableWidgetItem(str(hall_name)))
+        self.tickets_table.setItem(row, 2, QTableWidgetItem(session_time.strftime('%d.%m.%Y %H:%M')))
+        self.tickets_table.setItem(row, 3, QTableWidgetItem(f"Ряд {seat_row}, Место {seat_number}"))
+        self.tickets_table.setItem(row, 4, QTableWidgetItem(f"{float(price):.0f} руб."))
+
+        status_item = QTableWidgetItem(status_text)
+        if status_color == "green":
+            status_item.setForeground(Qt.GlobalColor.green)
+        elif status_color == "red":
+            status_item.setForeground(Qt.GlobalColor.red)
+        elif status_color == "orange":
+            status_item.setForeground(Qt.GlobalColor.yellow)
+        self.tickets_table.setItem(row, 5, status_item)
+
+        for col in range(6):
+            item = self.tickets_table.item(row, col)
+            if item:
+                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignVCenter)
+
+    def find_ticket_row(self, ticket_id):
+        for row in range(self.tickets_table.rowCount()):
+            item = self.tickets_table.item(row, 0)
+            if item and item.data(Qt.ItemDataRole.UserRole)['id'] == ticket_id:
+                return row
+        return None
+
+    def on_ticket_changed(self, op, ticket_id, session_id, seat_id, user_id):
+        """Изменение из LISTEN/NOTIFY: добавить или убрать одну строку"""
+        if user_id != self.user_id or not self._is_loaded:
+            return
+
+        if op == "DELETE":
+            row = self.find_ticket_row(ticket_id)
+            if row is not None:
+                self.tickets_table.removeRow(row)
+                self.update_action_buttons_state()
+            if self.tickets_table.rowCount() == 0:
+                self.show_tickets([])
+        elif op == "INSERT" and self.find_ticket_row(ticket_id) is None:
+            run_query_async(TicketModel.get_user_ticket, ticket_id, on_result=self.add_ticket_row)
+
+    def add_ticket_row(self, ticket):
+        """Вставить новый билет, сохраняя сортировку по времени сеанса (новые сверху)"""
+        if not ticket or self.find_ticket_row(ticket[0]) is not None:
+            return
+
+        row = 0
+        while row < self.tickets_table.rowCount():
+            data = self.tickets_table.item(row, 0).data(Qt.ItemDataRole.UserRole)
+            if data['session_time'] < ticket[3]:
+                break
+            row += 1
+
+        self.tickets_table.insertRow(row)
+        self.fill_ticket_row(row, ticket)
+
+        self.loading_label.setVisible(False)
+        self.tickets_table.setVisible(True)
+        self.actions_widget.setVisible(True)
+        self.selection_hint_label.setVisible(True)
+        self.update_action_buttons_state()
+
     def update_action_buttons_state(self):
         selected_rows = self.get_selected_ticket_ids(get_data=True)
         count = len(selected_rows)
@@ -296,13 +358,8 @@ class MyTicketsView(QWidget):
                         "Бронь отменена!\n\nСредства будут возвращены в течение 24 часов."
                     )
 
-                    self._is_loaded = False
-                    self.loading_label.setText("⏳ Обновление списка...")
-                    self.loading_label.setVisible(True)
-                    self.tickets_table.setVisible(False)
-                    self.actions_widget.setVisible(False)
-                    self.selection_hint_label.setVisible(False)
-                    QTimer.singleShot(100, self.load_tickets)
+                    # Убираем строку сразу; уведомление об отмене её уже не найдёт
+                    self.on_ticket_changed("DELETE", ticket_id, 0, 0, self.user_id)
                 else:
                     QMessageBox.critical(self, "Ошибка", "Не удалось отменить бронь")
 
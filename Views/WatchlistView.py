@@ -5,6 +5,7 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, pyqtSignal
 from Views.Components.WatchlistMovieCard import WatchlistMovieCard
 from Models.WatchlistModel import WatchlistModel
+from core.async_query import run_query_async
 
 
 class WatchlistView(QWidget):
@@ -89,11 +90,8 @@ class WatchlistView(QWidget):
 
         layout = QHBoxLayout(frame)
 
-        stats = WatchlistModel.get_watchlist_stats(self.user_id)
-        if stats:
-            total, watched, planned, watching = stats
-        else:
-            total, watched, planned, watching = 0, 0, 0, 0
+        # Реальные значения приходят из update_stats после загрузки избранного
+        total, watched, planned, watching = 0, 0, 0, 0
 
         stats_text = f"""
             <div style='color: #FFFFFF; font-weight: 600; font-size: 16px;'>📊 Статистика избранного</div>
@@ -143,13 +141,18 @@ class WatchlistView(QWidget):
 
     def load_watchlist(self):
         """Загрузить избранные фильмы"""
-        try:
-            self.current_watchlist = WatchlistModel.get_user_watchlist(self.user_id)
-            self.apply_filters()
-            self.update_stats()
-        except Exception as e:
-            print(f"Ошибка при загрузке избранного: {e}")
-            QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить избранное: {str(e)}")
+        run_query_async(WatchlistModel.get_user_watchlist, self.user_id,
+                        on_result=self.show_watchlist, on_error=self.on_watchlist_failed,
+                        owner=self, channel="watchlist")
+        self.update_stats()
+
+    def show_watchlist(self, watchlist):
+        self.current_watchlist = watchlist
+        self.apply_filters()
+
+    def on_watchlist_failed(self, error):
+        print(f"Ошибка при загрузке избранного: {error}")
+        QMessageBox.critical(self, "Ошибка", f"Не удалось загрузить избранное: {str(error)}")
 
     def apply_filters(self):
         """Применить фильтры"""
@@ -214,8 +217,11 @@ class WatchlistView(QWidget):
 
     def update_stats(self):
         """Обновить статистику"""
+        run_query_async(WatchlistModel.get_watchlist_stats, self.user_id,
+                        on_result=self.show_stats, owner=self, channel="stats")
+
+    def show_stats(self, stats):
         try:
-            stats = WatchlistModel.get_watchlist_stats(self.user_id)
             if stats:
                 total, watched, planned, watching = stats
             else:
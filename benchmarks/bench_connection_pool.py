@@ -0,0 +1,63 @@
+"""
+Замер запросов/сек для UserModel.find_by_id: новое соединение на каждый запрос
+(поведение до пула) против общего пула соединений.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_connection_pool --user-id 1 --count 500 --threads 4
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+
+from core.config import DB_DSN
+from core.database import close_pool
+from Models.UserModel import UserModel
+
+FIND_BY_ID_SQL = "SELECT * FROM users WHERE user_id = %s;"
+
+
+def find_by_id_without_pool(user_id):
+    """Старая реализация query(): подключение на каждый вызов"""
+    with psycopg2.connect(DB_DSN) as conn:
+        with conn.cursor() as cur:
+            cur.execute(FIND_BY_ID_SQL, [user_id])
+            rows = cur.fetchall()
+    conn.close()
+    return rows[0] if rows else None
+
+
+def run(fn, user_id, count, threads):
+    start = time.perf_counter()
+    if threads <= 1:
+        for _ in range(count):
+            fn(user_id)
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(lambda _: fn(user_id), range(count)))
+    elapsed = time.perf_counter() - start
+    return count / elapsed if elapsed else float("inf")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--user-id", type=int, default=1)
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=1)
+    args = parser.parse_args()
+
+    if UserModel.find_by_id(args.user_id) is None:
+        print(f"Пользователь #{args.user_id} не найден, замер будет по пустому результату")
+
+    before = run(find_by_id_without_pool, args.user_id, args.count, args.threads)
+    after = run(UserModel.find_by_id, args.user_id, args.count, args.threads)
+    close_pool()
+
+    print(f"Без пула: {before:10.1f} запросов/сек")
+    print(f"С пулом:  {after:10.1f} запросов/сек")
+    print(f"Ускорение: x{after / before:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Выгрузка всех билетов в CSV: построчное чтение серверным курсором (iter_query) и запись
+через csv.writer против COPY ... TO STDOUT (core.copy_export), где строки форматирует сервер.
+Если установлен pyarrow, дополнительно замеряется выгрузка в Parquet.
+
+Запуск из корня проекта (нужна БД с билетами):
+    python -m benchmarks.bench_copy_export --repeat 3
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from core.copy_export import copy_to_csv, copy_to_parquet, parquet_available
+from core.database import close_pool, iter_query
+from Models.TicketModel import TicketModel
+
+
+def export_rows(sql, params, filepath):
+    """Прежний способ: каждая строка проходит через Python-объекты"""
+    with open(filepath, "w", newline="", encoding="utf-8-sig") as file:
+        writer = csv.writer(file)
+        count = 0
+        for row in iter_query(sql, params):
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def measure(fn, sql, params, filepath, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(sql, params, filepath)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, os.path.getsize(filepath) / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    sql, params = TicketModel.export_query()
+    variants = [("Построчно:  ", export_rows, "rows.csv"), ("COPY CSV:   ", copy_to_csv, "copy.csv")]
+    if parquet_available():
+        variants.append(("COPY Parquet:", copy_to_parquet, "copy.parquet"))
+
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for title, fn, filename in variants:
+            elapsed, size_mb = measure(fn, sql, params, os.path.join(temp_dir, filename), args.repeat)
+            results.append(elapsed)
+            print(f"{title} {elapsed:8.2f} сек, файл {size_mb:.1f} МБ")
+    close_pool()
+
+    print(f"Ускорение COPY CSV: x{results[0] / results[1]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
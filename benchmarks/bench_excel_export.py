@@ -0,0 +1,150 @@
+"""
+Замер экспорта отчёта в xlsx: прежний create_excel_report (полная книга в памяти,
+свои Font/Border на каждую ячейку, ширина столбцов по всем ячейкам) против
+потоковой записи core.excel_export (write-only, именованные стили, ширина по выборке).
+
+Строки синтетические, в формате отчёта по активности пользователей, - БД не нужна.
+С --memory каждый вариант запускается ещё раз под tracemalloc (пик памяти Python-объектов;
+под трассировкой время не меряется - она замедляет оба варианта в разы).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_excel_export --rows 200000 --memory
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from openpyxl import Workbook
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.utils import get_column_letter
+
+from core.excel_export import write_excel_report
+
+HEADERS = ["ID", "Логин", "Email", "Роль", "Дата регистрации",
+           "Куплено билетов", "Потрачено (руб.)", "Написано отзывов", "Последняя активность"]
+
+
+def make_rows(count):
+    """Строки как у export_users_activity_report, генератором"""
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        yield [
+            i + 1,
+            f"user{i}",
+            f"user{i}@example.com",
+            "User",
+            (start + timedelta(days=i % 365)).strftime('%d.%m.%Y'),
+            i % 17,
+            float((i % 17) * 350),
+            i % 5,
+            (start + timedelta(minutes=i)).strftime('%d.%m.%Y %H:%M'),
+        ]
+
+
+def create_excel_report_before(report_data, headers, title, filepath):
+    """Прежняя реализация ReportsModel.create_excel_report"""
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Отчет"
+
+    header_font = Font(bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+    title_font = Font(bold=True, size=14)
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    center_align = Alignment(horizontal='center', vertical='center')
+
+    ws.merge_cells('A1:H1')
+    ws['A1'] = f"Отчет: {title}"
+    ws['A1'].font = title_font
+    ws['A1'].alignment = center_align
+
+    ws.merge_cells('A2:H2')
+    ws['A2'] = f"Сгенерирован: {datetime.now().strftime('%d.%m.%Y %H:%M')}"
+    ws['A2'].alignment = center_align
+
+    for col, header in enumerate(headers, 1):
+        cell = ws.cell(row=4, column=col, value=header)
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = center_align
+        cell.border = border
+
+    for row, data_row in enumerate(report_data, 5):
+        for col, value in enumerate(data_row, 1):
+            cell = ws.cell(row=row, column=col, value=value)
+            cell.border = border
+            if isinstance(value, (int, float)) and col > 1:
+                cell.alignment = Alignment(horizontal='right')
+
+    for col in range(1, len(headers) + 1):
+        max_length = 0
+        column = get_column_letter(col)
+        for cell in ws[column]:
+            try:
+                if len(str(cell.value)) > max_length:
+                    max_length = len(str(cell.value))
+            except:
+                pass
+        ws.column_dimensions[column].width = min(max_length + 2, 50)
+
+    wb.save(filepath)
+
+
+def create_excel_report_after(report_data, headers, title, filepath):
+    write_excel_report(filepath, report_data, headers, title)
+
+
+def export(fn, rows_count, filepath):
+    # Прежняя версия получала готовый список строк, новая - итератор
+    rows = list(make_rows(rows_count)) if fn is create_excel_report_before else make_rows(rows_count)
+    fn(rows, HEADERS, "Бенчмарк", filepath)
+
+
+def run(fn, rows_count, filepath, trace_memory):
+    start = time.perf_counter()
+    export(fn, rows_count, filepath)
+    elapsed = time.perf_counter() - start
+
+    peak_mb = None
+    if trace_memory:
+        tracemalloc.start()
+        export(fn, rows_count, filepath)
+        peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        tracemalloc.stop()
+    return elapsed, peak_mb, os.path.getsize(filepath) / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--skip-before", action="store_true", help="не запускать прежнюю реализацию")
+    parser.add_argument("--memory", action="store_true", help="замерить пик памяти (tracemalloc)")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        variants = [("Потоково:", create_excel_report_after)]
+        if not args.skip_before:
+            variants.insert(0, ("Раньше:  ", create_excel_report_before))
+        for title, fn in variants:
+            elapsed, peak_mb, size_mb = run(fn, args.rows, os.path.join(temp_dir, f"{fn.__name__}.xlsx"),
+                                            args.memory)
+            results.append((title, elapsed))
+            memory = f", пик памяти {peak_mb:8.1f} МБ" if peak_mb is not None else ""
+            print(f"{title} {elapsed:8.2f} сек, {args.rows / elapsed:10.0f} строк/сек{memory}, "
+                  f"файл {size_mb:.1f} МБ")
+
+    if len(results) == 2:
+        print(f"Ускорение: x{results[0][1] / results[1][1]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
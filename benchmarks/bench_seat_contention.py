@@ -0,0 +1,104 @@
+"""
+Конкурентная покупка мест одного сеанса: покупатели выбирают места из общей
+"горячей" части зала, думают think-time и оформляют заказ.
+
+Без брони конфликт обнаруживается только при оформлении (после раздумий),
+с бронью (seat_hold) - сразу при выборе места, а оформление уже не конфликтует.
+
+Запуск из корня проекта (сеанс должен быть свободен, созданные билеты удаляются):
+    python -m benchmarks.bench_seat_contention --session-id 1 --user-ids 1 2 3 4 --buyers 40 --seats 2
+"""
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from core.database import close_pool, query
+from Models.SeatHoldModel import SeatHoldModel
+from Models.SeatMapModel import SeatMapModel
+from Models.TicketModel import TicketModel
+
+
+def buy_without_holds(session_id, user_id, seat_ids, think_time):
+    """Место видно свободным, пока покупатель думает, - конфликт только при оформлении"""
+    time.sleep(think_time)
+    ticket_ids, conflicts = TicketModel.create_tickets_bulk(session_id, user_id, seat_ids)
+    return ticket_ids, bool(conflicts), bool(conflicts)
+
+
+def buy_with_holds(session_id, user_id, seat_ids, think_time):
+    """Сначала бронь на выбранные места, оформление - только если удержаны все"""
+    held = SeatHoldModel.hold_seats(session_id, seat_ids, user_id)
+    if len(held) != len(seat_ids):
+        SeatHoldModel.release_seats(session_id, held, user_id)
+        return [], True, False
+    time.sleep(think_time)
+    ticket_ids, conflicts = TicketModel.create_tickets_bulk(session_id, user_id, seat_ids)
+    if conflicts:
+        SeatHoldModel.release_seats(session_id, seat_ids, user_id)
+    return ticket_ids, bool(conflicts), bool(conflicts)
+
+
+def run(fn, args, hot_seats):
+    rnd = random.Random(args.seed)
+    orders = [(rnd.choice(args.user_ids), rnd.sample(hot_seats, args.seats)) for _ in range(args.buyers)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        results = list(executor.map(
+            lambda order: fn(args.session_id, order[0], order[1], args.think_time), orders))
+    elapsed = time.perf_counter() - start
+
+    ticket_ids = [ticket_id for ids, _, _ in results for ticket_id in ids]
+    booked = sum(1 for ids, _, _ in results if ids)
+    conflicts = sum(1 for _, conflict, _ in results if conflict)
+    late = sum(1 for _, _, late_conflict in results if late_conflict)
+
+    # Возвращаем сеанс в исходное состояние
+    if ticket_ids:
+        query("DELETE FROM ticket WHERE ticket_id = ANY(%s)", [ticket_ids])
+    query("DELETE FROM seat_hold WHERE session_id = %s", [args.session_id])
+    SeatMapModel.load(args.session_id)
+
+    return {
+        "orders_per_sec": booked / elapsed if elapsed else float("inf"),
+        "conflict_rate": conflicts / len(orders),
+        "late_conflicts": late,
+        "booked": booked,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--session-id", type=int, default=1)
+    parser.add_argument("--user-ids", type=int, nargs="+", default=[1])
+    parser.add_argument("--buyers", type=int, default=40)
+    parser.add_argument("--seats", type=int, default=2, help="мест в одном заказе")
+    parser.add_argument("--hot-seats", type=int, default=20, help="размер спорной части зала")
+    parser.add_argument("--think-time", type=float, default=0.05, help="сек на выбор и оплату")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    occupancy = SeatMapModel.load(args.session_id)
+    if occupancy is None:
+        print(f"Сеанс #{args.session_id} не найден")
+        return
+    free = [occupancy.layout.seat_ids[i] for i in occupancy.free_indexes()]
+    hot_seats = free[:args.hot_seats]
+    if len(hot_seats) < args.seats:
+        print(f"В сеансе #{args.session_id} слишком мало свободных мест")
+        return
+
+    without = run(buy_without_holds, args, hot_seats)
+    with_holds = run(buy_with_holds, args, hot_seats)
+    close_pool()
+
+    for title, result in (("Без брони:", without), ("С бронью: ", with_holds)):
+        print(f"{title} {result['orders_per_sec']:8.1f} заказов/сек, "
+              f"оформлено {result['booked']}, конфликтов {result['conflict_rate']:.0%}, "
+              f"из них при оформлении {result['late_conflicts']}")
+
+
+if __name__ == "__main__":
+    main()
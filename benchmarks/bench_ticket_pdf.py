@@ -0,0 +1,232 @@
+"""
+Генерация PDF пачки билетов: прежняя отрисовка (каждая страница заново рисует фон, шапку и подписи
+и заново читает и декодирует логотип) против шаблона TicketPDFModel (неизменная часть - PDF-форма,
+один раз на документ; шрифты и логотип - один раз на процесс; QR-код рисуется векторно из матрицы,
+матрицы кэшируются по содержимому). Шаблон замеряется с пустым кэшем QR и с заполненным
+(повторная выгрузка тех же билетов).
+
+Данные билетов синтетические - БД не нужна. Запуск из корня проекта:
+    python -m benchmarks.bench_ticket_pdf --tickets 500 --repeat 3
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from io import BytesIO
+
+import qrcode
+
+from reportlab.lib.colors import Color, black, white
+from reportlab.lib.pagesizes import A5
+from reportlab.lib.units import mm
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+from Models.TicketPDFModel import TicketPDFModel
+
+USER_ID = 1
+
+
+def make_tickets(count):
+    """(ticket_id, ticket_info) в формате TicketModel.get_ticket_by_id"""
+    start = datetime(2025, 3, 1, 18, 30)
+    return [
+        (1000 + i, (1000 + i, f"Фильм {i % 40}", "Большой зал", 1 + i % 5, start + timedelta(hours=i % 48),
+                    1 + i % 12, 1 + i % 20, 350 + (i % 3) * 50, None, None, 200 + i % 50, None, USER_ID))
+        for i in range(count)
+    ]
+
+
+def generate_qr_code_before(data):
+    """Прежний QR: растровая картинка через PIL, сжатая в PNG"""
+    qr = qrcode.QRCode(
+        version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, box_size=10, border=2
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+    buffer = BytesIO()
+    img.save(buffer, format='PNG')
+    buffer.seek(0)
+    return buffer
+
+
+def draw_ticket_before(c, ticket_id, user_id, ticket_info, fonts_registered, page_info=""):
+    page_width, page_height = A5
+
+    # --- Настройки макета билета (центрируем на странице) ---
+    ticket_width = 120 * mm
+    left_margin = (page_width - ticket_width) / 2
+    right_margin = left_margin + ticket_width
+
+    # Настройка цветов и шрифтов
+    primary_color = Color(0 / 255, 168 / 255, 232 / 255)
+    accent_color = Color(31 / 255, 41 / 255, 55 / 255)
+    text_color = black
+    font_name = "Arial" if fonts_registered else "Helvetica"
+    font_bold = "Arial-Bold" if fonts_registered else "Helvetica-Bold"
+
+    # --- Отрисовка ---
+    # Фон страницы
+    c.setFillColor(Color(0.95, 0.95, 0.95))  # Слегка серый фон для контраста
+    c.rect(0, 0, page_width, page_height, fill=1, stroke=0)
+
+    # Белая подложка для самого билета
+    c.setFillColor(white)
+    # Рисуем тень для эффекта объема
+    c.setFillColor(Color(0.8, 0.8, 0.8))
+    c.rect(left_margin + 1 * mm, 15 * mm - 1 * mm, ticket_width, page_height - 30 * mm, fill=1, stroke=0)
+    # Сам билет
+    c.setFillColor(white)
+    c.rect(left_margin, 15 * mm, ticket_width, page_height - 30 * mm, fill=1, stroke=0)
+
+    # Шапка
+    header_height = 30 * mm
+    y_header_start = page_height - 15 * mm - header_height
+    c.setFillColor(primary_color)
+    c.rect(left_margin, y_header_start, ticket_width, header_height, fill=1, stroke=0)
+
+    # Логотип
+    c.setFillColor(white)
+    logo_path = "images/headerLogo.png"
+    try:
+        if os.path.exists(logo_path):
+            logo = ImageReader(logo_path)
+            c.drawImage(logo, left_margin + 10 * mm, y_header_start + 5 * mm, width=40 * mm, height=20 * mm,
+                        mask='auto', preserveAspectRatio=True)
+        else:
+            raise FileNotFoundError()
+    except Exception:
+        c.setFont(font_bold, 20)
+        c.drawString(left_margin + 10 * mm, y_header_start + 10 * mm, "CINEMAVAIB")
+
+    # Текст "ЭЛЕКТРОННЫЙ БИЛЕТ"
+    c.setFont(font_bold, 9)
+    c.drawRightString(right_margin - 10 * mm, y_header_start + 22 * mm, "ЭЛЕКТРОННЫЙ БИЛЕТ")
+
+    # --- Основная информация ---
+    y_position = y_header_start - 15 * mm
+    content_margin = left_margin + 10 * mm
+
+    # Фильм
+    c.setFillColor(text_color)
+    c.setFont(font_bold, 12)
+    c.drawString(content_margin, y_position, "ФИЛЬМ:")
+    c.setFont(font_name, 12)
+    movie_title = str(ticket_info[1])
+    c.drawString(content_margin, y_position - 7 * mm, movie_title)
+    y_position -= 20 * mm
+
+    # Зал
+    c.setFont(font_bold, 11)
+    c.drawString(content_margin, y_position, "ЗАЛ:")
+    c.setFont(font_name, 11)
+    hall_display = f"№{ticket_info[3]} - {ticket_info[2]}" if ticket_info[3] else str(ticket_info[2])
+    c.drawString(content_margin + 15 * mm, y_position, hall_display)
+    y_position -= 10 * mm
+
+    # Дата и время
+    c.setFont(font_bold, 11)
+    c.drawString(content_margin, y_position, "ДАТА И ВРЕМЯ:")
+    c.setFont(font_name, 11)
+    session_time = ticket_info[4]
+    time_str = session_time.strftime('%d.%m.%Y %H:%M') if not isinstance(session_time, str) else session_time
+    c.drawString(content_margin + 35 * mm, y_position, time_str)
+    y_position -= 10 * mm
+
+    # Место и Стоимость в одну строку
+    c.setFont(font_bold, 11)
+    c.drawString(content_margin, y_position, "МЕСТО:")
+    c.setFont(font_name, 11)
+    c.drawString(content_margin + 20 * mm, y_position, f"Ряд {ticket_info[5]}, Место {ticket_info[6]}")
+
+    c.setFont(font_bold, 11)
+    c.drawString(content_margin + 60 * mm, y_position, "ЦЕНА:")
+    c.setFont(font_name, 11)
+    price = float(ticket_info[7]) if ticket_info[7] else 0.0
+    c.drawString(content_margin + 75 * mm, y_position, f"{price:.0f} руб.")
+    y_position -= 20 * mm
+
+    # Номер билета
+    c.setFillColor(Color(0.95, 0.95, 0.95))
+    c.setStrokeColor(Color(0.85, 0.85, 0.85))
+    c.rect(left_margin + 5 * mm, y_position - 7 * mm, ticket_width - 10 * mm, 12 * mm, fill=1, stroke=1)
+    c.setFillColor(accent_color)
+    c.setFont(font_bold, 14)
+    c.drawCentredString(page_width / 2, y_position - 3 * mm, f"БИЛЕТ №{ticket_id}")
+
+    # QR-код
+    qr_size = 55 * mm
+    qr_y = y_position - 15 * mm - qr_size
+    qr_x = (page_width - qr_size) / 2
+    try:
+        qr_data = f"TICKET:{ticket_id}:USER:{user_id}:SESSION:{ticket_info[10]}"
+        qr_image = ImageReader(generate_qr_code_before(qr_data))
+        c.drawImage(qr_image, qr_x, qr_y, width=qr_size, height=qr_size)
+        c.setFillColor(text_color)
+        c.setFont(font_name, 9)
+        c.drawCentredString(page_width / 2, qr_y - 2 * mm, "Покажите этот QR-код на входе в кинозал")
+    except Exception as e:
+        print(f"Ошибка при генерации QR кода: {e}")
+
+    # Нижний колонтитул страницы
+    c.setFillColor(Color(0.5, 0.5, 0.5))
+    c.setFont(font_name, 8)
+    if page_info:
+        c.drawCentredString(page_width / 2, 8 * mm, page_info)
+    c.drawRightString(page_width - 10 * mm, 8 * mm, f"Сгенерировано: {datetime.now().strftime('%d.%m.%Y %H:%M')}")
+    c.drawString(10 * mm, 8 * mm, "Приятного просмотра!")
+
+
+def render_before(filepath, tickets):
+    """Прежний generate_multiple_tickets_pdf без запросов к БД"""
+    fonts_registered = TicketPDFModel._register_fonts()
+    c = canvas.Canvas(filepath, pagesize=A5)
+    total_pages = len(tickets)
+    for i, (ticket_id, ticket_info) in enumerate(tickets):
+        if i > 0: c.showPage()
+        draw_ticket_before(c, ticket_id, USER_ID, ticket_info, fonts_registered, f"Страница {i + 1} из {total_pages}")
+    c.save()
+
+
+def render_after(filepath, tickets):
+    TicketPDFModel._qr_matrices.clear()
+    TicketPDFModel.render_tickets_pdf(filepath, tickets, USER_ID, page_numbers=True)
+
+
+def render_after_cached(filepath, tickets):
+    TicketPDFModel.render_tickets_pdf(filepath, tickets, USER_ID, page_numbers=True)
+
+
+def measure(fn, filepath, tickets, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(filepath, tickets)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, os.path.getsize(filepath) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tickets", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    tickets = make_tickets(args.tickets)
+    results = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        variants = (("Раньше:          ", render_before), ("Шаблон:          ", render_after),
+                    ("Шаблон, кэш QR:  ", render_after_cached))
+        for title, fn in variants:
+            elapsed, size_kb = measure(fn, os.path.join(temp_dir, f"{fn.__name__}.pdf"), tickets, args.repeat)
+            results.append(elapsed)
+            print(f"{title} {elapsed:8.2f} сек, {args.tickets / elapsed:8.1f} билетов/сек, файл {size_kb:.0f} КБ")
+
+    print(f"Ускорение: x{results[0] / results[1]:.1f}, с кэшем QR x{results[0] / results[2]:.1f}")
+
+
+if __name__ == "__main__":
+    main()
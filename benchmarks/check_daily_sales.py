@@ -0,0 +1,85 @@
+"""
+Сверка свёртки продаж (daily_sales, daily_customers) с пересчётом rebuild_daily_sales()
+после удаления сеанса с билетами - напрямую и каскадом от зала.
+Всё выполняется в одной транзакции и откатывается: данные в БД не меняются.
+
+Запуск из корня проекта (нужна БД с проданными билетами):
+    python -m benchmarks.check_daily_sales
+"""
+import argparse
+
+from core.database import close_pool, query, transaction
+
+SNAPSHOT_SQL = """
+    SELECT (SELECT array_agg(ds ORDER BY ds) FROM daily_sales ds),
+           (SELECT array_agg(dc ORDER BY dc) FROM daily_customers dc)
+"""
+
+
+class Rollback(Exception):
+    """Откатить транзакцию проверки"""
+
+
+def busiest_session(exclude_hall=None):
+    """(session_id, hall_id, билетов) сеанса с наибольшим числом билетов"""
+    rows = query("""
+        SELECT s.session_id, s.hall_id, COUNT(*)
+        FROM ticket t
+        JOIN session s ON t.session_id = s.session_id
+        WHERE s.hall_id IS DISTINCT FROM %s
+        GROUP BY s.session_id, s.hall_id
+        ORDER BY 3 DESC
+        LIMIT 1
+    """, [exclude_hall])
+    return rows[0] if rows else None
+
+
+def check(title):
+    """Свёртка после удаления должна совпадать с полным пересчётом"""
+    diff = query("SELECT * FROM daily_sales_diff()")
+    before = query(SNAPSHOT_SQL)
+    query("SELECT rebuild_daily_sales()")
+    after = query(SNAPSHOT_SQL)
+    ok = not diff and before == after
+    print(f"{title}: {'OK' if ok else 'РАСХОЖДЕНИЕ'}")
+    for row in diff:
+        print("   ", row)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.parse_args()
+
+    results = []
+    try:
+        with transaction():
+            if not check("Исходная свёртка"):
+                print("Свёртка разошлась ещё до проверки - выполните SELECT rebuild_daily_sales()")
+
+            session = busiest_session()
+            if session is None:
+                print("В БД нет проданных билетов - проверять нечего")
+                raise Rollback()
+            session_id, hall_id, tickets = session
+            query("DELETE FROM session WHERE session_id = %s", [session_id])
+            results.append(check(f"Удаление сеанса #{session_id} ({tickets} билетов)"))
+
+            session = busiest_session(exclude_hall=hall_id)
+            if session is not None:
+                _, other_hall_id, _ = session
+                query("DELETE FROM hall WHERE hall_id = %s", [other_hall_id])
+                results.append(check(f"Удаление зала #{other_hall_id} каскадом"))
+            raise Rollback()
+    except Rollback:
+        pass
+    close_pool()
+
+    if results and all(results):
+        print("Свёртка продаж совпадает с пересчётом")
+    elif results:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,14 @@
+-- Миниатюры изображений для списков (карточки фильмов, актёров и режиссёров)
+-- После применения заполнить существующие записи: python -m core.thumbnails
+ALTER TABLE movies
+ADD COLUMN IF NOT EXISTS movie_thumb BYTEA,
+ADD COLUMN IF NOT EXISTS movie_detail BYTEA,
+ADD COLUMN IF NOT EXISTS image_hash VARCHAR(64);
+
+ALTER TABLE director
+ADD COLUMN IF NOT EXISTS photo_thumb BYTEA,
+ADD COLUMN IF NOT EXISTS photo_hash VARCHAR(64);
+
+ALTER TABLE actor
+ADD COLUMN IF NOT EXISTS photo_thumb BYTEA,
+ADD COLUMN IF NOT EXISTS photo_hash VARCHAR(64);
@@ -0,0 +1,27 @@
+-- NOTIFY ticket_changes при продаже и отмене билета (см. core/seat_notifications.py)
+CREATE OR REPLACE FUNCTION notify_ticket_change() RETURNS TRIGGER AS $$
+DECLARE
+    v_row ticket%ROWTYPE;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        v_row := OLD;
+    ELSE
+        v_row := NEW;
+    END IF;
+
+    PERFORM pg_notify('ticket_changes', json_build_object(
+        'op', TG_OP,
+        'ticket_id', v_row.ticket_id,
+        'session_id', v_row.session_id,
+        'seat_id', v_row.seat_id,
+        'user_id', v_row.user_id
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_notify_ticket_change ON ticket;
+
+CREATE TRIGGER trg_notify_ticket_change AFTER INSERT
+OR DELETE ON ticket FOR EACH ROW
+EXECUTE FUNCTION notify_ticket_change ();
@@ -0,0 +1,43 @@
+-- Временная бронь мест на время выбора (см. Models/SeatHoldModel.py)
+CREATE TABLE IF NOT EXISTS seat_hold (
+  session_id INT NOT NULL REFERENCES session (session_id) ON DELETE CASCADE ON UPDATE CASCADE,
+  seat_id INT NOT NULL REFERENCES seat (seat_id) ON DELETE CASCADE ON UPDATE CASCADE,
+  user_id INT NOT NULL REFERENCES users (user_id) ON DELETE CASCADE ON UPDATE CASCADE,
+  expires_at TIMESTAMP NOT NULL,
+  PRIMARY KEY (session_id, seat_id)
+);
+
+-- Уведомление о временной брони места (выбор места в схеме зала)
+CREATE OR REPLACE FUNCTION notify_seat_hold() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('ticket_changes', json_build_object(
+            'op', 'RELEASE',
+            'session_id', OLD.session_id,
+            'seat_id', OLD.seat_id,
+            'user_id', OLD.user_id
+        )::text);
+        RETURN NULL;
+    END IF;
+
+    -- Продление своей действующей брони не рассылаем: бронь держится до RELEASE
+    -- (снятие или удаление просроченной purge_expired). Просроченную запись, занятую заново, - рассылаем
+    IF TG_OP = 'UPDATE' AND OLD.user_id = NEW.user_id AND OLD.expires_at > CURRENT_TIMESTAMP THEN
+        RETURN NULL;
+    END IF;
+
+    PERFORM pg_notify('ticket_changes', json_build_object(
+        'op', 'HOLD',
+        'session_id', NEW.session_id,
+        'seat_id', NEW.seat_id,
+        'user_id', NEW.user_id
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_notify_seat_hold ON seat_hold;
+
+CREATE TRIGGER trg_notify_seat_hold AFTER INSERT
+OR UPDATE OR DELETE ON seat_hold FOR EACH ROW
+EXECUTE FUNCTION notify_seat_hold ();
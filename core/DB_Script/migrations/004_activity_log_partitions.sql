@@ -0,0 +1,82 @@
+-- Перевод activity_log на месячные секции по created_at.
+-- Старая таблица переименовывается, данные переносятся в секции, счётчик log_id сохраняется.
+BEGIN;
+
+ALTER TABLE activity_log RENAME TO activity_log_old;
+ALTER INDEX activity_log_pkey RENAME TO activity_log_old_pkey;
+
+CREATE TABLE activity_log (
+  log_id INT NOT NULL DEFAULT nextval('activity_log_log_id_seq'),
+  user_id INT REFERENCES users (user_id) ON DELETE SET NULL ON UPDATE CASCADE,
+  actor_role VARCHAR(100),
+  action_type VARCHAR(100),
+  entity_id INT,
+  description TEXT,
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+  PRIMARY KEY (log_id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Последовательность переходит к новой таблице, иначе удалится вместе со старой
+ALTER SEQUENCE activity_log_log_id_seq OWNED BY activity_log.log_id;
+
+CREATE INDEX idx_activity_log_created_at_id ON activity_log (created_at DESC, log_id DESC);
+
+-- Месячные секции activity_log: создать недостающие от месяца p_from до текущего + p_months_ahead
+CREATE OR REPLACE FUNCTION ensure_activity_log_partitions(p_from DATE DEFAULT CURRENT_DATE,
+                                                          p_months_ahead INT DEFAULT 3) RETURNS INT AS $$
+DECLARE
+    v_month DATE := date_trunc('month', p_from)::date;
+    v_last DATE := (date_trunc('month', CURRENT_DATE) + make_interval(months => p_months_ahead))::date;
+    v_name TEXT;
+    v_created INT := 0;
+BEGIN
+    WHILE v_month <= v_last LOOP
+        v_name := 'activity_log_' || to_char(v_month, 'YYYY_MM');
+        IF to_regclass(v_name) IS NULL THEN
+            EXECUTE format('CREATE TABLE %I PARTITION OF activity_log FOR VALUES FROM (%L) TO (%L)',
+                           v_name, v_month, (v_month + INTERVAL '1 month')::date);
+            v_created := v_created + 1;
+        END IF;
+        v_month := (v_month + INTERVAL '1 month')::date;
+    END LOOP;
+    RETURN v_created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Хранение журнала: удалить (или только отсоединить для архива) секции, целиком лежащие раньше p_before
+CREATE OR REPLACE FUNCTION drop_activity_log_partitions(p_before DATE,
+                                                        p_detach_only BOOLEAN DEFAULT FALSE) RETURNS INT AS $$
+DECLARE
+    v_part RECORD;
+    v_dropped INT := 0;
+BEGIN
+    FOR v_part IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'activity_log'::regclass
+          AND c.relname ~ '^activity_log_\d{4}_\d{2}$'
+          AND to_date(right(c.relname, 7), 'YYYY_MM') + INTERVAL '1 month' <= p_before
+        ORDER BY c.relname
+    LOOP
+        IF p_detach_only THEN
+            EXECUTE format('ALTER TABLE activity_log DETACH PARTITION %I', v_part.relname);
+        ELSE
+            EXECUTE format('DROP TABLE %I', v_part.relname);
+        END IF;
+        v_dropped := v_dropped + 1;
+    END LOOP;
+    RETURN v_dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT ensure_activity_log_partitions(
+    COALESCE((SELECT MIN(created_at)::date FROM activity_log_old), CURRENT_DATE), 3);
+
+INSERT INTO activity_log (log_id, user_id, actor_role, action_type, entity_id, description, created_at)
+SELECT log_id, user_id, actor_role, action_type, entity_id, description, created_at
+FROM activity_log_old;
+
+DROP TABLE activity_log_old;
+
+COMMIT;
@@ -0,0 +1,21 @@
+-- Обозреватель журнала: группа действия и tsvector описания, индексы под фильтры и keyset-пагинацию.
+-- Индексы создаются на секционированной таблице и сразу на всех секциях.
+ALTER TABLE activity_log
+  ADD COLUMN IF NOT EXISTS action_group VARCHAR(100)
+    GENERATED ALWAYS AS (split_part(action_type, '_', 1)) STORED,
+  ADD COLUMN IF NOT EXISTS description_tsv TSVECTOR
+    GENERATED ALWAYS AS (to_tsvector('russian', COALESCE(description, ''))) STORED;
+
+-- Журнал: фильтры обозревателя журнала, каждый с keyset-порядком (created_at, log_id)
+CREATE INDEX IF NOT EXISTS idx_activity_log_user_created ON activity_log (user_id, created_at DESC, log_id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_activity_log_role_created ON activity_log (actor_role, created_at DESC, log_id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_activity_log_action_created ON activity_log (action_type, created_at DESC, log_id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_activity_log_group_created ON activity_log (action_group, created_at DESC, log_id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_activity_log_entity_created ON activity_log (entity_id, created_at DESC, log_id DESC);
+
+-- Журнал: полнотекстовый поиск по описанию
+CREATE INDEX IF NOT EXISTS idx_activity_log_description_tsv ON activity_log USING GIN (description_tsv);
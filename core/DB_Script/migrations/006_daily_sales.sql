@@ -0,0 +1,139 @@
+-- Свёртка продаж по дням (daily_sales, daily_customers) и её первичное заполнение из ticket
+BEGIN;
+
+-- Свёртка продаж по дням: ведётся триггерами на ticket и session, отчёты читают её вместо ticket.
+-- session_date нужна отчётам, которые учитывают только билеты на сеансы за тот же период
+CREATE TABLE IF NOT EXISTS daily_sales (
+  sale_date DATE NOT NULL,
+  session_date DATE NOT NULL,
+  movie_id INT NOT NULL,
+  hall_id INT NOT NULL,
+  tickets INT NOT NULL DEFAULT 0,
+  revenue DECIMAL(12, 2) NOT NULL DEFAULT 0,
+  PRIMARY KEY (sale_date, session_date, movie_id, hall_id)
+);
+
+-- Покупатели по дням - для числа уникальных клиентов за период
+CREATE TABLE IF NOT EXISTS daily_customers (
+  sale_date DATE NOT NULL,
+  session_date DATE NOT NULL,
+  user_id INT NOT NULL,
+  tickets INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (sale_date, session_date, user_id)
+);
+
+-- Свёртка продаж: добавить (p_tickets > 0) или вычесть (p_tickets < 0) билеты
+CREATE OR REPLACE FUNCTION daily_sales_apply(p_sale_date DATE, p_session_id INT, p_user_id INT,
+                                             p_tickets INT, p_revenue DECIMAL) RETURNS VOID AS $$
+DECLARE
+    v_session_date DATE;
+    v_movie_id INT;
+    v_hall_id INT;
+BEGIN
+    SELECT session_time::date, movie_id, hall_id INTO v_session_date, v_movie_id, v_hall_id
+    FROM session WHERE session_id = p_session_id;
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+    PERFORM daily_sales_apply_to(p_sale_date, v_session_date, v_movie_id, v_hall_id,
+                                 p_user_id, p_tickets, p_revenue);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION daily_sales_apply_to(p_sale_date DATE, p_session_date DATE, p_movie_id INT,
+                                                p_hall_id INT, p_user_id INT,
+                                                p_tickets INT, p_revenue DECIMAL) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO daily_sales (sale_date, session_date, movie_id, hall_id, tickets, revenue)
+    VALUES (p_sale_date, p_session_date, p_movie_id, p_hall_id, p_tickets, p_revenue)
+    ON CONFLICT (sale_date, session_date, movie_id, hall_id) DO UPDATE
+    SET tickets = daily_sales.tickets + EXCLUDED.tickets,
+        revenue = daily_sales.revenue + EXCLUDED.revenue;
+
+    INSERT INTO daily_customers (sale_date, session_date, user_id, tickets)
+    VALUES (p_sale_date, p_session_date, p_user_id, p_tickets)
+    ON CONFLICT (sale_date, session_date, user_id) DO UPDATE
+    SET tickets = daily_customers.tickets + EXCLUDED.tickets;
+
+    IF p_tickets < 0 THEN
+        DELETE FROM daily_sales
+        WHERE sale_date = p_sale_date AND session_date = p_session_date
+          AND movie_id = p_movie_id AND hall_id = p_hall_id AND tickets <= 0;
+        DELETE FROM daily_customers
+        WHERE sale_date = p_sale_date AND session_date = p_session_date
+          AND user_id = p_user_id AND tickets <= 0;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION daily_sales_ticket_change() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        PERFORM daily_sales_apply(OLD.purchase_date::date, OLD.session_id, OLD.user_id, -1, -OLD.final_price);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM daily_sales_apply(NEW.purchase_date::date, NEW.session_id, NEW.user_id, 1, NEW.final_price);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Сеанс перенесли в другой зал/день или сменили фильм - переносим его билеты в свёртке
+CREATE OR REPLACE FUNCTION daily_sales_session_change() RETURNS TRIGGER AS $$
+DECLARE
+    v_row RECORD;
+BEGIN
+    FOR v_row IN
+        SELECT purchase_date::date AS sale_date, user_id, COUNT(*)::int AS tickets, SUM(final_price) AS revenue
+        FROM ticket
+        WHERE session_id = NEW.session_id
+        GROUP BY purchase_date::date, user_id
+    LOOP
+        PERFORM daily_sales_apply_to(v_row.sale_date, OLD.session_time::date, OLD.movie_id, OLD.hall_id,
+                                     v_row.user_id, -v_row.tickets, -v_row.revenue);
+        PERFORM daily_sales_apply_to(v_row.sale_date, NEW.session_time::date, NEW.movie_id, NEW.hall_id,
+                                     v_row.user_id, v_row.tickets, v_row.revenue);
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Полный пересчёт свёртки по ticket (первичное заполнение или сверка)
+CREATE OR REPLACE FUNCTION rebuild_daily_sales() RETURNS VOID AS $$
+BEGIN
+    LOCK TABLE daily_sales, daily_customers IN EXCLUSIVE MODE;
+    TRUNCATE daily_sales, daily_customers;
+
+    INSERT INTO daily_sales (sale_date, session_date, movie_id, hall_id, tickets, revenue)
+    SELECT t.purchase_date::date, s.session_time::date, s.movie_id, s.hall_id, COUNT(*), SUM(t.final_price)
+    FROM ticket t
+    JOIN session s ON t.session_id = s.session_id
+    GROUP BY 1, 2, 3, 4;
+
+    INSERT INTO daily_customers (sale_date, session_date, user_id, tickets)
+    SELECT t.purchase_date::date, s.session_time::date, t.user_id, COUNT(*)
+    FROM ticket t
+    JOIN session s ON t.session_id = s.session_id
+    GROUP BY 1, 2, 3;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_daily_sales_ticket ON ticket;
+DROP TRIGGER IF EXISTS trg_daily_sales_session ON session;
+CREATE TRIGGER trg_daily_sales_ticket AFTER INSERT
+OR DELETE
+OR UPDATE OF session_id, seat_id, user_id, final_price, purchase_date ON ticket FOR EACH ROW
+EXECUTE FUNCTION daily_sales_ticket_change ();
+
+CREATE TRIGGER trg_daily_sales_session AFTER
+UPDATE OF movie_id, hall_id, session_time ON session FOR EACH ROW
+WHEN (
+  OLD.movie_id IS DISTINCT FROM NEW.movie_id
+  OR OLD.hall_id IS DISTINCT FROM NEW.hall_id
+  OR OLD.session_time::date IS DISTINCT FROM NEW.session_time::date
+)
+EXECUTE FUNCTION daily_sales_session_change ();
+
+SELECT rebuild_daily_sales();
+
+COMMIT;
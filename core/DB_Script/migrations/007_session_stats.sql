@@ -0,0 +1,144 @@
+-- Вместимость зала (hall.capacity) и счётчики сеансов (session_stats) с первичным заполнением
+BEGIN;
+
+ALTER TABLE hall ADD COLUMN IF NOT EXISTS capacity INT DEFAULT 0 NOT NULL;
+
+UPDATE hall h
+SET capacity = (SELECT COUNT(*) FROM seat WHERE hall_id = h.hall_id);
+
+-- Счётчики сеанса: продано мест, выручка и вместимость зала; ведутся триггерами на ticket, session и seat
+CREATE TABLE IF NOT EXISTS session_stats (
+  session_id INT PRIMARY KEY REFERENCES session (session_id) ON DELETE CASCADE ON UPDATE CASCADE,
+  sold_seats INT NOT NULL DEFAULT 0,
+  revenue DECIMAL(12, 2) NOT NULL DEFAULT 0,
+  capacity INT NOT NULL DEFAULT 0
+);
+
+INSERT INTO session_stats (session_id, sold_seats, revenue, capacity)
+SELECT s.session_id, COUNT(t.ticket_id), COALESCE(SUM(t.final_price), 0), h.capacity
+FROM session s
+JOIN hall h ON s.hall_id = h.hall_id
+LEFT JOIN ticket t ON t.session_id = s.session_id
+GROUP BY s.session_id, h.capacity
+ON CONFLICT (session_id) DO NOTHING;
+
+-- Вместимость зала: прибавить p_seats мест; предстоящие сеансы зала получают новую вместимость
+CREATE OR REPLACE FUNCTION hall_capacity_add(p_hall_id INT, p_seats INT) RETURNS VOID AS $$
+BEGIN
+    UPDATE hall SET capacity = capacity + p_seats WHERE hall_id = p_hall_id;
+
+    UPDATE session_stats ss
+    SET capacity = h.capacity
+    FROM session s
+    JOIN hall h ON s.hall_id = h.hall_id
+    WHERE ss.session_id = s.session_id
+      AND s.hall_id = p_hall_id
+      AND s.session_time > CURRENT_TIMESTAMP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Один пересчёт на оператор: create_multiple_seats и delete_hall_seats не обновляют зал на каждое место
+CREATE OR REPLACE FUNCTION hall_capacity_seat_change() RETURNS TRIGGER AS $$
+DECLARE
+    v_row RECORD;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        FOR v_row IN SELECT hall_id, COUNT(*)::int AS seats FROM new_rows GROUP BY hall_id LOOP
+            PERFORM hall_capacity_add(v_row.hall_id, v_row.seats);
+        END LOOP;
+    ELSIF TG_OP = 'DELETE' THEN
+        FOR v_row IN SELECT hall_id, COUNT(*)::int AS seats FROM old_rows GROUP BY hall_id LOOP
+            PERFORM hall_capacity_add(v_row.hall_id, -v_row.seats);
+        END LOOP;
+    ELSE
+        FOR v_row IN
+            SELECT hall_id, SUM(seats)::int AS seats
+            FROM (SELECT hall_id, 1 AS seats FROM new_rows
+                  UNION ALL
+                  SELECT hall_id, -1 FROM old_rows) moved
+            GROUP BY hall_id
+            HAVING SUM(seats) <> 0
+        LOOP
+            PERFORM hall_capacity_add(v_row.hall_id, v_row.seats);
+        END LOOP;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Новый сеанс получает строку счётчиков; при смене зала - его вместимость
+CREATE OR REPLACE FUNCTION session_stats_session_change() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO session_stats (session_id, capacity)
+    SELECT NEW.session_id, capacity FROM hall WHERE hall_id = NEW.hall_id
+    ON CONFLICT (session_id) DO UPDATE SET capacity = EXCLUDED.capacity;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Продажа и отмена билетов: одно обновление счётчиков на сеанс за оператор (бронь нескольких мест - один UPDATE)
+CREATE OR REPLACE FUNCTION session_stats_ticket_change() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE session_stats ss
+        SET sold_seats = ss.sold_seats + d.seats, revenue = ss.revenue + d.revenue
+        FROM (SELECT session_id, COUNT(*) AS seats, SUM(final_price) AS revenue
+              FROM new_rows GROUP BY session_id) d
+        WHERE ss.session_id = d.session_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE session_stats ss
+        SET sold_seats = ss.sold_seats - d.seats, revenue = ss.revenue - d.revenue
+        FROM (SELECT session_id, COUNT(*) AS seats, SUM(final_price) AS revenue
+              FROM old_rows GROUP BY session_id) d
+        WHERE ss.session_id = d.session_id;
+    ELSE
+        UPDATE session_stats ss
+        SET sold_seats = ss.sold_seats + d.seats, revenue = ss.revenue + d.revenue
+        FROM (SELECT session_id, SUM(seats) AS seats, SUM(revenue) AS revenue
+              FROM (SELECT session_id, 1 AS seats, final_price AS revenue FROM new_rows
+                    UNION ALL
+                    SELECT session_id, -1, -final_price FROM old_rows) changed
+              GROUP BY session_id) d
+        WHERE ss.session_id = d.session_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_hall_capacity_seat_insert ON seat;
+DROP TRIGGER IF EXISTS trg_hall_capacity_seat_delete ON seat;
+DROP TRIGGER IF EXISTS trg_hall_capacity_seat_update ON seat;
+DROP TRIGGER IF EXISTS trg_session_stats_session ON session;
+DROP TRIGGER IF EXISTS trg_session_stats_ticket_insert ON ticket;
+DROP TRIGGER IF EXISTS trg_session_stats_ticket_delete ON ticket;
+DROP TRIGGER IF EXISTS trg_session_stats_ticket_update ON ticket;
+
+CREATE TRIGGER trg_hall_capacity_seat_insert AFTER INSERT ON seat
+REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT
+EXECUTE FUNCTION hall_capacity_seat_change ();
+
+CREATE TRIGGER trg_hall_capacity_seat_delete AFTER DELETE ON seat
+REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT
+EXECUTE FUNCTION hall_capacity_seat_change ();
+
+CREATE TRIGGER trg_hall_capacity_seat_update AFTER UPDATE ON seat
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT
+EXECUTE FUNCTION hall_capacity_seat_change ();
+
+CREATE TRIGGER trg_session_stats_session AFTER INSERT
+OR UPDATE OF hall_id ON session FOR EACH ROW
+EXECUTE FUNCTION session_stats_session_change ();
+
+CREATE TRIGGER trg_session_stats_ticket_insert AFTER INSERT ON ticket
+REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT
+EXECUTE FUNCTION session_stats_ticket_change ();
+
+CREATE TRIGGER trg_session_stats_ticket_delete AFTER DELETE ON ticket
+REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT
+EXECUTE FUNCTION session_stats_ticket_change ();
+
+CREATE TRIGGER trg_session_stats_ticket_update AFTER UPDATE ON ticket
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT
+EXECUTE FUNCTION session_stats_ticket_change ();
+
+COMMIT;
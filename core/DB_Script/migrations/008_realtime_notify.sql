@@ -0,0 +1,55 @@
+-- Данные для счётчиков панели отчётов (core/realtime_stats.py): цена и дата продажи в ticket_changes,
+-- новый канал session_changes при добавлении, переносе и удалении сеанса
+BEGIN;
+
+CREATE OR REPLACE FUNCTION notify_ticket_change() RETURNS TRIGGER AS $$
+DECLARE
+    v_row ticket%ROWTYPE;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        v_row := OLD;
+    ELSE
+        v_row := NEW;
+    END IF;
+
+    PERFORM pg_notify('ticket_changes', json_build_object(
+        'op', TG_OP,
+        'ticket_id', v_row.ticket_id,
+        'session_id', v_row.session_id,
+        'seat_id', v_row.seat_id,
+        'user_id', v_row.user_id,
+        'final_price', v_row.final_price,
+        'sale_date', v_row.purchase_date::date
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION notify_session_change() RETURNS TRIGGER AS $$
+DECLARE
+    v_row session%ROWTYPE;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        v_row := OLD;
+    ELSE
+        v_row := NEW;
+    END IF;
+
+    PERFORM pg_notify('session_changes', json_build_object(
+        'op', TG_OP,
+        'session_id', v_row.session_id,
+        'movie_id', v_row.movie_id,
+        'session_date', v_row.session_time::date
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_notify_session_change ON session;
+
+CREATE TRIGGER trg_notify_session_change AFTER INSERT
+OR DELETE
+OR UPDATE OF movie_id, session_time ON session FOR EACH ROW
+EXECUTE FUNCTION notify_session_change ();
+
+COMMIT;
@@ -0,0 +1,68 @@
+-- Свёртка продаж при удалении сеанса (в том числе каскадом от зала или фильма), сверка свёртки и её пересчёт
+BEGIN;
+
+-- Сеанс удаляют - вычитаем его билеты из свёртки, пока они ещё есть.
+-- Каскадное удаление билетов идёт уже после удаления сеанса, и daily_sales_apply их пропускает
+CREATE OR REPLACE FUNCTION daily_sales_session_delete() RETURNS TRIGGER AS $$
+DECLARE
+    v_row RECORD;
+BEGIN
+    FOR v_row IN
+        SELECT purchase_date::date AS sale_date, user_id, COUNT(*)::int AS tickets, SUM(final_price) AS revenue
+        FROM ticket
+        WHERE session_id = OLD.session_id
+        GROUP BY purchase_date::date, user_id
+    LOOP
+        PERFORM daily_sales_apply_to(v_row.sale_date, OLD.session_time::date, OLD.movie_id, OLD.hall_id,
+                                     v_row.user_id, -v_row.tickets, -v_row.revenue);
+    END LOOP;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Строки свёртки, расходящиеся с пересчётом по ticket (как в rebuild_daily_sales); пустой результат - свёртка верна
+CREATE OR REPLACE FUNCTION daily_sales_diff() RETURNS TABLE (
+  rollup TEXT,
+  diff_sale_date DATE,
+  diff_session_date DATE,
+  diff_key TEXT,
+  rollup_tickets BIGINT,
+  actual_tickets BIGINT,
+  rollup_revenue DECIMAL,
+  actual_revenue DECIMAL
+) AS $$
+    WITH actual AS (
+        SELECT t.purchase_date::date AS sale_date, s.session_time::date AS session_date,
+               s.movie_id, s.hall_id, COUNT(*) AS tickets, SUM(t.final_price) AS revenue
+        FROM ticket t
+        JOIN session s ON t.session_id = s.session_id
+        GROUP BY 1, 2, 3, 4
+    )
+    SELECT 'daily_sales', COALESCE(d.sale_date, a.sale_date), COALESCE(d.session_date, a.session_date),
+           'movie_id=' || COALESCE(d.movie_id, a.movie_id) || ', hall_id=' || COALESCE(d.hall_id, a.hall_id),
+           d.tickets, a.tickets, d.revenue, a.revenue
+    FROM daily_sales d
+    FULL JOIN actual a
+      ON (d.sale_date, d.session_date, d.movie_id, d.hall_id) = (a.sale_date, a.session_date, a.movie_id, a.hall_id)
+    WHERE d.tickets IS DISTINCT FROM a.tickets OR d.revenue IS DISTINCT FROM a.revenue
+    UNION ALL
+    SELECT 'daily_customers', COALESCE(d.sale_date, a.sale_date), COALESCE(d.session_date, a.session_date),
+           'user_id=' || COALESCE(d.user_id, a.user_id), d.tickets, a.tickets, NULL, NULL
+    FROM daily_customers d
+    FULL JOIN (
+        SELECT t.purchase_date::date AS sale_date, s.session_time::date AS session_date, t.user_id, COUNT(*) AS tickets
+        FROM ticket t
+        JOIN session s ON t.session_id = s.session_id
+        GROUP BY 1, 2, 3
+    ) a ON (d.sale_date, d.session_date, d.user_id) = (a.sale_date, a.session_date, a.user_id)
+    WHERE d.tickets IS DISTINCT FROM a.tickets;
+$$ LANGUAGE sql STABLE;
+
+DROP TRIGGER IF EXISTS trg_daily_sales_session_delete ON session;
+CREATE TRIGGER trg_daily_sales_session_delete BEFORE DELETE ON session FOR EACH ROW
+EXECUTE FUNCTION daily_sales_session_delete ();
+
+-- Убираем из свёртки билеты сеансов, удалённых до этой миграции
+SELECT rebuild_daily_sales();
+
+COMMIT;
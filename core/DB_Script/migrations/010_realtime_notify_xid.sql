@@ -0,0 +1,75 @@
+-- Счётчики панели отчётов (core/realtime_stats.py): номер транзакции (xid) в ticket_changes и session_changes,
+-- чтобы не учитывать повторно изменения, уже вошедшие в снимок сверки; новый канал user_changes
+BEGIN;
+
+CREATE OR REPLACE FUNCTION notify_ticket_change() RETURNS TRIGGER AS $$
+DECLARE
+    v_row ticket%ROWTYPE;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        v_row := OLD;
+    ELSE
+        v_row := NEW;
+    END IF;
+
+    PERFORM pg_notify('ticket_changes', json_build_object(
+        'op', TG_OP,
+        'ticket_id', v_row.ticket_id,
+        'session_id', v_row.session_id,
+        'seat_id', v_row.seat_id,
+        'user_id', v_row.user_id,
+        'final_price', v_row.final_price,
+        'sale_date', v_row.purchase_date::date,
+        'xid', txid_current()
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION notify_session_change() RETURNS TRIGGER AS $$
+DECLARE
+    v_row session%ROWTYPE;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        v_row := OLD;
+    ELSE
+        v_row := NEW;
+    END IF;
+
+    PERFORM pg_notify('session_changes', json_build_object(
+        'op', TG_OP,
+        'session_id', v_row.session_id,
+        'movie_id', v_row.movie_id,
+        'session_date', v_row.session_time::date,
+        'xid', txid_current()
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Уведомление о регистрации, удалении, бане и разбане пользователя (счётчик активных пользователей)
+CREATE OR REPLACE FUNCTION notify_user_change() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.status IS NOT DISTINCT FROM NEW.status THEN
+        RETURN NULL;
+    END IF;
+
+    PERFORM pg_notify('user_changes', json_build_object(
+        'op', TG_OP,
+        'user_id', CASE WHEN TG_OP = 'DELETE' THEN OLD.user_id ELSE NEW.user_id END,
+        'was_active', TG_OP <> 'INSERT' AND OLD.status = 'Active',
+        'active', TG_OP <> 'DELETE' AND NEW.status = 'Active',
+        'xid', txid_current()
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_notify_user_change ON users;
+
+CREATE TRIGGER trg_notify_user_change AFTER INSERT
+OR DELETE
+OR UPDATE OF status ON users FOR EACH ROW
+EXECUTE FUNCTION notify_user_change ();
+
+COMMIT;
@@ -0,0 +1,85 @@
+-- Секция по умолчанию для activity_log: запись журнала (в том числе внутри транзакции бронирования)
+-- не падает, если месячной секции ещё нет. ensure_activity_log_partitions переносит такие записи
+-- в созданную для их месяца секцию, drop_activity_log_partitions перед удалением секций - тоже.
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS activity_log_default PARTITION OF activity_log DEFAULT;
+
+-- Месячные секции activity_log: создать недостающие от месяца p_from (или самой ранней записи
+-- в секции по умолчанию) до текущего + p_months_ahead
+CREATE OR REPLACE FUNCTION ensure_activity_log_partitions(p_from DATE DEFAULT CURRENT_DATE,
+                                                          p_months_ahead INT DEFAULT 3) RETURNS INT AS $$
+DECLARE
+    v_first DATE := date_trunc('month', p_from)::date;
+    v_month DATE := date_trunc('month', LEAST(p_from, (SELECT MIN(created_at)::date FROM activity_log_default)))::date;
+    v_last DATE := (date_trunc('month', CURRENT_DATE) + make_interval(months => p_months_ahead))::date;
+    v_next DATE;
+    v_name TEXT;
+    v_created INT := 0;
+BEGIN
+    WHILE v_month <= v_last LOOP
+        v_name := 'activity_log_' || to_char(v_month, 'YYYY_MM');
+        v_next := (v_month + INTERVAL '1 month')::date;
+        -- Раньше p_from секции нужны только месяцам, чьи записи лежат в секции по умолчанию
+        IF v_month < v_first AND NOT EXISTS (SELECT 1 FROM activity_log_default
+                                             WHERE created_at >= v_month AND created_at < v_next) THEN
+            v_month := v_next;
+            CONTINUE;
+        END IF;
+        IF to_regclass(v_name) IS NULL THEN
+            -- Секцию нельзя создать, пока строки её месяца лежат в секции по умолчанию:
+            -- переносим их, не давая писать в журнал до создания секции
+            LOCK TABLE activity_log IN EXCLUSIVE MODE;
+        END IF;
+        -- Проверяем ещё раз под блокировкой: секцию мог только что создать другой терминал
+        IF to_regclass(v_name) IS NULL THEN
+            CREATE TEMP TABLE activity_log_moved ON COMMIT DROP AS
+            SELECT log_id, user_id, actor_role, action_type, entity_id, description, created_at
+            FROM activity_log_default
+            WHERE created_at >= v_month AND created_at < v_next;
+            DELETE FROM activity_log_default WHERE created_at >= v_month AND created_at < v_next;
+
+            EXECUTE format('CREATE TABLE %I PARTITION OF activity_log FOR VALUES FROM (%L) TO (%L)',
+                           v_name, v_month, v_next);
+
+            INSERT INTO activity_log (log_id, user_id, actor_role, action_type, entity_id, description, created_at)
+            SELECT * FROM activity_log_moved;
+            DROP TABLE activity_log_moved;
+            v_created := v_created + 1;
+        END IF;
+        v_month := v_next;
+    END LOOP;
+    RETURN v_created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Хранение журнала: удалить (или только отсоединить для архива) секции, целиком лежащие раньше p_before.
+-- Записи из секции по умолчанию сначала раскладываются по месячным секциям, чтобы хранение касалось и их
+CREATE OR REPLACE FUNCTION drop_activity_log_partitions(p_before DATE,
+                                                        p_detach_only BOOLEAN DEFAULT FALSE) RETURNS INT AS $$
+DECLARE
+    v_part RECORD;
+    v_dropped INT := 0;
+BEGIN
+    PERFORM ensure_activity_log_partitions();
+    FOR v_part IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'activity_log'::regclass
+          AND c.relname ~ '^activity_log_\d{4}_\d{2}$'
+          AND to_date(right(c.relname, 7), 'YYYY_MM') + INTERVAL '1 month' <= p_before
+        ORDER BY c.relname
+    LOOP
+        IF p_detach_only THEN
+            EXECUTE format('ALTER TABLE activity_log DETACH PARTITION %I', v_part.relname);
+        ELSE
+            EXECUTE format('DROP TABLE %I', v_part.relname);
+        END IF;
+        v_dropped := v_dropped + 1;
+    END LOOP;
+    RETURN v_dropped;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMIT;
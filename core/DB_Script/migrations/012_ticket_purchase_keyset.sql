@@ -0,0 +1,6 @@
+-- Таблица билетов в админ-панели: новые покупки сверху, блоки читаются по ключу (purchase_date, ticket_id)
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_ticket_purchase_date_id ON ticket (purchase_date DESC, ticket_id DESC);
+
+COMMIT;
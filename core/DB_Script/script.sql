@@ -22,6 +22,9 @@ CREATE TABLE movies (
   title VARCHAR(255) NOT NULL,
   description TEXT NOT NULL,
   movie_image BYTEA NOT NULL,
+  movie_thumb BYTEA,
+  movie_detail BYTEA,
+  image_hash VARCHAR(64),
   base_price DECIMAL(8, 2) DEFAULT 300.00 NOT NULL,
   rating DECIMAL(2, 1) DEFAULT 0.0 NOT NULL,
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
@@ -40,6 +43,8 @@ CREATE TABLE director (
   name VARCHAR(100) NOT NULL,
   lastname VARCHAR(100) NOT NULL,
   photo BYTEA NOT NULL,
+  photo_thumb BYTEA,
+  photo_hash VARCHAR(64),
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
   updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
 );
@@ -49,6 +54,8 @@ CREATE TABLE actor (
   name VARCHAR(100) NOT NULL,
   lastname VARCHAR(100) NOT NULL,
   photo BYTEA NOT NULL,
+  photo_thumb BYTEA,
+  photo_hash VARCHAR(64),
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
   updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
 );
@@ -101,6 +108,8 @@ CREATE TABLE hall (
   hall_name VARCHAR(100) NOT NULL,
   hall_type VARCHAR(100) NOT NULL,
   hall_extra_price DECIMAL(8, 2) DEFAULT 0.00 NOT NULL,
+  -- Число мест зала, ведётся триггерами на seat
+  capacity INT DEFAULT 0 NOT NULL,
   created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
   updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
 );
@@ -137,15 +146,60 @@ CREATE TABLE ticket (
   CONSTRAINT unique_session_seat UNIQUE (session_id, seat_id)
 );
 
+CREATE TABLE seat_hold (
+  session_id INT NOT NULL REFERENCES session (session_id) ON DELETE CASCADE ON UPDATE CASCADE,
+  seat_id INT NOT NULL REFERENCES seat (seat_id) ON DELETE CASCADE ON UPDATE CASCADE,
+  user_id INT NOT NULL REFERENCES users (user_id) ON DELETE CASCADE ON UPDATE CASCADE,
+  expires_at TIMESTAMP NOT NULL,
+  PRIMARY KEY (session_id, seat_id)
+);
+
+-- Счётчики сеанса: продано мест, выручка и вместимость зала; ведутся триггерами на ticket, session и seat
+CREATE TABLE session_stats (
+  session_id INT PRIMARY KEY REFERENCES session (session_id) ON DELETE CASCADE ON UPDATE CASCADE,
+  sold_seats INT NOT NULL DEFAULT 0,
+  revenue DECIMAL(12, 2) NOT NULL DEFAULT 0,
+  capacity INT NOT NULL DEFAULT 0
+);
+
+-- Свёртка продаж по дням: ведётся триггерами на ticket и session, отчёты читают её вместо ticket.
+-- session_date нужна отчётам, которые учитывают только билеты на сеансы за тот же период
+CREATE TABLE daily_sales (
+  sale_date DATE NOT NULL,
+  session_date DATE NOT NULL,
+  movie_id INT NOT NULL,
+  hall_id INT NOT NULL,
+  tickets INT NOT NULL DEFAULT 0,
+  revenue DECIMAL(12, 2) NOT NULL DEFAULT 0,
+  PRIMARY KEY (sale_date, session_date, movie_id, hall_id)
+);
+
+-- Покупатели по дням - для числа уникальных клиентов за период
+CREATE TABLE daily_customers (
+  sale_date DATE NOT NULL,
+  session_date DATE NOT NULL,
+  user_id INT NOT NULL,
+  tickets INT NOT NULL DEFAULT 0,
+  PRIMARY KEY (sale_date, session_date, user_id)
+);
+
+-- Журнал разбит на месячные секции по created_at (см. ensure_activity_log_partitions)
 CREATE TABLE activity_log (
-  log_id SERIAL PRIMARY KEY,
+  log_id SERIAL,
   user_id INT REFERENCES users (user_id) ON DELETE SET NULL ON UPDATE CASCADE,
   actor_role VARCHAR(100),
   action_type VARCHAR(100),
   entity_id INT,
   description TEXT,
-  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
-);
+  created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+  -- Группа действия (USER, TICKET, MOVIE...) - префикс action_type до первого "_"
+  action_group VARCHAR(100) GENERATED ALWAYS AS (split_part(action_type, '_', 1)) STORED,
+  description_tsv TSVECTOR GENERATED ALWAYS AS (to_tsvector('russian', COALESCE(description, ''))) STORED,
+  PRIMARY KEY (log_id, created_at)
+) PARTITION BY RANGE (created_at);
+
+-- Записи месяцев без своей секции; ensure_activity_log_partitions переносит их в созданную секцию
+CREATE TABLE activity_log_default PARTITION OF activity_log DEFAULT;
 
 INSERT INTO
   roles (role_name)
@@ -195,6 +249,413 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Уведомление приложений о продаже и отмене билетов (живое обновление схемы зала)
+CREATE OR REPLACE FUNCTION notify_ticket_change() RETURNS TRIGGER AS $$
+DECLARE
+    v_row ticket%ROWTYPE;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        v_row := OLD;
+    ELSE
+        v_row := NEW;
+    END IF;
+
+    PERFORM pg_notify('ticket_changes', json_build_object(
+        'op', TG_OP,
+        'ticket_id', v_row.ticket_id,
+        'session_id', v_row.session_id,
+        'seat_id', v_row.seat_id,
+        'user_id', v_row.user_id,
+        'final_price', v_row.final_price,
+        'sale_date', v_row.purchase_date::date,
+        'xid', txid_current()
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Уведомление о добавлении, переносе и удалении сеанса (счётчики панели отчётов)
+CREATE OR REPLACE FUNCTION notify_session_change() RETURNS TRIGGER AS $$
+DECLARE
+    v_row session%ROWTYPE;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        v_row := OLD;
+    ELSE
+        v_row := NEW;
+    END IF;
+
+    PERFORM pg_notify('session_changes', json_build_object(
+        'op', TG_OP,
+        'session_id', v_row.session_id,
+        'movie_id', v_row.movie_id,
+        'session_date', v_row.session_time::date,
+        'xid', txid_current()
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Уведомление о регистрации, удалении, бане и разбане пользователя (счётчик активных пользователей)
+CREATE OR REPLACE FUNCTION notify_user_change() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.status IS NOT DISTINCT FROM NEW.status THEN
+        RETURN NULL;
+    END IF;
+
+    PERFORM pg_notify('user_changes', json_build_object(
+        'op', TG_OP,
+        'user_id', CASE WHEN TG_OP = 'DELETE' THEN OLD.user_id ELSE NEW.user_id END,
+        'was_active', TG_OP <> 'INSERT' AND OLD.status = 'Active',
+        'active', TG_OP <> 'DELETE' AND NEW.status = 'Active',
+        'xid', txid_current()
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Уведомление о временной брони места (выбор места в схеме зала)
+CREATE OR REPLACE FUNCTION notify_seat_hold() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        PERFORM pg_notify('ticket_changes', json_build_object(
+            'op', 'RELEASE',
+            'session_id', OLD.session_id,
+            'seat_id', OLD.seat_id,
+            'user_id', OLD.user_id
+        )::text);
+        RETURN NULL;
+    END IF;
+
+    -- Продление своей действующей брони не рассылаем: бронь держится до RELEASE
+    -- (снятие или удаление просроченной purge_expired). Просроченную запись, занятую заново, - рассылаем
+    IF TG_OP = 'UPDATE' AND OLD.user_id = NEW.user_id AND OLD.expires_at > CURRENT_TIMESTAMP THEN
+        RETURN NULL;
+    END IF;
+
+    PERFORM pg_notify('ticket_changes', json_build_object(
+        'op', 'HOLD',
+        'session_id', NEW.session_id,
+        'seat_id', NEW.seat_id,
+        'user_id', NEW.user_id
+    )::text);
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Вместимость зала: прибавить p_seats мест; предстоящие сеансы зала получают новую вместимость
+CREATE OR REPLACE FUNCTION hall_capacity_add(p_hall_id INT, p_seats INT) RETURNS VOID AS $$
+BEGIN
+    UPDATE hall SET capacity = capacity + p_seats WHERE hall_id = p_hall_id;
+
+    UPDATE session_stats ss
+    SET capacity = h.capacity
+    FROM session s
+    JOIN hall h ON s.hall_id = h.hall_id
+    WHERE ss.session_id = s.session_id
+      AND s.hall_id = p_hall_id
+      AND s.session_time > CURRENT_TIMESTAMP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Один пересчёт на оператор: create_multiple_seats и delete_hall_seats не обновляют зал на каждое место
+CREATE OR REPLACE FUNCTION hall_capacity_seat_change() RETURNS TRIGGER AS $$
+DECLARE
+    v_row RECORD;
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        FOR v_row IN SELECT hall_id, COUNT(*)::int AS seats FROM new_rows GROUP BY hall_id LOOP
+            PERFORM hall_capacity_add(v_row.hall_id, v_row.seats);
+        END LOOP;
+    ELSIF TG_OP = 'DELETE' THEN
+        FOR v_row IN SELECT hall_id, COUNT(*)::int AS seats FROM old_rows GROUP BY hall_id LOOP
+            PERFORM hall_capacity_add(v_row.hall_id, -v_row.seats);
+        END LOOP;
+    ELSE
+        FOR v_row IN
+            SELECT hall_id, SUM(seats)::int AS seats
+            FROM (SELECT hall_id, 1 AS seats FROM new_rows
+                  UNION ALL
+                  SELECT hall_id, -1 FROM old_rows) moved
+            GROUP BY hall_id
+            HAVING SUM(seats) <> 0
+        LOOP
+            PERFORM hall_capacity_add(v_row.hall_id, v_row.seats);
+        END LOOP;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Новый сеанс получает строку счётчиков; при смене зала - его вместимость
+CREATE OR REPLACE FUNCTION session_stats_session_change() RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO session_stats (session_id, capacity)
+    SELECT NEW.session_id, capacity FROM hall WHERE hall_id = NEW.hall_id
+    ON CONFLICT (session_id) DO UPDATE SET capacity = EXCLUDED.capacity;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Продажа и отмена билетов: одно обновление счётчиков на сеанс за оператор (бронь нескольких мест - один UPDATE)
+CREATE OR REPLACE FUNCTION session_stats_ticket_change() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE session_stats ss
+        SET sold_seats = ss.sold_seats + d.seats, revenue = ss.revenue + d.revenue
+        FROM (SELECT session_id, COUNT(*) AS seats, SUM(final_price) AS revenue
+              FROM new_rows GROUP BY session_id) d
+        WHERE ss.session_id = d.session_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE session_stats ss
+        SET sold_seats = ss.sold_seats - d.seats, revenue = ss.revenue - d.revenue
+        FROM (SELECT session_id, COUNT(*) AS seats, SUM(final_price) AS revenue
+              FROM old_rows GROUP BY session_id) d
+        WHERE ss.session_id = d.session_id;
+    ELSE
+        UPDATE session_stats ss
+        SET sold_seats = ss.sold_seats + d.seats, revenue = ss.revenue + d.revenue
+        FROM (SELECT session_id, SUM(seats) AS seats, SUM(revenue) AS revenue
+              FROM (SELECT session_id, 1 AS seats, final_price AS revenue FROM new_rows
+                    UNION ALL
+                    SELECT session_id, -1, -final_price FROM old_rows) changed
+              GROUP BY session_id) d
+        WHERE ss.session_id = d.session_id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Свёртка продаж: добавить (p_tickets > 0) или вычесть (p_tickets < 0) билеты
+CREATE OR REPLACE FUNCTION daily_sales_apply(p_sale_date DATE, p_session_id INT, p_user_id INT,
+                                             p_tickets INT, p_revenue DECIMAL) RETURNS VOID AS $$
+DECLARE
+    v_session_date DATE;
+    v_movie_id INT;
+    v_hall_id INT;
+BEGIN
+    SELECT session_time::date, movie_id, hall_id INTO v_session_date, v_movie_id, v_hall_id
+    FROM session WHERE session_id = p_session_id;
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+    PERFORM daily_sales_apply_to(p_sale_date, v_session_date, v_movie_id, v_hall_id,
+                                 p_user_id, p_tickets, p_revenue);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION daily_sales_apply_to(p_sale_date DATE, p_session_date DATE, p_movie_id INT,
+                                                p_hall_id INT, p_user_id INT,
+                                                p_tickets INT, p_revenue DECIMAL) RETURNS VOID AS $$
+BEGIN
+    INSERT INTO daily_sales (sale_date, session_date, movie_id, hall_id, tickets, revenue)
+    VALUES (p_sale_date, p_session_date, p_movie_id, p_hall_id, p_tickets, p_revenue)
+    ON CONFLICT (sale_date, session_date, movie_id, hall_id) DO UPDATE
+    SET tickets = daily_sales.tickets + EXCLUDED.tickets,
+        revenue = daily_sales.revenue + EXCLUDED.revenue;
+
+    INSERT INTO daily_customers (sale_date, session_date, user_id, tickets)
+    VALUES (p_sale_date, p_session_date, p_user_id, p_tickets)
+    ON CONFLICT (sale_date, session_date, user_id) DO UPDATE
+    SET tickets = daily_customers.tickets + EXCLUDED.tickets;
+
+    IF p_tickets < 0 THEN
+        DELETE FROM daily_sales
+        WHERE sale_date = p_sale_date AND session_date = p_session_date
+          AND movie_id = p_movie_id AND hall_id = p_hall_id AND tickets <= 0;
+        DELETE FROM daily_customers
+        WHERE sale_date = p_sale_date AND session_date = p_session_date
+          AND user_id = p_user_id AND tickets <= 0;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION daily_sales_ticket_change() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        PERFORM daily_sales_apply(OLD.purchase_date::date, OLD.session_id, OLD.user_id, -1, -OLD.final_price);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM daily_sales_apply(NEW.purchase_date::date, NEW.session_id, NEW.user_id, 1, NEW.final_price);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Сеанс перенесли в другой зал/день или сменили фильм - переносим его билеты в свёртке
+CREATE OR REPLACE FUNCTION daily_sales_session_change() RETURNS TRIGGER AS $$
+DECLARE
+    v_row RECORD;
+BEGIN
+    FOR v_row IN
+        SELECT purchase_date::date AS sale_date, user_id, COUNT(*)::int AS tickets, SUM(final_price) AS revenue
+        FROM ticket
+        WHERE session_id = NEW.session_id
+        GROUP BY purchase_date::date, user_id
+    LOOP
+        PERFORM daily_sales_apply_to(v_row.sale_date, OLD.session_time::date, OLD.movie_id, OLD.hall_id,
+                                     v_row.user_id, -v_row.tickets, -v_row.revenue);
+        PERFORM daily_sales_apply_to(v_row.sale_date, NEW.session_time::date, NEW.movie_id, NEW.hall_id,
+                                     v_row.user_id, v_row.tickets, v_row.revenue);
+    END LOOP;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Сеанс удаляют - вычитаем его билеты из свёртки, пока они ещё есть.
+-- Каскадное удаление билетов идёт уже после удаления сеанса, и daily_sales_apply их пропускает
+CREATE OR REPLACE FUNCTION daily_sales_session_delete() RETURNS TRIGGER AS $$
+DECLARE
+    v_row RECORD;
+BEGIN
+    FOR v_row IN
+        SELECT purchase_date::date AS sale_date, user_id, COUNT(*)::int AS tickets, SUM(final_price) AS revenue
+        FROM ticket
+        WHERE session_id = OLD.session_id
+        GROUP BY purchase_date::date, user_id
+    LOOP
+        PERFORM daily_sales_apply_to(v_row.sale_date, OLD.session_time::date, OLD.movie_id, OLD.hall_id,
+                                     v_row.user_id, -v_row.tickets, -v_row.revenue);
+    END LOOP;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Полный пересчёт свёртки по ticket (первичное заполнение или сверка)
+CREATE OR REPLACE FUNCTION rebuild_daily_sales() RETURNS VOID AS $$
+BEGIN
+    LOCK TABLE daily_sales, daily_customers IN EXCLUSIVE MODE;
+    TRUNCATE daily_sales, daily_customers;
+
+    INSERT INTO daily_sales (sale_date, session_date, movie_id, hall_id, tickets, revenue)
+    SELECT t.purchase_date::date, s.session_time::date, s.movie_id, s.hall_id, COUNT(*), SUM(t.final_price)
+    FROM ticket t
+    JOIN session s ON t.session_id = s.session_id
+    GROUP BY 1, 2, 3, 4;
+
+    INSERT INTO daily_customers (sale_date, session_date, user_id, tickets)
+    SELECT t.purchase_date::date, s.session_time::date, t.user_id, COUNT(*)
+    FROM ticket t
+    JOIN session s ON t.session_id = s.session_id
+    GROUP BY 1, 2, 3;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Строки свёртки, расходящиеся с пересчётом по ticket (как в rebuild_daily_sales); пустой результат - свёртка верна
+CREATE OR REPLACE FUNCTION daily_sales_diff() RETURNS TABLE (
+  rollup TEXT,
+  diff_sale_date DATE,
+  diff_session_date DATE,
+  diff_key TEXT,
+  rollup_tickets BIGINT,
+  actual_tickets BIGINT,
+  rollup_revenue DECIMAL,
+  actual_revenue DECIMAL
+) AS $$
+    WITH actual AS (
+        SELECT t.purchase_date::date AS sale_date, s.session_time::date AS session_date,
+               s.movie_id, s.hall_id, COUNT(*) AS tickets, SUM(t.final_price) AS revenue
+        FROM ticket t
+        JOIN session s ON t.session_id = s.session_id
+        GROUP BY 1, 2, 3, 4
+    )
+    SELECT 'daily_sales', COALESCE(d.sale_date, a.sale_date), COALESCE(d.session_date, a.session_date),
+           'movie_id=' || COALESCE(d.movie_id, a.movie_id) || ', hall_id=' || COALESCE(d.hall_id, a.hall_id),
+           d.tickets, a.tickets, d.revenue, a.revenue
+    FROM daily_sales d
+    FULL JOIN actual a
+      ON (d.sale_date, d.session_date, d.movie_id, d.hall_id) = (a.sale_date, a.session_date, a.movie_id, a.hall_id)
+    WHERE d.tickets IS DISTINCT FROM a.tickets OR d.revenue IS DISTINCT FROM a.revenue
+    UNION ALL
+    SELECT 'daily_customers', COALESCE(d.sale_date, a.sale_date), COALESCE(d.session_date, a.session_date),
+           'user_id=' || COALESCE(d.user_id, a.user_id), d.tickets, a.tickets, NULL, NULL
+    FROM daily_customers d
+    FULL JOIN (
+        SELECT t.purchase_date::date AS sale_date, s.session_time::date AS session_date, t.user_id, COUNT(*) AS tickets
+        FROM ticket t
+        JOIN session s ON t.session_id = s.session_id
+        GROUP BY 1, 2, 3
+    ) a ON (d.sale_date, d.session_date, d.user_id) = (a.sale_date, a.session_date, a.user_id)
+    WHERE d.tickets IS DISTINCT FROM a.tickets;
+$$ LANGUAGE sql STABLE;
+
+-- Месячные секции activity_log: создать недостающие от месяца p_from (или самой ранней записи
+-- в секции по умолчанию) до текущего + p_months_ahead
+CREATE OR REPLACE FUNCTION ensure_activity_log_partitions(p_from DATE DEFAULT CURRENT_DATE,
+                                                          p_months_ahead INT DEFAULT 3) RETURNS INT AS $$
+DECLARE
+    v_first DATE := date_trunc('month', p_from)::date;
+    v_month DATE := date_trunc('month', LEAST(p_from, (SELECT MIN(created_at)::date FROM activity_log_default)))::date;
+    v_last DATE := (date_trunc('month', CURRENT_DATE) + make_interval(months => p_months_ahead))::date;
+    v_next DATE;
+    v_name TEXT;
+    v_created INT := 0;
+BEGIN
+    WHILE v_month <= v_last LOOP
+        v_name := 'activity_log_' || to_char(v_month, 'YYYY_MM');
+        v_next := (v_month + INTERVAL '1 month')::date;
+        -- Раньше p_from секции нужны только месяцам, чьи записи лежат в секции по умолчанию
+        IF v_month < v_first AND NOT EXISTS (SELECT 1 FROM activity_log_default
+                                             WHERE created_at >= v_month AND created_at < v_next) THEN
+            v_month := v_next;
+            CONTINUE;
+        END IF;
+        IF to_regclass(v_name) IS NULL THEN
+            -- Секцию нельзя создать, пока строки её месяца лежат в секции по умолчанию:
+            -- переносим их, не давая писать в журнал до создания секции
+            LOCK TABLE activity_log IN EXCLUSIVE MODE;
+        END IF;
+        -- Проверяем ещё раз под блокировкой: секцию мог только что создать другой терминал
+        IF to_regclass(v_name) IS NULL THEN
+            CREATE TEMP TABLE activity_log_moved ON COMMIT DROP AS
+            SELECT log_id, user_id, actor_role, action_type, entity_id, description, created_at
+            FROM activity_log_default
+            WHERE created_at >= v_month AND created_at < v_next;
+            DELETE FROM activity_log_default WHERE created_at >= v_month AND created_at < v_next;
+
+            EXECUTE format('CREATE TABLE %I PARTITION OF activity_log FOR VALUES FROM (%L) TO (%L)',
+                           v_name, v_month, v_next);
+
+            INSERT INTO activity_log (log_id, user_id, actor_role, action_type, entity_id, description, created_at)
+            SELECT * FROM activity_log_moved;
+            DROP TABLE activity_log_moved;
+            v_created := v_created + 1;
+        END IF;
+        v_month := v_next;
+    END LOOP;
+    RETURN v_created;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Хранение журнала: удалить (или только отсоединить для архива) секции, целиком лежащие раньше p_before.
+-- Записи из секции по умолчанию сначала раскладываются по месячным секциям, чтобы хранение касалось и их
+CREATE OR REPLACE FUNCTION drop_activity_log_partitions(p_before DATE,
+                                                        p_detach_only BOOLEAN DEFAULT FALSE) RETURNS INT AS $$
+DECLARE
+    v_part RECORD;
+    v_dropped INT := 0;
+BEGIN
+    PERFORM ensure_activity_log_partitions();
+    FOR v_part IN
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'activity_log'::regclass
+          AND c.relname ~ '^activity_log_\d{4}_\d{2}$'
+          AND to_date(right(c.relname, 7), 'YYYY_MM') + INTERVAL '1 month' <= p_before
+        ORDER BY c.relname
+    LOOP
+        IF p_detach_only THEN
+            EXECUTE format('ALTER TABLE activity_log DETACH PARTITION %I', v_part.relname);
+        ELSE
+            EXECUTE format('DROP TABLE %I', v_part.relname);
+        END IF;
+        v_dropped := v_dropped + 1;
+    END LOOP;
+    RETURN v_dropped;
+END;
+$$ LANGUAGE plpgsql;
+
 -- Триггеры
 CREATE TRIGGER trg_set_updated_at_users BEFORE
 UPDATE ON users FOR EACH ROW
@@ -247,4 +708,96 @@ EXECUTE FUNCTION set_updated_at ();
 CREATE TRIGGER trg_calc_ticket_price BEFORE INSERT
 OR
 UPDATE ON ticket FOR EACH ROW
-EXECUTE FUNCTION calc_ticket_price ();
\ No newline at end of file
+EXECUTE FUNCTION calc_ticket_price ();
+
+CREATE TRIGGER trg_notify_ticket_change AFTER INSERT
+OR DELETE ON ticket FOR EACH ROW
+EXECUTE FUNCTION notify_ticket_change ();
+
+CREATE TRIGGER trg_notify_session_change AFTER INSERT
+OR DELETE
+OR UPDATE OF movie_id, session_time ON session FOR EACH ROW
+EXECUTE FUNCTION notify_session_change ();
+
+CREATE TRIGGER trg_notify_user_change AFTER INSERT
+OR DELETE
+OR UPDATE OF status ON users FOR EACH ROW
+EXECUTE FUNCTION notify_user_change ();
+
+CREATE TRIGGER trg_hall_capacity_seat_insert AFTER INSERT ON seat
+REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT
+EXECUTE FUNCTION hall_capacity_seat_change ();
+
+CREATE TRIGGER trg_hall_capacity_seat_delete AFTER DELETE ON seat
+REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT
+EXECUTE FUNCTION hall_capacity_seat_change ();
+
+CREATE TRIGGER trg_hall_capacity_seat_update AFTER UPDATE ON seat
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT
+EXECUTE FUNCTION hall_capacity_seat_change ();
+
+CREATE TRIGGER trg_session_stats_session AFTER INSERT
+OR UPDATE OF hall_id ON session FOR EACH ROW
+EXECUTE FUNCTION session_stats_session_change ();
+
+CREATE TRIGGER trg_session_stats_ticket_insert AFTER INSERT ON ticket
+REFERENCING NEW TABLE AS new_rows FOR EACH STATEMENT
+EXECUTE FUNCTION session_stats_ticket_change ();
+
+CREATE TRIGGER trg_session_stats_ticket_delete AFTER DELETE ON ticket
+REFERENCING OLD TABLE AS old_rows FOR EACH STATEMENT
+EXECUTE FUNCTION session_stats_ticket_change ();
+
+CREATE TRIGGER trg_session_stats_ticket_update AFTER UPDATE ON ticket
+REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows FOR EACH STATEMENT
+EXECUTE FUNCTION session_stats_ticket_change ();
+
+CREATE TRIGGER trg_daily_sales_ticket AFTER INSERT
+OR DELETE
+OR UPDATE OF session_id, seat_id, user_id, final_price, purchase_date ON ticket FOR EACH ROW
+EXECUTE FUNCTION daily_sales_ticket_change ();
+
+CREATE TRIGGER trg_daily_sales_session AFTER
+UPDATE OF movie_id, hall_id, session_time ON session FOR EACH ROW
+WHEN (
+  OLD.movie_id IS DISTINCT FROM NEW.movie_id
+  OR OLD.hall_id IS DISTINCT FROM NEW.hall_id
+  OR OLD.session_time::date IS DISTINCT FROM NEW.session_time::date
+)
+EXECUTE FUNCTION daily_sales_session_change ();
+
+CREATE TRIGGER trg_daily_sales_session_delete BEFORE DELETE ON session FOR EACH ROW
+EXECUTE FUNCTION daily_sales_session_delete ();
+
+CREATE TRIGGER trg_notify_seat_hold AFTER INSERT
+OR UPDATE OR DELETE ON seat_hold FOR EACH ROW
+EXECUTE FUNCTION notify_seat_hold ();
+-- Индексы
+-- Keyset-пагинация каталога: новинки и сортировка по рейтингу
+CREATE INDEX idx_movies_created_at_id ON movies (created_at DESC, movie_id DESC);
+
+CREATE INDEX idx_movies_rating_id ON movies (rating DESC, movie_id DESC);
+
+CREATE INDEX idx_movie_genre_genre_id ON movie_genre (genre_id, movie_id);
+-- Таблица билетов в админ-панели: новые покупки сверху, keyset по (purchase_date, ticket_id)
+CREATE INDEX idx_ticket_purchase_date_id ON ticket (purchase_date DESC, ticket_id DESC);
+
+-- Журнал: последние записи без сортировки всей секции
+CREATE INDEX idx_activity_log_created_at_id ON activity_log (created_at DESC, log_id DESC);
+
+-- Журнал: фильтры обозревателя журнала, каждый с keyset-порядком (created_at, log_id)
+CREATE INDEX idx_activity_log_user_created ON activity_log (user_id, created_at DESC, log_id DESC);
+
+CREATE INDEX idx_activity_log_role_created ON activity_log (actor_role, created_at DESC, log_id DESC);
+
+CREATE INDEX idx_activity_log_action_created ON activity_log (action_type, created_at DESC, log_id DESC);
+
+CREATE INDEX idx_activity_log_group_created ON activity_log (action_group, created_at DESC, log_id DESC);
+
+CREATE INDEX idx_activity_log_entity_created ON activity_log (entity_id, created_at DESC, log_id DESC);
+
+-- Журнал: полнотекстовый поиск по описанию
+CREATE INDEX idx_activity_log_description_tsv ON activity_log USING GIN (description_tsv);
+
+-- Секции журнала на текущий и ближайшие месяцы (дальше - при запуске приложения)
+SELECT ensure_activity_log_partitions(CURRENT_DATE, 3);
@@ -0,0 +1,162 @@
+import functools
+import itertools
+import weakref
+
+from PyQt6 import sip
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from core.config import DB_POOL_MAX
+
+# Потоков не больше, чем соединений в пуле - иначе они просто ждут соединение
+MAX_THREADS = max(1, min(4, DB_POOL_MAX))
+
+
+class _Call:
+    """Одно выполнение fn(*args) и все, кто ждёт его результат"""
+
+    def __init__(self, fn, args):
+        self.fn = fn
+        self.args = args
+        self.subscribers = []
+
+
+class _CallTask(QRunnable):
+    def __init__(self, executor, call_key, call):
+        super().__init__()
+        self.executor = executor
+        self.call_key = call_key
+        self.call = call
+
+    def run(self):
+        try:
+            result, error = self.call.fn(*self.call.args), None
+        except Exception as e:
+            result, error = None, e
+        self.executor._finished.emit((self.call_key, self.call), result, error)
+
+
+class AsyncExecutor(QObject):
+    """
+    Выполнение вызовов моделей в пуле потоков, результат - в GUI-поток через сигнал.
+    Вызовы с coalesce=True (только идемпотентные чтения) объединяются: одинаковый вызов
+    (та же функция и аргументы), пока первый не завершился, выполняется один раз.
+    Записи не объединяются никогда, и после любого вызова без coalesce чтения не присоединяются
+    к начатым до него - иначе получили бы данные до записи.
+    Для channel действует только последний запрос: ответы на более ранние отбрасываются.
+    owner - объект, которому нужен результат: каналы разных владельцев не пересекаются,
+    а если владельца уже нет (удалён виджет), ответ не доставляется.
+    """
+    _finished = pyqtSignal(object, object, object)
+
+    def __init__(self, max_threads=MAX_THREADS):
+        super().__init__()
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_threads)
+        self._calls = {}
+        self._generations = {}
+        self._counter = itertools.count()
+        self._finished.connect(self._on_finished)
+
+    def submit(self, fn, *args, on_result=None, on_error=None, channel=None, coalesce=False, owner=None):
+        owner_ref = weakref.ref(owner) if owner is not None else None
+        channel = self._channel_key(channel, owner_ref)
+        generation = None
+        if channel is not None:
+            generation = next(self._counter)
+            self._generations[channel] = generation
+
+        call_key = None
+        if coalesce:
+            try:
+                call_key = (fn, args)
+                hash(call_key)
+            except TypeError:
+                # Нехешируемые аргументы - без объединения запросов
+                call_key = None
+
+        call = self._calls.get(call_key) if call_key is not None else None
+        is_new = call is None
+        if is_new:
+            call = _Call(fn, args)
+            if call_key is not None:
+                self._calls[call_key] = call
+            elif not coalesce:
+                # Начатые чтения досчитают для своих подписчиков, но новые к ним уже не присоединятся
+                self._calls.clear()
+        call.subscribers.append((channel, generation, owner_ref, on_result, on_error))
+
+        if is_new:
+            self.pool.start(_CallTask(self, call_key, call))
+
+    def cancel(self, channel, owner=None):
+        """Забыть ожидающий запрос канала - его результат не будет доставлен"""
+        channel = self._channel_key(channel, weakref.ref(owner) if owner is not None else None)
+        if channel in self._generations:
+            self._generations[channel] = next(self._counter)
+
+    @staticmethod
+    def _channel_key(channel, owner_ref):
+        # Слабая ссылка, а не id(owner): id освобождённого объекта может достаться новому,
+        # а мёртвая ссылка не равна ни одной другой
+        if channel is None or owner_ref is None:
+            return channel
+        return owner_ref, channel
+
+    @staticmethod
+    def _is_deleted(obj):
+        return isinstance(obj, QObject) and sip.isdeleted(obj)
+
+    @classmethod
+    def _is_alive(cls, callback, owner_ref):
+        # Результат для уже удалённого виджета не доставляем
+        if owner_ref is not None:
+            owner = owner_ref()
+            if owner is None or cls._is_deleted(owner):
+                return False
+        while isinstance(callback, functools.partial):
+            callback = callback.func
+        return not cls._is_deleted(getattr(callback, '__self__', None))
+
+    def _on_finished(self, task, result, error):
+        call_key, call = task
+        if call_key is not None and self._calls.get(call_key) is call:
+            del self._calls[call_key]
+
+        for channel, generation, owner_ref, on_result, on_error in call.subscribers:
+            if channel is not None and self._generations.get(channel) != generation:
+                continue
+            if channel is not None:
+                self._generations.pop(channel, None)
+
+            if error is not None:
+                if on_error and self._is_alive(on_error, owner_ref):
+                    on_error(error)
+                else:
+                    print(f"Ошибка фонового запроса {getattr(call.fn, '__qualname__', call.fn)}: {error}")
+            elif on_result and self._is_alive(on_result, owner_ref):
+                on_result(result)
+
+
+_executor = None
+
+
+def get_executor():
+    """Общий исполнитель; создаётся при первом обращении, когда QApplication уже есть"""
+    global _executor
+    if _executor is None:
+        _executor = AsyncExecutor()
+    return _executor
+
+
+def run_query_async(fn, *args, on_result=None, on_error=None, channel=None, coalesce=False, owner=None):
+    """
+    Выполнить fn(*args) (обычно метод модели) в фоне.
+    on_result(result) / on_error(exception) вызываются в GUI-потоке.
+    owner - виджет, которому нужен результат (обычно self): после его удаления колбэки не вызываются,
+    даже если это lambda или functools.partial.
+    channel - имя вида "sessions" в пределах owner: новый запрос в канале делает предыдущие устаревшими.
+    coalesce=True - только для чтений, которые не перечитываются сразу после записи:
+    такой вызов присоединяется к уже выполняющемуся с теми же аргументами.
+    """
+    get_executor().submit(fn, *args, on_result=on_result, on_error=on_error, channel=channel,
+                          coalesce=coalesce, owner=owner)
@@ -0,0 +1,48 @@
+import os
+from configparser import ConfigParser
+
+# Порядок приоритета: переменные окружения -> config.ini -> значения по умолчанию
+CONFIG_FILE = os.environ.get("CINEMAVAIB_CONFIG", "config.ini")
+
+_parser = ConfigParser()
+_parser.read(CONFIG_FILE, encoding="utf-8")
+
+
+def _get(section, key, env_name, default):
+    value = os.environ.get(env_name)
+    if value is not None:
+        return value
+    return _parser.get(section, key, fallback=default)
+
+
+DB_DSN = _get("database", "dsn", "CINEMAVAIB_DSN",
+              "dbname=cinemavaib_db host=localhost port=5432 user=postgres")
+
+# Размер пула соединений
+DB_POOL_MIN = int(_get("database", "pool_min", "CINEMAVAIB_DB_POOL_MIN", 1))
+DB_POOL_MAX = int(_get("database", "pool_max", "CINEMAVAIB_DB_POOL_MAX", 10))
+
+# Через сколько секунд простоя соединение проверяется SELECT 1 перед выдачей
+DB_HEALTHCHECK_IDLE = float(_get("database", "healthcheck_idle", "CINEMAVAIB_DB_HEALTHCHECK_IDLE", 30))
+
+# Бюджет памяти общего кэша декодированных изображений, МБ
+IMAGE_CACHE_MB = int(_get("cache", "image_cache_mb", "CINEMAVAIB_IMAGE_CACHE_MB", 64))
+
+# Каталог локального кэша постеров; пустая строка отключает кэш
+POSTER_CACHE_DIR = os.path.expanduser(_get("cache", "poster_dir", "CINEMAVAIB_POSTER_CACHE_DIR",
+                                           os.path.join("~", ".cinemavaib", "posters")))
+
+# Сколько секунд место остаётся за покупателем после клика в схеме зала
+SEAT_HOLD_TTL = int(_get("booking", "seat_hold_ttl", "CINEMAVAIB_SEAT_HOLD_TTL", 300))
+
+# Буфер журнала действий: запись пачкой раз в flush_ms или по batch_size записей
+LOG_BATCH_SIZE = int(_get("logging", "batch_size", "CINEMAVAIB_LOG_BATCH_SIZE", 200))
+LOG_FLUSH_MS = int(_get("logging", "flush_ms", "CINEMAVAIB_LOG_FLUSH_MS", 500))
+LOG_BUFFER_MAX = int(_get("logging", "buffer_max", "CINEMAVAIB_LOG_BUFFER_MAX", 10000))
+# Что делать при переполнении буфера: drop_oldest или block
+LOG_OVERFLOW = _get("logging", "overflow", "CINEMAVAIB_LOG_OVERFLOW", "drop_oldest")
+
+# Сколько отчётов строится одновременно (каждый - в отдельном процессе со своими соединениями)
+REPORT_WORKERS = int(_get("reports", "workers", "CINEMAVAIB_REPORT_WORKERS", 4))
+# Раз в сколько секунд счётчики панели отчётов сверяются с БД
+REALTIME_RECHECK_SEC = int(_get("reports", "realtime_recheck_sec", "CINEMAVAIB_REALTIME_RECHECK_SEC", 300))
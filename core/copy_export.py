@@ -0,0 +1,148 @@
+import os
+import threading
+
+import psycopg2
+from psycopg2 import extensions
+
+from core.database import connection
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv, parquet as pq
+except ImportError:  # Parquet - необязательная возможность, CSV работает и без pyarrow
+    pa = None
+
+# Сколько байт CSV pyarrow разбирает за раз - столько строк и уходит в одну группу Parquet
+PARQUET_BLOCK_BYTES = 16 * 1024 * 1024
+
+# OID типов PostgreSQL -> тип столбца Parquet; остальное выгружается строкой
+_ARROW_TYPES = {
+    16: "bool_",
+    20: "int64",
+    21: "int16",
+    23: "int32",
+    700: "float32",
+    701: "float64",
+    1082: "date32",
+}
+_NUMERIC_OID = 1700
+_TIMESTAMP_OID = 1114
+
+
+def parquet_available():
+    return pa is not None
+
+
+def export_file_filter():
+    """Фильтр для QFileDialog: Parquet предлагается, только если установлен pyarrow"""
+    filters = ["CSV (*.csv)"]
+    if parquet_available():
+        filters.append("Parquet (*.parquet)")
+    return ";;".join(filters)
+
+
+def export_query(sql, params, filepath):
+    """Выгрузить выборку в файл; формат по расширению (.parquet или CSV). Возвращает filepath"""
+    if filepath.lower().endswith(".parquet"):
+        copy_to_parquet(sql, params, filepath)
+    else:
+        copy_to_csv(sql, params, filepath)
+    return filepath
+
+
+def _copy_sql(cur, sql, params, header):
+    # COPY не принимает параметры запроса - подставляем их на клиенте с тем же экранированием, что и execute()
+    select_sql = cur.mogrify(sql, params).decode(extensions.encodings[cur.connection.encoding])
+    return f"COPY ({select_sql}) TO STDOUT WITH (FORMAT csv, HEADER {'true' if header else 'false'})"
+
+
+def copy_to_csv(sql, params, filepath, excel_bom=True):
+    """
+    Выгрузить SELECT в CSV через COPY ... TO STDOUT: сервер сам форматирует строки,
+    они пишутся в файл кусками и не превращаются в Python-объекты.
+    excel_bom - метка UTF-8 в начале файла, чтобы Excel открыл кириллицу без мастера импорта.
+    """
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SET LOCAL client_encoding = 'UTF8'")
+            cur.execute("SET LOCAL datestyle = 'ISO, YMD'")
+            with open(filepath, "wb") as file:
+                if excel_bom:
+                    file.write(b"\xef\xbb\xbf")
+                cur.copy_expert(_copy_sql(cur, sql, params, header=True), file)
+    return filepath
+
+
+def _arrow_schema(description):
+    """Схема Parquet по описанию столбцов выборки"""
+    fields = []
+    for column in description:
+        if column.type_code == _NUMERIC_OID:
+            # У вычисляемых numeric (SUM, AVG) точность не задана - такие пишем как float64
+            if column.precision and column.scale is not None and column.precision <= 38:
+                arrow_type = pa.decimal128(column.precision, column.scale)
+            else:
+                arrow_type = pa.float64()
+        elif column.type_code == _TIMESTAMP_OID:
+            arrow_type = pa.timestamp("us")
+        elif column.type_code in _ARROW_TYPES:
+            arrow_type = getattr(pa, _ARROW_TYPES[column.type_code])()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column.name, arrow_type))
+    return pa.schema(fields)
+
+
+def copy_to_parquet(sql, params, filepath, block_size=PARQUET_BLOCK_BYTES):
+    """
+    Выгрузить SELECT в Parquet: поток COPY ... TO STDOUT (CSV) идёт через канал в потоковый
+    CSV-ридер pyarrow, который собирает из него столбцовые пачки по block_size байт;
+    каждая пачка сразу дописывается в файл группой строк. Типы столбцов берутся из описания выборки.
+    """
+    if not parquet_available():
+        raise RuntimeError("Для выгрузки в Parquet установите pyarrow (pip install pyarrow)")
+
+    with connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SET LOCAL client_encoding = 'UTF8'")
+            cur.execute("SET LOCAL datestyle = 'ISO, YMD'")
+            cur.execute(f"SELECT * FROM ({sql}) AS export_source LIMIT 0", params)
+            schema = _arrow_schema(cur.description)
+            copy_sql = _copy_sql(cur, sql, params, header=False)
+
+            read_fd, write_fd = os.pipe()
+            reader = os.fdopen(read_fd, "rb")
+            writer = os.fdopen(write_fd, "wb")
+            copy_errors = []
+
+            def produce():
+                try:
+                    cur.copy_expert(copy_sql, writer)
+                except Exception as e:
+                    copy_errors.append(e)
+                finally:
+                    writer.close()
+
+            producer = threading.Thread(target=produce, name="copy-export", daemon=True)
+            producer.start()
+            try:
+                stream = pa_csv.open_csv(
+                    reader,
+                    read_options=pa_csv.ReadOptions(column_names=schema.names, block_size=block_size),
+                    parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+                    # COPY пишет NULL пустым полем без кавычек, пустую строку - как "", boolean - как t/f
+                    convert_options=pa_csv.ConvertOptions(column_types=schema, null_values=[""],
+                                                          strings_can_be_null=True,
+                                                          quoted_strings_can_be_null=False,
+                                                          true_values=["t"], false_values=["f"]))
+                with pq.ParquetWriter(filepath, schema) as parquet_writer:
+                    for batch in stream:
+                        parquet_writer.write_batch(batch)
+            finally:
+                # Если разбор прервался, закрытый канал обрывает COPY, и поток-писатель завершается
+                reader.close()
+                producer.join()
+                # Ошибка самого запроса важнее, чем ошибка разбора оборванного ею CSV
+                if copy_errors and isinstance(copy_errors[0], psycopg2.Error):
+                    raise copy_errors[0]
+    return filepath
@@ -1,48 +1,269 @@
+import atexit
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+
 import psycopg2
+from psycopg2 import extensions, pool
 
-def query(sql, params=None):
-    try:
-        with psycopg2.connect("dbname=cinemavaib_db host=localhost port=5432 user=postgres") as conn:
+from core.config import DB_DSN, DB_POOL_MIN, DB_POOL_MAX, DB_HEALTHCHECK_IDLE
+
+_pool = None
+_pool_lock = threading.Lock()
+# Ограничивает число одновременно выданных соединений: при исчерпании пула поток ждёт, а не падает
+_slots = threading.BoundedSemaphore(DB_POOL_MAX)
+_last_used = {}
+# Соединения, выданные из пула прямо сейчас, - чтобы их запросы можно было прервать
+_active = set()
+_local = threading.local()
+
+
+def get_pool():
+    """Ленивая инициализация общего пула соединений"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = pool.ThreadedConnectionPool(DB_POOL_MIN, DB_POOL_MAX, DB_DSN)
+    return _pool
+
+
+def close_pool():
+    """Закрыть все соединения пула (вызывается при выходе из приложения)"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
+            _last_used.clear()
+
+
+atexit.register(close_pool)
+
+
+def _is_alive(conn):
+    if conn.closed:
+        return False
+    if conn.get_transaction_status() == extensions.TRANSACTION_STATUS_UNKNOWN:
+        return False
+    # Долго простаивавшее соединение могло быть закрыто сервером (рестарт, таймаут)
+    last_used = _last_used.get(id(conn))
+    if last_used is not None and time.monotonic() - last_used > DB_HEALTHCHECK_IDLE:
+        try:
             with conn.cursor() as cur:
-                cur.execute(sql, params)
-                if cur.description is not None:
-                    return cur.fetchall()
-                else:
-                    conn.commit()
-                    return None
-    except Exception as e:
-        print(f"Ошибка: {e}")
-        return []
+                cur.execute("SELECT 1")
+            conn.rollback()
+        except psycopg2.Error:
+            return False
+    return True
 
-from PyQt6.QtGui import QStandardItem, QStandardItemModel, QPixmap
 
-def datagrid_model(sql, params=None):
-    rows, headers = [], []
+def _checkout():
+    _slots.acquire()
     try:
-        result = query(sql, params)
-        if result is None or len(result) == 0:
-            return QStandardItemModel()  # Пустая таблица
+        db_pool = get_pool()
+        # После рестарта сервера мёртвыми могут оказаться все простаивавшие соединения пула -
+        # проверяем и каждое следующее, пока пул не откроет новое
+        for _ in range(DB_POOL_MAX + 1):
+            conn = db_pool.getconn()
+            if _is_alive(conn):
+                break
+            _discard(conn)
+        else:
+            raise psycopg2.OperationalError("Нет рабочего соединения с БД")
+        _active.add(conn)
+        return conn
+    except Exception:
+        _slots.release()
+        raise
 
-        with psycopg2.connect("dbname=cinemavaib_db host=localhost port=5432 user=postgres") as conn:
-            with conn.cursor() as cur:
+
+def _release(conn):
+    _active.discard(conn)
+    try:
+        if not conn.closed:
+            _last_used[id(conn)] = time.monotonic()
+            get_pool().putconn(conn)
+        else:
+            _discard(conn)
+    finally:
+        _slots.release()
+
+
+def cancel_active_queries():
+    """
+    Прервать запросы, которые сейчас выполняются на соединениях этого процесса (connection.cancel()
+    шлёт серверу запрос отмены по отдельному каналу). Прерванный запрос завершается ошибкой
+    QueryCanceled, соединение остаётся рабочим и возвращается в пул как обычно.
+    """
+    for conn in list(_active):
+        try:
+            if not conn.closed:
+                conn.cancel()
+        except psycopg2.Error:
+            pass
+
+
+def _discard(conn):
+    _last_used.pop(id(conn), None)
+    try:
+        get_pool().putconn(conn, close=True)
+    except pool.PoolError:
+        pass
+
+
+def _rollback(conn):
+    try:
+        if not conn.closed:
+            conn.rollback()
+    except psycopg2.Error:
+        pass
+
+
+@contextmanager
+def connection():
+    """Взять соединение из пула на время блока (внутри transaction() - текущее соединение)"""
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        yield conn
+        return
+
+    conn = _checkout()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        _rollback(conn)
+        raise
+    finally:
+        _release(conn)
+
+
+@contextmanager
+def transaction():
+    """
+    Выполнить несколько запросов в одной транзакции.
+    Все вызовы query() внутри блока в этом потоке идут через одно соединение;
+    при исключении транзакция откатывается.
+    """
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        # Вложенный блок - используем уже открытую транзакцию
+        yield conn
+        return
+
+    conn = _checkout()
+    _local.conn = conn
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        _rollback(conn)
+        raise
+    finally:
+        _local.conn = None
+        _release(conn)
+
+
+def _is_broken(conn, error):
+    """Соединение потеряно: ошибка пришла не от сервера (у серверных ошибок есть SQLSTATE)"""
+    return conn.closed or isinstance(error, psycopg2.InterfaceError) or error.pgcode is None
+
+
+def _execute(conn, sql, params):
+    with conn.cursor() as cur:
+        cur.execute(sql, params)
+        if cur.description is not None:
+            return cur.fetchall()
+        return None
+
+
+def query(sql, params=None):
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        # Внутри transaction() ошибки пробрасываются, чтобы откатить всю транзакцию
+        return _execute(conn, sql, params)
+
+    for attempt in range(2):
+        try:
+            conn = _checkout()
+        except Exception as e:
+            print(f"Ошибка: {e}")
+            return []
+        committing = False
+        try:
+            result = _execute(conn, sql, params)
+            committing = True
+            conn.commit()
+            return result
+        except (psycopg2.OperationalError, psycopg2.InterfaceError) as e:
+            if _is_broken(conn, e):
+                conn.close()
+                # Соединение оборвалось (например, перезапуск сервера) до COMMIT: транзакция
+                # не зафиксирована, повтор безопасен - переподключаемся один раз.
+                # Обрыв во время COMMIT не повторяем: запись могла уже примениться
+                if attempt == 0 and not committing:
+                    continue
+            else:
+                # Ошибка сервера на живом соединении (например, QueryCanceled) - не повторяем
+                _rollback(conn)
+            print(f"Ошибка: {e}")
+            return []
+        except Exception as e:
+            _rollback(conn)
+            print(f"Ошибка: {e}")
+            return []
+        finally:
+            _release(conn)
+    return []
+
+from PyQt6.QtCore import QCoreApplication, QEventLoop
+from PyQt6.QtGui import QStandardItem, QStandardItemModel, QPixmap
+
+DATAGRID_BATCH_SIZE = 500
+_iter_ids = itertools.count(1)
+
+def datagrid_model(sql, params=None, batch_size=DATAGRID_BATCH_SIZE):
+    """
+    Построить модель таблицы за одно выполнение запроса.
+    Строки читаются серверным курсором пачками по batch_size и сразу
+    добавляются в модель, между пачками обрабатываются события отрисовки.
+    """
+    model = QStandardItemModel()
+    try:
+        with connection() as conn:
+            with conn.cursor(name=f"datagrid_{id(model)}") as cur:
+                cur.itersize = batch_size
                 cur.execute(sql, params)
+                rows = cur.fetchmany(batch_size)
+
+                # У серверного курсора description доступен после первой выборки
                 headers = [desc[0] for desc in cur.description]
+                model.setColumnCount(len(headers))
+                model.setHorizontalHeaderLabels(headers)
+
+                while rows:
+                    for row in rows:
+                        model.appendRow([QStandardItem(str(value)) for value in row])
+                    QCoreApplication.processEvents(QEventLoop.ProcessEventsFlag.ExcludeUserInputEvents)
+                    rows = cur.fetchmany(batch_size)
     except Exception as e:
         print(f"Ошибка datagrid_model(): {e}")
         return QStandardItemModel()
-
-    if not headers and len(result) > 0:
-        headers = [f"col_{i}" for i in range(len(result[0]))]
-
-    model = QStandardItemModel()
-    model.setColumnCount(len(headers))
-    model.setHorizontalHeaderLabels(headers)
-
-    for row in result:
-        item_row = [QStandardItem(str(value)) for value in row]
-        model.appendRow(item_row)
     return model
 
+def iter_query(sql, params=None, batch_size=DATAGRID_BATCH_SIZE):
+    """
+    Построчно читать выборку серверным курсором: в памяти только текущая пачка из batch_size строк.
+    Соединение занято, пока итерация не закончена или генератор не закрыт.
+    """
+    with connection() as conn:
+        with conn.cursor(name=f"iter_query_{next(_iter_ids)}") as cur:
+            cur.itersize = batch_size
+            cur.execute(sql, params)
+            yield from cur
+
 def image_to_binary(image):
     return psycopg2.Binary(open(image, "rb").read())
 
@@ -58,4 +279,4 @@ def get_image_from_db(movie_id):
         return None
     except Exception as e:
         print(f"Ошибка загрузки изображения: {e}")
-        return None
\ No newline at end of file
+        return None
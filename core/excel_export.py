@@ -0,0 +1,96 @@
+import itertools
+from datetime import datetime
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.utils import get_column_letter
+
+# По скольким первым строкам оценивается ширина столбцов
+WIDTH_SAMPLE_ROWS = 500
+MAX_COLUMN_WIDTH = 50
+# Как часто (в строках) вызывается progress
+PROGRESS_EVERY_ROWS = 5000
+
+
+def _named_styles():
+    """Общие стили книги: ячейка ссылается на стиль по имени, а не хранит свои Font/Border"""
+    thin = Side(style='thin')
+    border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    center_align = Alignment(horizontal='center', vertical='center')
+
+    title = NamedStyle(name="report_title", font=Font(bold=True, size=14))
+    subtitle = NamedStyle(name="report_subtitle")
+    header = NamedStyle(name="report_header", font=Font(bold=True, color="FFFFFF"),
+                        fill=PatternFill(start_color="366092", end_color="366092", fill_type="solid"),
+                        border=border, alignment=center_align)
+    text = NamedStyle(name="report_text", border=border)
+    number = NamedStyle(name="report_number", border=border, alignment=Alignment(horizontal='right'))
+    return title, subtitle, header, text, number
+
+
+def estimate_widths(headers, sample):
+    """Ширина столбцов по заголовкам и выборке первых строк"""
+    widths = [len(str(header)) for header in headers]
+    for row in sample:
+        for col, value in enumerate(row[:len(widths)]):
+            if value is not None:
+                widths[col] = max(widths[col], len(str(value)))
+    return [min(width + 2, MAX_COLUMN_WIDTH) for width in widths]
+
+
+def write_excel_report(filepath, rows, headers, title, sample_size=WIDTH_SAMPLE_ROWS, progress=None):
+    """
+    Записать отчёт в xlsx потоково (openpyxl write-only): строки из rows - любого итератора,
+    например iter_query() - сразу уходят в файл, в памяти держится только выборка для ширины столбцов.
+    progress(count) вызывается каждые PROGRESS_EVERY_ROWS строк и в конце; исключение из него
+    прерывает запись (так отменяется фоновая генерация). Возвращает число записанных строк данных.
+    """
+    wb = Workbook(write_only=True)
+    title_style, subtitle_style, header_style, text_style, number_style = _named_styles()
+    for style in (title_style, subtitle_style, header_style, text_style, number_style):
+        wb.add_named_style(style)
+    ws = wb.create_sheet("Отчет")
+
+    rows = iter(rows)
+    sample = list(itertools.islice(rows, sample_size))
+
+    # В write-only режиме ширина столбцов задаётся до первой строки
+    for col, width in enumerate(estimate_widths(headers, sample), 1):
+        ws.column_dimensions[get_column_letter(col)].width = width
+
+    def styled(value, style):
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
+
+    ws.append([styled(f"Отчет: {title}", title_style.name)])
+    ws.append([styled(f"Сгенерирован: {datetime.now().strftime('%d.%m.%Y %H:%M')}", subtitle_style.name)])
+    ws.append([])
+    ws.append([styled(header, header_style.name) for header in headers])
+
+    # Стиль ячеек данных разрешается по имени один раз; дальше ячейкам копируется готовый индекс стиля
+    text_cell = styled(None, text_style.name)
+    number_cell = styled(None, number_style.name)
+
+    count = 0
+    for data_row in itertools.chain(sample, rows):
+        ws.append(_data_cells(ws, data_row, text_cell, number_cell))
+        count += 1
+        if progress is not None and count % PROGRESS_EVERY_ROWS == 0:
+            progress(count)
+
+    wb.save(filepath)
+    if progress is not None:
+        progress(count)
+    return count
+
+
+def _data_cells(ws, data_row, text_cell, number_cell):
+    cells = []
+    for col, value in enumerate(data_row):
+        cell = WriteOnlyCell(ws, value=value)
+        # Числовые данные (кроме первого столбца - ID/даты) выравниваем по правому краю
+        cell._style = (number_cell if col > 0 and isinstance(value, (int, float)) else text_cell)._style
+        cells.append(cell)
+    return cells
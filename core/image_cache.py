@@ -0,0 +1,102 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QPixmap
+
+from core.config import IMAGE_CACHE_MB
+
+
+class ImageCache:
+    """
+    Общий на процесс кэш уже уменьшенных изображений.
+    Ключ - (хэш содержимого, ширина, высота), вытеснение LRU по суммарному объёму в байтах.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(image_bytes, width, height, content_key=None):
+        """content_key - хэш из БД; если его нет (старые записи), хэшируем сами байты"""
+        if content_key is None:
+            content_key = hashlib.sha1(bytes(image_bytes)).hexdigest()
+        return content_key, width, height
+
+    @staticmethod
+    def _cost(image):
+        return image.width() * image.height() * max(image.depth(), 8) // 8
+
+    def get(self, key):
+        with self._lock:
+            image = self._entries.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def put(self, key, image):
+        cost = self._cost(image)
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= self._cost(old)
+            self._entries[key] = image
+            self._size += cost
+            while self._size > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= self._cost(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+            }
+
+    def get_pixmap(self, image_bytes, width, height, content_key=None):
+        """
+        Уменьшенный QPixmap для виджета: из кэша или декодированный и сохранённый в кэш.
+        Возвращает None, если изображения нет или его не удалось декодировать.
+        """
+        if not image_bytes:
+            return None
+
+        key = self.make_key(image_bytes, width, height, content_key)
+        pixmap = self.get(key)
+        if pixmap is not None:
+            return pixmap
+
+        pixmap = QPixmap()
+        pixmap.loadFromData(bytes(image_bytes))
+        if pixmap.isNull():
+            return None
+        if pixmap.width() > width or pixmap.height() > height:
+            pixmap = pixmap.scaled(
+                width, height,
+                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.TransformationMode.SmoothTransformation
+            )
+        self.put(key, pixmap)
+        return pixmap
+
+
+image_cache = ImageCache(IMAGE_CACHE_MB * 1024 * 1024)
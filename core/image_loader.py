@@ -0,0 +1,162 @@
+from collections import deque
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, Qt, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+
+from core.image_cache import image_cache
+
+# Сколько запросов может ждать декодирования; самые старые сверх лимита отбрасываются (сигнал dropped)
+MAX_PENDING = 64
+MAX_THREADS = 4
+
+
+class ImageRequest(QObject):
+    """
+    Запрос на декодирование одного изображения; карточка держит его, чтобы отменить.
+    dropped - запрос вытеснен из переполненной очереди и декодирован не будет: его нужно повторить.
+    """
+    ready = pyqtSignal(QPixmap)
+    failed = pyqtSignal()
+    dropped = pyqtSignal()
+
+    def __init__(self, key, image_bytes, width, height):
+        super().__init__()
+        self.key = key
+        self.image_bytes = image_bytes
+        self.width = width
+        self.height = height
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        # Байты больше не нужны - не держим их в памяти до конца очереди
+        self.image_bytes = None
+
+
+class _DecodeTask(QRunnable):
+    """Декодирование и уменьшение в потоке пула - только QImage, QPixmap создаётся в GUI-потоке"""
+
+    def __init__(self, loader, request):
+        super().__init__()
+        self.loader = loader
+        self.request = request
+
+    def run(self):
+        request = self.request
+        image = None
+        try:
+            data = request.image_bytes
+            if not request.cancelled and data:
+                image = QImage.fromData(bytes(data))
+                if image.isNull():
+                    image = None
+                elif not request.cancelled and (image.width() > request.width or image.height() > request.height):
+                    image = image.scaled(request.width, request.height,
+                                         Qt.AspectRatioMode.KeepAspectRatio,
+                                         Qt.TransformationMode.SmoothTransformation)
+        except Exception as e:
+            print(f"Ошибка декодирования изображения: {e}")
+            image = None
+        self.loader._decoded.emit(request, image)
+
+
+class ImageLoader(QObject):
+    """
+    Фоновое декодирование изображений для карточек.
+    В пул одновременно уходит не больше MAX_THREADS задач, остальные ждут в ограниченной очереди;
+    отменённые запросы из очереди просто пропускаются.
+    room_available - в очереди снова есть место: вытесненные запросы можно повторить.
+    """
+    _decoded = pyqtSignal(object, object)
+    room_available = pyqtSignal()
+
+    def __init__(self, max_threads=MAX_THREADS, max_pending=MAX_PENDING):
+        super().__init__()
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_threads)
+        self.max_pending = max_pending
+        self._pending = deque()
+        self._running = 0
+        self._decoded.connect(self._on_decoded)
+
+    def load(self, image_bytes, width, height, content_key=None, on_ready=None, on_failed=None, on_dropped=None):
+        """
+        Поставить изображение в очередь. Если оно уже есть в кэше, on_ready вызывается сразу
+        и возвращается None, иначе - ImageRequest, который можно отменить.
+        on_dropped вызывается, если запрос вытеснили из очереди более новые.
+        """
+        if not image_bytes:
+            if on_failed:
+                on_failed()
+            return None
+
+        key = image_cache.make_key(image_bytes, width, height, content_key)
+        pixmap = image_cache.get(key)
+        if pixmap is not None:
+            if on_ready:
+                on_ready(pixmap)
+            return None
+
+        request = ImageRequest(key, image_bytes, width, height)
+        if on_ready:
+            request.ready.connect(on_ready)
+        if on_failed:
+            request.failed.connect(on_failed)
+        if on_dropped:
+            request.dropped.connect(on_dropped)
+
+        self._pending.append(request)
+        if len(self._pending) > self.max_pending:
+            # Сначала место освобождают уже отменённые запросы, затем вытесняются самые старые
+            self._pending = deque(r for r in self._pending if not r.cancelled)
+            while len(self._pending) > self.max_pending:
+                evicted = self._pending.popleft()
+                evicted.cancel()
+                evicted.dropped.emit()
+        self._start_next()
+        return request
+
+    def has_room(self):
+        """Новый запрос встанет в очередь, никого не вытеснив"""
+        return sum(1 for request in self._pending if not request.cancelled) < self.max_pending
+
+    def cancel_all(self):
+        """Отменить всё, что ещё не декодировано"""
+        while self._pending:
+            self._pending.popleft().cancel()
+
+    def _start_next(self):
+        while self._running < self.pool.maxThreadCount() and self._pending:
+            request = self._pending.popleft()
+            if request.cancelled:
+                continue
+            self._running += 1
+            self.pool.start(_DecodeTask(self, request))
+
+    def _on_decoded(self, request, image):
+        self._running -= 1
+        try:
+            if request.cancelled:
+                return
+            if image is None:
+                request.failed.emit()
+                return
+            pixmap = QPixmap.fromImage(image)
+            image_cache.put(request.key, pixmap)
+            request.ready.emit(pixmap)
+        finally:
+            request.image_bytes = None
+            self._start_next()
+            if self.has_room():
+                self.room_available.emit()
+
+
+_loader = None
+
+
+def image_loader():
+    """Общий загрузчик; создаётся при первом обращении, когда QApplication уже есть"""
+    global _loader
+    if _loader is None:
+        _loader = ImageLoader()
+    return _loader
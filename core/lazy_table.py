@@ -0,0 +1,303 @@
+from collections import OrderedDict
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from core.async_query import run_query_async
+from core.database import connection, query
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class LazyTableModel(QAbstractTableModel):
+    """
+    Модель таблицы для больших выборок.
+    Строки подгружаются блоками по мере прокрутки, каждый блок - отдельный запрос с LIMIT
+    в фоне (пока блок не пришёл, ячейки пустые); соединение между блоками возвращается в пул.
+    Следующий блок запрашивается заранее, когда прокрутка доходит до конца текущего.
+    В памяти держится не больше max_blocks последних блоков (LRU). Количество строк берётся из COUNT-запроса.
+    Порядок по умолчанию (order_by в set_query) и сортировка по колонке выполняются на сервере;
+    первая колонка запроса должна быть уникальным ключом (ID) - она добирает порядок при равных значениях.
+    Следующий блок после уже прочитанного берётся по ключу (keyset, как у каталога и журнала),
+    через OFFSET - только блок, к которому перешли скачком по полосе прокрутки.
+    Между блоками данные не замораживаются: строки, добавленные во время прокрутки, сдвигают OFFSET.
+    """
+
+    def __init__(self, sql=None, params=None, count_sql=None, count_params=None,
+                 block_size=200, max_blocks=20, editable_columns=(), parent=None):
+        super().__init__(parent)
+        self.block_size = block_size
+        self.max_blocks = max_blocks
+        self.editable_columns = set(editable_columns)
+
+        self._sql = None
+        self._params = None
+        self._count_sql = None
+        self._count_params = None
+        self._order_by = None
+        self._hidden_columns = ()
+        self._sort = None
+
+        # Все колонки запроса и индексы показываемых
+        self._names = []
+        self._columns = []
+        self._headers = []
+        self._row_count = 0
+        self._blocks = OrderedDict()
+        # Последняя строка каждого прочитанного блока - ключ для keyset-запроса следующего
+        self._block_ends = {}
+        # Блоки, запрошенные в фоне; ответы на запросы до refresh() отбрасываются по поколению
+        self._loading = set()
+        self._generation = 0
+        self._edits = {}
+
+        if sql:
+            self.set_query(sql, params, count_sql, count_params)
+
+    def set_query(self, sql, params=None, count_sql=None, count_params=None, order_by=None, hidden_columns=()):
+        """
+        Задать новый запрос. count_sql - более дешёвый вариант подсчёта строк, если есть.
+        order_by - порядок по умолчанию: (имена колонок запроса, по убыванию); колонки NOT NULL,
+        последняя уникальна. Сам запрос тогда пишется без ORDER BY, чтобы условие по ключу
+        дошло до индекса. hidden_columns - колонки только для ключа, в таблице не показываются.
+        """
+        self._sql = sql
+        self._params = params
+        self._count_sql = count_sql
+        self._count_params = count_params if count_sql else params
+        self._order_by = order_by
+        self._hidden_columns = tuple(hidden_columns)
+        self._sort = None
+        self.refresh()
+
+    def refresh(self):
+        """Перечитать данные с текущими запросом и сортировкой"""
+        self.beginResetModel()
+        try:
+            self._clear()
+            if self._sql:
+                self._open()
+        except Exception as e:
+            print(f"Ошибка LazyTableModel: {e}")
+            self._clear()
+        finally:
+            self.endResetModel()
+
+    def close(self):
+        """Забыть загруженные строки (соединения модель между запросами не держит)"""
+        self.beginResetModel()
+        self._clear()
+        self.endResetModel()
+
+    def _clear(self):
+        self._blocks.clear()
+        self._block_ends.clear()
+        self._loading.clear()
+        self._generation += 1
+        self._edits.clear()
+        self._row_count = 0
+
+    def _open(self):
+        count_sql = self._count_sql or f"SELECT COUNT(*) FROM ({self._sql}) AS lazy_src"
+        count = query(count_sql, self._count_params)
+        self._row_count = count[0][0] if count else 0
+
+        sql, params = self._block_query(0)
+        with connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                first_rows = cur.fetchall()
+                self._set_columns([desc[0] for desc in cur.description])
+        self._store_block(0, first_rows)
+        if len(first_rows) < self.block_size:
+            # Выборка целиком уместилась в первый блок - COUNT мог устареть
+            self._row_count = len(first_rows)
+
+    def _set_columns(self, names):
+        self._names = names
+        self._columns = [i for i, name in enumerate(names) if name not in self._hidden_columns]
+        self._headers = [names[i] for i in self._columns]
+
+    def _block_query(self, block_index):
+        """SQL и параметры блока: по ключу конца предыдущего блока, если он известен, иначе OFFSET"""
+        params = list(self._params or [])
+        previous_end = self._block_ends.get(block_index - 1)
+
+        if self._sort is not None:
+            column, order = self._sort
+            column = self._columns[column]
+            descending = order == Qt.SortOrder.DescendingOrder
+            direction = "DESC" if descending else "ASC"
+            sort_col = f"lazy_src.{_quote(self._names[column])}"
+            key_col = f"lazy_src.{_quote(self._names[0])}"
+
+            where = ""
+            if previous_end is not None:
+                # Следующие за (value, key) строки в порядке ORDER BY col, key с NULL в конце
+                value, key = previous_end[column], previous_end[0]
+                after = "<" if descending else ">"
+                if value is None:
+                    where = f"WHERE {sort_col} IS NULL AND {key_col} {after} %s"
+                    params.append(key)
+                else:
+                    where = (f"WHERE {sort_col} {after} %s OR ({sort_col} = %s AND {key_col} {after} %s) "
+                             f"OR {sort_col} IS NULL")
+                    params += [value, value, key]
+
+            order_sql = f"{sort_col} {direction} NULLS LAST, {key_col} {direction}"
+        elif self._order_by is not None:
+            names, descending = self._order_by
+            direction = "DESC" if descending else "ASC"
+            key_cols = [f"lazy_src.{_quote(name)}" for name in names]
+
+            where = ""
+            if previous_end is not None:
+                # Колонки ключа NOT NULL, поэтому хватает сравнения строк - его берёт индекс
+                after = "<" if descending else ">"
+                where = f"WHERE ({', '.join(key_cols)}) {after} ({', '.join(['%s'] * len(key_cols))})"
+                params += [previous_end[self._names.index(name)] for name in names]
+
+            order_sql = ", ".join(f"{col} {direction}" for col in key_cols)
+        else:
+            # Порядок задаёт ORDER BY самого запроса
+            return (f"{self._sql} LIMIT %s OFFSET %s",
+                    params + [self.block_size, block_index * self.block_size])
+
+        sql = f"SELECT * FROM ({self._sql}) AS lazy_src {where} ORDER BY {order_sql} LIMIT %s"
+        params.append(self.block_size)
+        if previous_end is None and block_index > 0:
+            sql += " OFFSET %s"
+            params.append(block_index * self.block_size)
+        return sql, params
+
+    @staticmethod
+    def _fetch_rows(sql, params):
+        with connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                return cur.fetchall()
+
+    @staticmethod
+    def _load_block(generation, block_index, sql, params):
+        """Чтение блока в фоновом потоке"""
+        try:
+            return generation, block_index, LazyTableModel._fetch_rows(sql, params)
+        except Exception as e:
+            print(f"Ошибка подгрузки строк LazyTableModel: {e}")
+            return generation, block_index, None
+
+    def _request_block(self, block_index):
+        """Запросить блок в фоне, если его ещё нет и он не запрошен"""
+        if block_index in self._blocks or block_index in self._loading \
+                or block_index * self.block_size >= self._row_count:
+            return
+        sql, params = self._block_query(block_index)
+        self._loading.add(block_index)
+        run_query_async(LazyTableModel._load_block, self._generation, block_index, sql, params,
+                        on_result=self._on_block_loaded)
+
+    def _on_block_loaded(self, result):
+        generation, block_index, block = result
+        if generation != self._generation:
+            return
+        self._loading.discard(block_index)
+        if block is None:
+            return
+        self._store_block(block_index, block)
+
+        first = block_index * self.block_size
+        last = min(first + self.block_size, self._row_count) - 1
+        if last >= first and self._columns:
+            self.dataChanged.emit(self.index(first, 0), self.index(last, len(self._columns) - 1))
+
+    def _store_block(self, block_index, block):
+        self._blocks[block_index] = block
+        if len(block) == self.block_size:
+            self._block_ends[block_index] = block[-1]
+        while len(self._blocks) > self.max_blocks:
+            self._blocks.popitem(last=False)
+
+    def _get_row(self, row, wait=False):
+        """
+        Строка из загруженного блока. Если блока нет, он запрашивается в фоне и возвращается None;
+        wait=True - прочитать блок сразу (для редких обращений не из отрисовки).
+        """
+        block_index = row // self.block_size
+        offset = row - block_index * self.block_size
+        block = self._blocks.get(block_index)
+        if block is None:
+            if not wait:
+                self._request_block(block_index)
+                return None
+            try:
+                block = self._fetch_rows(*self._block_query(block_index))
+            except Exception as e:
+                print(f"Ошибка подгрузки строк LazyTableModel: {e}")
+                return None
+            self._store_block(block_index, block)
+        else:
+            self._blocks.move_to_end(block_index)
+            if offset >= self.block_size * 3 // 4:
+                # Прокрутка подходит к концу блока - следующий читаем заранее, по ключу этого
+                self._request_block(block_index + 1)
+
+        return block[offset] if offset < len(block) else None
+
+    # --- QAbstractTableModel ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._row_count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return None
+
+        key = (index.row(), index.column())
+        if key in self._edits:
+            return self._edits[key]
+
+        row = self._get_row(index.row())
+        if row is None or index.column() >= len(self._columns):
+            return None
+        return str(row[self._columns[index.column()]])
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self._headers[section] if section < len(self._headers) else None
+        return str(section + 1)
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and index.column() in self.editable_columns:
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole \
+                or index.column() not in self.editable_columns:
+            return False
+        self._edits[(index.row(), index.column())] = value
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        if not self._sql or column < 0 or column >= len(self._headers):
+            return
+        self._sort = (column, order)
+        self.refresh()
+
+    # --- Редактирование ---
+    def edited_rows(self):
+        """Изменённые пользователем строки: {row: [значения всех колонок]}"""
+        rows = sorted({row for row, _ in self._edits})
+        return {row: [self._edits.get((row, col), self._value(row, col)) for col in range(self.columnCount())]
+                for row in rows}
+
+    def _value(self, row, column):
+        values = self._get_row(row, wait=True)
+        return None if values is None else str(values[self._columns[column]])
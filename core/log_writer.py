@@ -0,0 +1,165 @@
+import atexit
+import threading
+import time
+from collections import deque
+
+from psycopg2 import errorcodes, extras
+
+from core.config import LOG_BATCH_SIZE, LOG_FLUSH_MS, LOG_BUFFER_MAX, LOG_OVERFLOW
+from core.database import connection, query
+
+# Сколько раз повторять запись пачки, если БД недоступна, прежде чем её выбросить
+MAX_RETRIES = 3
+# Сколько ждать дозаписи буфера при выходе из приложения, сек
+CLOSE_TIMEOUT = 5.0
+
+INSERT_SQL = """
+    INSERT INTO activity_log
+    (user_id, actor_role, action_type, entity_id, description, created_at)
+    VALUES %s
+"""
+# created_at - время события, а не записи: вычитаем, сколько запись пролежала в буфере
+INSERT_TEMPLATE = "(%s, %s, %s, %s, %s, CURRENT_TIMESTAMP - %s * INTERVAL '1 second')"
+
+
+class ActivityLogWriter:
+    """
+    Буферизованная запись activity_log: write() только кладёт запись в очередь,
+    фоновый поток пишет накопленное одним многострочным INSERT раз в flush_ms
+    или как только набралось batch_size записей.
+    Буфер ограничен max_buffer записями; при переполнении overflow:
+    "drop_oldest" - выбрасывается самая старая запись, "block" - вызывающий ждёт места.
+    """
+
+    def __init__(self, batch_size=LOG_BATCH_SIZE, flush_ms=LOG_FLUSH_MS,
+                 max_buffer=LOG_BUFFER_MAX, overflow=LOG_OVERFLOW):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(flush_ms, 1) / 1000
+        self.max_buffer = max(self.batch_size, max_buffer)
+        self.overflow = overflow
+
+        self._buffer = deque()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._closed = False
+        self._flush_requested = False
+        # Счётчики для flush(): сколько записей принято и сколько уже обработано (записано или выброшено)
+        self._accepted = 0
+        self._done = 0
+        self.dropped = 0
+
+    def write(self, user_id, actor_role, action_type, entity_id, description):
+        record = (user_id, actor_role, action_type, entity_id, description, time.monotonic())
+        with self._cond:
+            if not self._closed and len(self._buffer) >= self.max_buffer:
+                if self.overflow == "block":
+                    self._flush_requested = True
+                    self._cond.notify_all()
+                    self._cond.wait_for(lambda: len(self._buffer) < self.max_buffer or self._closed)
+                else:
+                    self._buffer.popleft()
+                    self._done += 1
+                    self.dropped += 1
+                    if self.dropped % 1000 == 1:
+                        print(f"Буфер журнала переполнен, выброшено записей: {self.dropped}")
+
+            if not self._closed:
+                self._buffer.append(record)
+                self._accepted += 1
+                if len(self._buffer) >= self.batch_size:
+                    self._cond.notify_all()
+
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="activity-log-writer", daemon=True)
+                    self._thread.start()
+                return
+
+        # Приложение уже завершается - пишем сразу, но не под блокировкой: иначе ждали бы все потоки
+        if not self._insert([record]):
+            with self._cond:
+                self.dropped += 1
+            print(f"Запись журнала при выходе не удалась, выброшено записей: {self.dropped}")
+
+    def flush(self, timeout=CLOSE_TIMEOUT):
+        """Дождаться записи всего, что было в буфере на момент вызова"""
+        with self._cond:
+            if self._thread is None:
+                return True
+            target = self._accepted
+            self._flush_requested = True
+            self._cond.notify_all()
+            return self._cond.wait_for(lambda: self._done >= target, timeout)
+
+    def close(self):
+        """Дописать буфер и остановить поток (при выходе из приложения)"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(CLOSE_TIMEOUT)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._closed or self._flush_requested or len(self._buffer) >= self.batch_size,
+                    self.flush_interval)
+                self._flush_requested = False
+                if not self._buffer:
+                    if self._closed:
+                        return
+                    continue
+                batch = [self._buffer.popleft() for _ in range(min(self.batch_size, len(self._buffer)))]
+                # Освободилось место - будим тех, кто ждёт в write() с overflow="block"
+                self._cond.notify_all()
+
+            written = False
+            for attempt in range(MAX_RETRIES):
+                written = self._insert(batch)
+                if written:
+                    break
+                with self._cond:
+                    if self._closed:
+                        break
+                    self._cond.wait(self.flush_interval)
+
+            with self._cond:
+                if not written:
+                    self.dropped += len(batch)
+                    print(f"Не удалось записать пачку журнала ({len(batch)} записей), всего выброшено: {self.dropped}")
+                if len(self._buffer) >= self.batch_size:
+                    self._flush_requested = True
+                self._done += len(batch)
+                self._cond.notify_all()
+
+    @staticmethod
+    def _insert(records):
+        now = time.monotonic()
+        rows = [record[:5] + (now - record[5],) for record in records]
+        try:
+            with connection() as conn:
+                with conn.cursor() as cur:
+                    extras.execute_values(cur, INSERT_SQL, rows, template=INSERT_TEMPLATE, page_size=len(rows))
+            return True
+        except Exception as e:
+            if getattr(e, "pgcode", None) == errorcodes.CHECK_VIOLATION:
+                # Нет секции на текущий месяц, а секции по умолчанию (миграция 011) в БД нет - создаём и повторяем
+                query("SELECT ensure_activity_log_partitions()")
+            print(f"Ошибка при записи журнала ({len(rows)} записей): {e}")
+            return False
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def log_writer():
+    """Общий буфер журнала; при выходе из приложения дописывается до закрытия пула соединений"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = ActivityLogWriter()
+                atexit.register(_writer.close)
+    return _writer
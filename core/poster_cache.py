@@ -0,0 +1,144 @@
+import mmap
+import os
+import threading
+
+from core.config import POSTER_CACHE_DIR
+from core.database import connection, query
+
+# Варианты постера: выражение для выборки из movies
+POSTER_VARIANTS = {
+    'thumb': "COALESCE(movie_thumb, movie_image)",
+    'detail': "COALESCE(movie_detail, movie_image)",
+}
+
+
+class PosterCache:
+    """
+    Локальный кэш постеров на диске.
+    Файл называется по (movie_id, updated_at): если строка в БД изменилась,
+    имя не совпадёт и постер будет скачан заново. Остальное читается с диска без BLOB из БД.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.root)
+
+    @staticmethod
+    def _stamp(updated_at):
+        return updated_at.strftime("%Y%m%d%H%M%S%f")
+
+    def _dir(self, variant):
+        return os.path.join(self.root, "movies", variant)
+
+    def _path(self, variant, movie_id, updated_at):
+        return os.path.join(self._dir(variant), f"{movie_id}_{self._stamp(updated_at)}.bin")
+
+    def read(self, variant, movie_id, updated_at):
+        """Байты постера из кэша или None, если актуальной версии нет"""
+        path = self._path(variant, movie_id, updated_at)
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return None
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return mapped[:]
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            print(f"Ошибка чтения кэша постеров: {e}")
+            return None
+
+    def write(self, variant, movie_id, updated_at, data):
+        """Сохранить постер, удалив устаревшие версии этого фильма"""
+        directory = self._dir(variant)
+        path = self._path(variant, movie_id, updated_at)
+        try:
+            with self._lock:
+                os.makedirs(directory, exist_ok=True)
+                self._remove_versions(directory, movie_id)
+                tmp_path = f"{path}.{os.getpid()}.tmp"
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                # Атомарная замена - другой процесс не прочитает недописанный файл
+                os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Ошибка записи кэша постеров: {e}")
+
+    @staticmethod
+    def _remove_versions(directory, movie_id):
+        prefix = f"{movie_id}_"
+        for name in os.listdir(directory):
+            if name.startswith(prefix):
+                os.remove(os.path.join(directory, name))
+
+    def fill(self, rows, variant, id_index, stamp_index, image_index):
+        """
+        Подставить постеры в строки, выбранные без BLOB (в image_index - NULL).
+        С диска берутся актуальные версии, из БД одним запросом - только недостающие.
+        """
+        rows = [list(row) for row in rows]
+        missing = {}
+
+        for row in rows:
+            movie_id, updated_at = row[id_index], row[stamp_index]
+            data = self.read(variant, movie_id, updated_at) if self.enabled else None
+            if data is None:
+                missing.setdefault(movie_id, []).append(row)
+            else:
+                row[image_index] = data
+
+        if missing:
+            sql = f"""
+                SELECT movie_id, updated_at, {POSTER_VARIANTS[variant]}
+                FROM movies
+                WHERE movie_id = ANY(%s)
+            """
+            for movie_id, updated_at, image in query(sql, [list(missing)]) or []:
+                if image is None:
+                    continue
+                data = bytes(image)
+                if self.enabled:
+                    self.write(variant, movie_id, updated_at, data)
+                for row in missing[movie_id]:
+                    row[image_index] = data
+
+        return [tuple(row) for row in rows]
+
+    def revalidate(self):
+        """
+        Проверка при запуске: лёгкий SELECT movie_id, updated_at без BLOB.
+        Удаляет файлы удалённых и изменённых фильмов, возвращает их количество.
+        Если БД недоступна, кэш не трогаем: пустой список фильмов удалил бы все постеры.
+        """
+        if not self.enabled:
+            return 0
+        try:
+            with connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT movie_id, updated_at FROM movies")
+                    rows = cur.fetchall()
+        except Exception as e:
+            print(f"Ошибка проверки кэша постеров: {e}")
+            return 0
+        valid = {f"{movie_id}_{self._stamp(updated_at)}.bin" for movie_id, updated_at in rows}
+
+        removed = 0
+        for variant in POSTER_VARIANTS:
+            directory = self._dir(variant)
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                if name not in valid:
+                    try:
+                        os.remove(os.path.join(directory, name))
+                        removed += 1
+                    except OSError as e:
+                        print(f"Ошибка очистки кэша постеров: {e}")
+        return removed
+
+
+poster_cache = PosterCache(POSTER_CACHE_DIR)
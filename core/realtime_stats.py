@@ -0,0 +1,178 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from core.async_query import run_query_async
+from core.config import REALTIME_RECHECK_SEC
+from core.seat_notifications import CHANNEL, SESSION_CHANNEL, USER_CHANNEL, seat_listener
+from Models.ReportsModel import ReportsModel
+
+
+def _parse_snapshot(text):
+    """Снимок txid_current_snapshot() 'xmin:xmax:xip,...' -> (xmin, xmax, frozenset(xip))"""
+    xmin, xmax, xip = text.split(":")
+    return int(xmin), int(xmax), frozenset(int(xid) for xid in xip.split(",") if xid)
+
+
+def _in_snapshot(xid, snapshot):
+    """Транзакция xid была завершена к моменту снимка - её изменения в снимке уже видны"""
+    xmin, xmax, xip = snapshot
+    return xid < xmin or (xid < xmax and xid not in xip)
+
+
+class RealtimeStats(QObject):
+    """
+    Счётчики панели отчётов в памяти: активные фильмы и сеансы с сегодняшнего дня,
+    билеты и выручка за сегодня, активные пользователи.
+    Заполняются одним запросом к БД, дальше ведутся по уведомлениям ticket_changes, session_changes
+    и user_changes и раз в REALTIME_RECHECK_SEC сверяются с БД (а также после переподключения слушателя и в полночь).
+    Сверка возвращает и снимок транзакций, из которого прочитаны значения: уведомления, пришедшие
+    во время сверки, откладываются до её результата, а уведомления транзакций, уже вошедших в снимок,
+    пропускаются - ни одно изменение не учитывается дважды и не теряется.
+    """
+    changed = pyqtSignal()
+
+    def __init__(self):
+        super().__init__()
+        self.day = None
+        self.today_tickets = 0
+        self.today_revenue = Decimal(0)
+        self.active_users = 0
+        # Сеансы с сегодняшнего дня: session_id -> movie_id
+        self.upcoming = {}
+        # Снимок транзакций последней сверки и уведомления, пришедшие, пока она выполняется
+        self.seed_snapshot = None
+        self.seeding = False
+        self.pending = []
+
+        self._recheck_timer = QTimer(self)
+        self._recheck_timer.setInterval(max(REALTIME_RECHECK_SEC, 1) * 1000)
+        self._recheck_timer.timeout.connect(self.recheck)
+
+        # Смена дня: сегодняшние билеты обнуляются, вчерашние сеансы выбывают
+        self._midnight_timer = QTimer(self)
+        self._midnight_timer.setSingleShot(True)
+        self._midnight_timer.timeout.connect(self.recheck)
+
+    def start(self):
+        listener = seat_listener()
+        listener.notification.connect(self.on_notification)
+        listener.listening.connect(self.recheck)
+        self._recheck_timer.start()
+        self.recheck()
+
+    def snapshot(self):
+        """(active_movies, upcoming_sessions, today_tickets, today_revenue, active_users) или None до заполнения"""
+        if self.day is None:
+            return None
+        return (len(set(self.upcoming.values())), len(self.upcoming),
+                self.today_tickets, self.today_revenue, self.active_users)
+
+    def recheck(self):
+        """Перечитать счётчики из БД (в фоне)"""
+        self.seeding = True
+        run_query_async(ReportsModel.get_realtime_seed, on_result=self.on_seed, on_error=self.on_seed_failed,
+                        owner=self, channel="seed")
+
+    def on_seed_failed(self, error):
+        print(f"Ошибка сверки счётчиков панели отчётов: {error}")
+        self.on_seed(None)
+
+    def on_seed(self, seed):
+        self.seeding = False
+        if seed is None:
+            # Сверка не удалась - применяем отложенное к прежним значениям
+            if self._replay_pending():
+                self.changed.emit()
+            return
+        day, snapshot, today_tickets, today_revenue, active_users, sessions = seed
+        upcoming = {int(session_id): int(movie_id) for session_id, movie_id in sessions}
+
+        self.day = day
+        self.today_tickets = today_tickets
+        self.today_revenue = Decimal(today_revenue)
+        self.active_users = active_users
+        self.upcoming = upcoming
+        self.seed_snapshot = _parse_snapshot(snapshot)
+
+        tomorrow = datetime.combine(date.today() + timedelta(days=1), datetime.min.time())
+        self._midnight_timer.start(int((tomorrow - datetime.now()).total_seconds() * 1000) + 1000)
+        self._replay_pending()
+        self.changed.emit()
+
+    def _replay_pending(self):
+        """Применить уведомления, отложенные на время сверки; True - счётчики изменились"""
+        pending, self.pending = self.pending, []
+        changed = False
+        for channel, data in pending:
+            # Если по ходу началась новая сверка (смена дня), остаток снова откладывается
+            changed = self._handle(channel, data) or changed
+        return changed
+
+    def on_notification(self, channel, data):
+        if self._handle(channel, data):
+            self.changed.emit()
+
+    def _handle(self, channel, data):
+        """Применить уведомление; True - счётчики изменились"""
+        if channel not in (CHANNEL, SESSION_CHANNEL, USER_CHANNEL):
+            return False
+        if self.seeding:
+            self.pending.append((channel, data))
+            return False
+        if self.day is None:
+            return False
+        try:
+            xid = data.get("xid")
+            if xid is not None and _in_snapshot(int(xid), self.seed_snapshot):
+                return False  # изменение уже учтено сверкой
+            if channel == CHANNEL:
+                return self._apply_ticket(data)
+            if channel == SESSION_CHANNEL:
+                self._apply_session(data)
+                return True
+            return self._apply_user(data)
+        except (KeyError, ValueError, TypeError):
+            # Уведомление без нужных полей (БД без миграций 008 и 010) - расхождение исправит сверка
+            return False
+
+    def _apply_ticket(self, data):
+        op = data["op"]
+        if op not in ("INSERT", "DELETE"):
+            return False  # бронь места на счётчики не влияет
+        sale_date = date.fromisoformat(data["sale_date"])
+        if sale_date > self.day:
+            # На сервере уже новый день - перечитываем всё
+            self.recheck()
+            return False
+        if sale_date < self.day:
+            return False
+
+        sign = 1 if op == "INSERT" else -1
+        self.today_tickets += sign
+        self.today_revenue += sign * Decimal(str(data["final_price"]))
+        return True
+
+    def _apply_user(self, data):
+        delta = int(bool(data["active"])) - int(bool(data["was_active"]))
+        self.active_users += delta
+        return delta != 0
+
+    def _apply_session(self, data):
+        session_id = int(data["session_id"])
+        self.upcoming.pop(session_id, None)
+        if data["op"] != "DELETE" and date.fromisoformat(data["session_date"]) >= self.day:
+            self.upcoming[session_id] = int(data["movie_id"])
+
+
+_stats = None
+
+
+def realtime_stats():
+    """Общие счётчики; запускаются при первом обращении (нужен QApplication)"""
+    global _stats
+    if _stats is None:
+        _stats = RealtimeStats()
+        _stats.start()
+    return _stats
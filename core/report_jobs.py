@@ -0,0 +1,169 @@
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from PyQt6.QtCore import QCoreApplication, QObject, QTimer, pyqtSignal
+
+from core.config import REPORT_WORKERS
+from core.database import cancel_active_queries
+
+# Как часто рабочий процесс проверяет флаг отмены, сек
+CANCEL_POLL_SEC = 0.2
+# Как часто GUI-поток забирает события заданий, мс
+EVENTS_POLL_MS = 100
+
+STARTED, PROGRESS, DONE, FAILED, CANCELLED = "started", "progress", "done", "failed", "cancelled"
+
+_executor = None
+_manager = None
+_executor_lock = threading.Lock()
+_job_ids = itertools.count(1)
+
+
+class JobCancelled(Exception):
+    """Задание отменено - бросается из progress() в рабочем процессе"""
+
+
+def _get_executor():
+    """Общий пул процессов для отчётов; создаётся при первом задании"""
+    global _executor, _manager
+    with _executor_lock:
+        if _executor is None:
+            # spawn: рабочий процесс не наследует соединения пула и Qt-объекты родителя
+            context = multiprocessing.get_context("spawn")
+            _manager = context.Manager()
+            _executor = ProcessPoolExecutor(max_workers=max(1, REPORT_WORKERS), mp_context=context)
+    return _executor, _manager
+
+
+def _run_job(job_id, fn, args, events, cancel_event):
+    """Выполняется в рабочем процессе: fn(*args, progress=...) под наблюдением флага отмены"""
+    if cancel_event.is_set():
+        events.put((CANCELLED, job_id, None))
+        return
+    events.put((STARTED, job_id, None))
+
+    finished = threading.Event()
+
+    def watch():
+        # После отмены прерываем на сервере и текущий запрос, и те, что успеют начаться до выхода
+        while not finished.wait(CANCEL_POLL_SEC):
+            if cancel_event.is_set():
+                cancel_active_queries()
+
+    def progress(count):
+        if cancel_event.is_set():
+            raise JobCancelled()
+        events.put((PROGRESS, job_id, count))
+
+    watcher = threading.Thread(target=watch, name=f"report-job-{job_id}-cancel", daemon=True)
+    watcher.start()
+    result, error = None, None
+    try:
+        result = fn(*args, progress=progress)
+    except Exception as e:
+        error = e
+    finally:
+        finished.set()
+        watcher.join()
+
+    if cancel_event.is_set():
+        # Модели глушат ошибку прерванного запроса, так что результат отменённого задания не используем
+        if isinstance(result, str) and os.path.exists(result):
+            os.remove(result)
+        events.put((CANCELLED, job_id, None))
+    elif error is not None or result is None:
+        events.put((FAILED, job_id, str(error) if error is not None else ""))
+    else:
+        events.put((DONE, job_id, result))
+
+
+class ReportJobRunner(QObject):
+    """
+    Параллельная генерация отчётов в пуле процессов: у каждого задания свой запрос и своя сборка файла,
+    поэтому пачка отчётов строится примерно за время самого долгого.
+    submit(fn, *args) выполняет fn(*args, progress=...) в рабочем процессе; fn и аргументы передаются
+    через pickle (функция модуля или статический метод модели). События приходят сигналами в GUI-поток.
+    cancel() - кооперативная отмена: задание останавливается на ближайшем вызове progress(),
+    а выполняющийся запрос прерывается на сервере через connection.cancel().
+    """
+    job_started = pyqtSignal(int)
+    job_progress = pyqtSignal(int, int)  # job_id, обработано строк
+    job_finished = pyqtSignal(int, object)  # job_id, результат fn
+    job_failed = pyqtSignal(int, str)  # job_id, текст ошибки (пустой, если fn вернула None)
+    job_cancelled = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._events = None
+        self._jobs = {}  # job_id -> (future, cancel_event)
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(EVENTS_POLL_MS)
+        self._timer.timeout.connect(self._poll)
+
+        app = QCoreApplication.instance()
+        if app is not None:
+            # Иначе при выходе пул процессов ждал бы окончания всех заданий
+            app.aboutToQuit.connect(self.cancel)
+
+    def submit(self, fn, *args):
+        """Поставить задание в очередь; возвращает job_id"""
+        executor, manager = _get_executor()
+        if self._events is None:
+            self._events = manager.Queue()
+
+        job_id = next(_job_ids)
+        cancel_event = manager.Event()
+        future = executor.submit(_run_job, job_id, fn, args, self._events, cancel_event)
+        self._jobs[job_id] = (future, cancel_event)
+        future.add_done_callback(lambda done, job_id=job_id: self._on_future_done(job_id, done))
+        self._timer.start()
+        return job_id
+
+    def cancel(self, job_id=None):
+        """Отменить задание job_id или все незавершённые"""
+        for current_id, (future, cancel_event) in list(self._jobs.items()):
+            if job_id is None or current_id == job_id:
+                cancel_event.set()
+                # Ещё не переданное процессу задание просто снимается с очереди
+                future.cancel()
+
+    def has_jobs(self):
+        return bool(self._jobs)
+
+    def _on_future_done(self, job_id, future):
+        # Вызывается в служебном потоке пула; обычные исходы задание сообщает само из _run_job
+        if future.cancelled():
+            self._events.put((CANCELLED, job_id, None))
+        elif future.exception() is not None:
+            # Рабочий процесс упал (BrokenProcessPool) или аргументы не сериализуются
+            self._events.put((FAILED, job_id, str(future.exception())))
+
+    def _poll(self):
+        while True:
+            try:
+                kind, job_id, value = self._events.get_nowait()
+            except queue.Empty:
+                break
+            if job_id not in self._jobs:
+                continue
+
+            if kind == STARTED:
+                self.job_started.emit(job_id)
+            elif kind == PROGRESS:
+                self.job_progress.emit(job_id, value)
+            else:
+                del self._jobs[job_id]
+                if kind == DONE:
+                    self.job_finished.emit(job_id, value)
+                elif kind == FAILED:
+                    self.job_failed.emit(job_id, value)
+                else:
+                    self.job_cancelled.emit(job_id)
+
+        if not self._jobs:
+            self._timer.stop()
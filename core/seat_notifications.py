@@ -0,0 +1,115 @@
+import json
+import select
+import threading
+
+import psycopg2
+from psycopg2 import extensions
+from PyQt6.QtCore import QCoreApplication, QObject, pyqtSignal
+
+from core.config import DB_DSN
+
+CHANNEL = "ticket_changes"
+SESSION_CHANNEL = "session_changes"
+USER_CHANNEL = "user_changes"
+# Как часто (сек) поток проверяет флаг остановки, пока ждёт уведомлений на сокете
+WAIT_TIMEOUT = 5.0
+RECONNECT_DELAY = 5.0
+
+
+class SeatChangeListener(QObject):
+    """
+    Фоновый LISTEN ticket_changes, session_changes и user_changes на отдельном соединении (не из пула).
+    Каждое уведомление о месте пересылается сигналом ticket_changed(op, ticket_id, session_id, seat_id, user_id).
+    op: INSERT/DELETE - продажа и отмена билета, HOLD/RELEASE - временная бронь места (ticket_id = 0).
+    Все уведомления всех каналов целиком приходят сигналом notification(channel, data);
+    listening - после каждого (пере)подключения: пропущенное за время обрыва нужно перечитать из БД.
+    """
+    ticket_changed = pyqtSignal(str, int, int, int, int)
+    notification = pyqtSignal(str, object)
+    listening = pyqtSignal()
+
+    def __init__(self, dsn=DB_DSN):
+        super().__init__()
+        self.dsn = dsn
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="seat-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=WAIT_TIMEOUT + 1)
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(self.dsn)
+                conn.set_isolation_level(extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {CHANNEL}")
+                    cur.execute(f"LISTEN {SESSION_CHANNEL}")
+                    cur.execute(f"LISTEN {USER_CHANNEL}")
+                self.listening.emit()
+
+                while not self._stop.is_set():
+                    # Ждём данных на сокете соединения, запросов к БД не делаем
+                    if select.select([conn], [], [], WAIT_TIMEOUT) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        self._dispatch(notify.channel, notify.payload)
+
+            except Exception as e:
+                print(f"Ошибка слушателя изменений мест: {e}")
+                # Пропущенные за время обрыва изменения подписчики перечитают по сигналу listening
+                self._stop.wait(RECONNECT_DELAY)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def _dispatch(self, channel, payload):
+        try:
+            data = json.loads(payload)
+        except ValueError as e:
+            print(f"Некорректное уведомление {channel}: {e}")
+            return
+        self.notification.emit(channel, data)
+        if channel != CHANNEL:
+            return
+
+        try:
+            op = data["op"]
+            session_id = int(data["session_id"])
+            seat_id = int(data["seat_id"])
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Некорректное уведомление {CHANNEL}: {e}")
+            return
+
+        if op not in ("INSERT", "DELETE", "HOLD", "RELEASE"):
+            return
+        self.ticket_changed.emit(op, int(data.get("ticket_id") or 0), session_id, seat_id,
+                                 int(data.get("user_id") or 0))
+
+
+_listener = None
+
+
+def seat_listener():
+    """Общий слушатель; запускается при первом обращении"""
+    global _listener
+    if _listener is None:
+        _listener = SeatChangeListener()
+        _listener.start()
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(_listener.stop)
+    return _listener
@@ -0,0 +1,108 @@
+import hashlib
+
+import psycopg2
+from PyQt6.QtCore import Qt, QBuffer, QByteArray, QIODevice
+from PyQt6.QtGui import QImage
+
+from core.database import query
+
+# Размеры вариантов изображений под виджеты, где они показываются
+CARD_SIZE = (215, 275)      # MovieCard, WatchlistMovieCard
+DETAIL_SIZE = (250, 370)    # постер в MovieDetailView
+PERSON_SIZE = (180, 200)    # PersonCard
+
+
+def content_hash(data):
+    """SHA-256 содержимого изображения - ключ для кэшей"""
+    return hashlib.sha256(bytes(data)).hexdigest()
+
+
+def scale_image(image_bytes, size):
+    """Уменьшить изображение до size с сохранением пропорций. Возвращает bytes или None"""
+    image = QImage.fromData(bytes(image_bytes))
+    if image.isNull():
+        return None
+
+    width, height = size
+    if image.width() > width or image.height() > height:
+        image = image.scaled(width, height,
+                             Qt.AspectRatioMode.KeepAspectRatio,
+                             Qt.TransformationMode.SmoothTransformation)
+
+    data = QByteArray()
+    buffer = QBuffer(data)
+    buffer.open(QIODevice.OpenModeFlag.WriteOnly)
+    # Прозрачность сохраняем в PNG, остальное - компактный JPEG
+    if image.hasAlphaChannel():
+        image.save(buffer, "PNG")
+    else:
+        image.save(buffer, "JPEG", 85)
+    buffer.close()
+    return bytes(data)
+
+
+def _binary(data):
+    return psycopg2.Binary(data) if data is not None else None
+
+
+def movie_image_variants(image_path):
+    """Оригинал постера, его варианты для карточки и детальной страницы и хэш"""
+    with open(image_path, "rb") as f:
+        original = f.read()
+    return {
+        'movie_image': psycopg2.Binary(original),
+        'movie_thumb': _binary(scale_image(original, CARD_SIZE)),
+        'movie_detail': _binary(scale_image(original, DETAIL_SIZE)),
+        'image_hash': content_hash(original),
+    }
+
+
+def person_photo_variants(image_path):
+    """Оригинал фото актёра/режиссёра, миниатюра для PersonCard и хэш"""
+    with open(image_path, "rb") as f:
+        original = f.read()
+    return {
+        'photo': psycopg2.Binary(original),
+        'photo_thumb': _binary(scale_image(original, PERSON_SIZE)),
+        'photo_hash': content_hash(original),
+    }
+
+
+def backfill_thumbnails():
+    """Сгенерировать варианты для записей, загруженных до появления миниатюр"""
+    updated = 0
+
+    for (movie_id,) in query("SELECT movie_id FROM movies WHERE movie_thumb IS NULL OR image_hash IS NULL") or []:
+        rows = query("SELECT movie_image FROM movies WHERE movie_id = %s", [movie_id])
+        if not rows or rows[0][0] is None:
+            continue
+        original = bytes(rows[0][0])
+        query("""
+            UPDATE movies
+            SET movie_thumb = %s, movie_detail = %s, image_hash = %s
+            WHERE movie_id = %s
+        """, [_binary(scale_image(original, CARD_SIZE)), _binary(scale_image(original, DETAIL_SIZE)),
+              content_hash(original), movie_id])
+        updated += 1
+
+    for table, id_column in (("actor", "actor_id"), ("director", "director_id")):
+        for (person_id,) in query(f"SELECT {id_column} FROM {table} "
+                                  f"WHERE photo_thumb IS NULL OR photo_hash IS NULL") or []:
+            rows = query(f"SELECT photo FROM {table} WHERE {id_column} = %s", [person_id])
+            if not rows or rows[0][0] is None:
+                continue
+            original = bytes(rows[0][0])
+            query(f"UPDATE {table} SET photo_thumb = %s, photo_hash = %s WHERE {id_column} = %s",
+                  [_binary(scale_image(original, PERSON_SIZE)), content_hash(original), person_id])
+            updated += 1
+
+    return updated
+
+
+if __name__ == "__main__":
+    # python -m core.thumbnails - разовое заполнение миниатюр для существующей базы
+    import sys
+    from PyQt6.QtGui import QGuiApplication
+
+    app = QGuiApplication(sys.argv)
+    print(f"Обновлено записей: {backfill_thumbnails()}")
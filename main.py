@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 import sys
 from PyQt6.QtCore import QSettings, Qt
@@ -7,6 +8,10 @@ from Views.LoginView import LoginView
 from Views.RegisterView import RegisterView
 from Views.MainView import MainView
 from Models.UserModel import UserModel
+from core.async_query import run_query_async
+from core.poster_cache import poster_cache
+from Models.LogModel import LogModel
+from Models.SeatMapModel import SeatMapModel
 
 
 class App(QStackedWidget):
@@ -84,10 +89,18 @@ def main():
 
     app = QApplication(sys.argv)
     App.apply_style(app)
+    # Секции журнала на ближайшие месяцы
+    LogModel.ensure_partitions()
+    # Кэш занятости мест следит за продажами и бронями других касс
+    SeatMapModel.follow_changes()
     win = App()
     win.show()
+    # Убираем из дискового кэша постеры изменённых и удалённых фильмов - в фоне, окно не ждёт БД
+    run_query_async(poster_cache.revalidate)
     sys.exit(app.exec())
 
 
 if __name__ == '__main__':
+    # Отчёты строятся в дочерних процессах - нужно для сборки в exe
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file